@@ -1,9 +1,14 @@
+import hashlib
 import heapq
 import math
+import time
 from collections import namedtuple
 
-from src.constantes import OPERACAO, Celula
-from src.criar_cenario import obter_cenario_gui
+from src.constantes import OPERACAO, Celula, Motor, ModoHistorico
+from src.estatisticas import EstatisticasDaProcura, ResultadoDaProcura, estimar_bytes
+from src.grade_numpy import NUMPY_DISPONIVEL, calcular_campo_h, criar_grade, localizar_celulas, localizar_ultima
+from src.historico import HistoricoCompacto, CODIGOS_OPERACAO, SEM_PAI
+from src.matriz_plana import MatrizPlana
 
 PosicaoComContexto = namedtuple('PosicaoComContexto', 'x y celula pai')
 
@@ -22,20 +27,40 @@ class Casa:
     def __lt__(self, other):
         return self.f < other.f
 
+    # Estado da procura: a mesma posição com e sem fruta são estados diferentes
+    def chave(self):
+        return self.posicao.x, self.posicao.y, self.tem_fruta
 
-# Tabuleiro completo em que o personagem vai se movimentar para achar a saída
+
+# Tabuleiro completo em que o personagem vai se movimentar para achar a saída. A matriz pode ser uma lista de
+# listas ou uma MatrizPlana; posições (personagem, saída) já conhecidas evitam percorrer o cenário
 class Cenario:
-    __slots__ = ['saida_posicao', 'personagem_posicao', 'matriz_cenario', 'largura', 'altura']
+    __slots__ = ['saida_posicao', 'personagem_posicao', 'matriz_cenario', 'largura', 'altura', 'versao',
+                 '_celulas', '_indice_adjacencia', '_impressao_digital', '_grade', '_campos_h', '_marcos',
+                 '_componentes']
 
     DIRECOES = [(dx, dy) for dx in [-1, 0, 1] for dy in [-1, 0, 1] if (dx, dy) != (0, 0)]
+    MAXIMO_CAMPOS_H = 4  # Saídas diferentes com campo de h guardado, o mais antigo sai primeiro
+    MINIMO_CASAS_NUMPY = 4096  # Abaixo disso, percorrer o cenário em Python sai mais barato que importar o NumPy
 
-    def __init__(self, matriz_cenario):
+    def __init__(self, matriz_cenario, posicoes=None):
         self.saida_posicao = None
         self.personagem_posicao = None
         self.matriz_cenario = matriz_cenario
         self.largura = len(matriz_cenario[0])
         self.altura = len(matriz_cenario)
-        self.localizar_personagem_e_saida()
+        self.versao = 0  # Incrementada a cada casa alterada
+        self._celulas = None
+        self._indice_adjacencia = None
+        self._impressao_digital = None
+        self._grade = None
+        self._campos_h = {}  # (x, y) da saída -> distâncias de todas as casas até ela
+        self._marcos = None
+        self._componentes = None
+        if posicoes is None:
+            self.localizar_personagem_e_saida()
+        else:
+            self.personagem_posicao, self.saida_posicao = posicoes
 
     # Verificar qual o tipo da casa atual (vazia, barreira, personagem, fruta, saída)
     def obter_celula(self, x, y):
@@ -54,8 +79,107 @@ class Cenario:
             if self.obter_celula(x + dx, y + dy) is not None
         ]
 
+    # Cenário em um vetor plano de bytes, um caractere por casa, indexado por y * largura + x
+    def obter_celulas_compactas(self):
+        if self._celulas is None and isinstance(self.matriz_cenario, MatrizPlana):
+            self._celulas = self.matriz_cenario.celulas  # Mesmo vetor, sem cópia
+        elif self._celulas is None:
+            self._celulas = bytearray(''.join(''.join(linha) for linha in self.matriz_cenario), 'ascii')
+        return self._celulas
+
+    # Vizinhos e custos de cada casa pré-calculados, reaproveitados por todas as procuras neste cenário
+    def obter_indice_adjacencia(self):
+        if self._indice_adjacencia is None:
+            from src.indice_adjacencia import IndiceAdjacencia
+            self._indice_adjacencia = IndiceAdjacencia(self.obter_celulas_compactas(), self.largura, self.altura)
+        return self._indice_adjacencia
+
+    # Componentes conexos das casas e as ligações entre eles pelas barreiras, montados uma vez por cenário e
+    # mantidos ao alterar casas. Depois de montados, achar_caminho recusa na hora as saídas inalcançáveis
+    def obter_indice_componentes(self):
+        if self._componentes is None:
+            from src.indice_componentes import IndiceDeComponentes
+            self._componentes = IndiceDeComponentes(self.obter_celulas_compactas(), self.largura, self.altura)
+        return self._componentes
+
+    # Se o índice de componentes já existe e mostra que a saída não é alcançável a partir do início
+    def saida_inalcancavel(self, inicio=None, saida=None):
+        inicio = inicio or self.personagem_posicao
+        saida = saida or self.saida_posicao
+        if self._componentes is None or not inicio or not saida:
+            return False
+        celulas = self.obter_celulas_compactas()
+        return self._componentes.alcanca(celulas, inicio['y'] * self.largura + inicio['x'],
+                                         saida['y'] * self.largura + saida['x']) is False
+
+    # Marcos da heurística ALT, lidos do arquivo ao lado do mapa ou montados uma vez por cenário. Dependem de todas
+    # as casas, então são descartados ao alterar qualquer uma
+    def obter_tabela_de_marcos(self):
+        if self._marcos is None:
+            from src.heuristica_marcos import obter_tabela_de_marcos
+            self._marcos = obter_tabela_de_marcos(self)
+        return self._marcos
+
+    def usar_numpy(self):
+        return NUMPY_DISPONIVEL and self.largura * self.altura >= Cenario.MINIMO_CASAS_NUMPY
+
+    # Cenário como matriz uint8 do NumPy sobre as células compactas, ou None se o NumPy não estiver instalado ou
+    # o cenário for pequeno
+    def obter_grade(self):
+        if self._grade is None and self.usar_numpy():
+            self._grade = criar_grade(self.obter_celulas_compactas(), self.largura, self.altura)
+        return self._grade
+
+    # Valores de h de todas as casas até a saída, ou None sem o NumPy; valem mesmo após alterar casas
+    def obter_campo_h(self, saida):
+        if not self.usar_numpy():
+            return None
+        chave = (saida['x'], saida['y'])
+        if chave not in self._campos_h:
+            if len(self._campos_h) >= Cenario.MAXIMO_CAMPOS_H:
+                del self._campos_h[next(iter(self._campos_h))]
+            self._campos_h[chave] = calcular_campo_h(self.largura, self.altura, saida)
+        return self._campos_h[chave]
+
+    # Resumo do conteúdo do cenário: cenários com as mesmas casas têm a mesma impressão digital
+    def obter_impressao_digital(self):
+        if self._impressao_digital is None:
+            resumo = hashlib.blake2b(self.obter_celulas_compactas(), digest_size=16)
+            resumo.update(f'{self.largura}x{self.altura}'.encode('ascii'))
+            self._impressao_digital = resumo.hexdigest()
+        return self._impressao_digital
+
+    # Trocar o tipo de uma casa, mantendo atualizadas as estruturas derivadas do cenário
+    def alterar_celula(self, x, y, celula):
+        anterior = self.matriz_cenario[y][x]
+        self.matriz_cenario[y][x] = celula
+        self.versao += 1
+        self._impressao_digital = None
+        self._marcos = None
+        if self._celulas is not None:
+            indice = y * self.largura + x
+            self._celulas[indice] = ord(celula)
+            if self._indice_adjacencia is not None:
+                self._indice_adjacencia.atualizar_casa(self._celulas, indice)
+            if self._componentes is not None:
+                self._componentes.atualizar_casa(self._celulas, indice, ord(anterior))
+
+        if celula == Celula.PERSONAGEM:
+            self.personagem_posicao = {'x': x, 'y': y}
+        elif celula == Celula.SAIDA:
+            self.saida_posicao = {'x': x, 'y': y}
+        if anterior in (Celula.PERSONAGEM, Celula.SAIDA) and anterior != celula:
+            self.localizar_personagem_e_saida()
+
     # Encontrar coordenadas do personagem e saída
     def localizar_personagem_e_saida(self):
+        grade = self.obter_grade()
+        if grade is not None:
+            self.personagem_posicao = localizar_ultima(grade, Celula.PERSONAGEM)
+            self.saida_posicao = localizar_ultima(grade, Celula.SAIDA)
+            return
+
+        self.personagem_posicao = self.saida_posicao = None
         for x in range(self.largura):
             for y in range(self.altura):
                 if self.obter_celula(x, y) == Celula.PERSONAGEM:
@@ -63,6 +187,36 @@ class Cenario:
                 elif self.obter_celula(x, y) == Celula.SAIDA:
                     self.saida_posicao = {'x': x, 'y': y}
 
+    # Coordenadas de todas as casas com a célula, no formato {'x': x, 'y': y}
+    def localizar_casas(self, celula):
+        grade = self.obter_grade()
+        if grade is not None:
+            return [{'x': int(x), 'y': int(y)} for x, y in localizar_celulas(grade, celula)]
+        return [{'x': x, 'y': y} for x in range(self.largura) for y in range(self.altura)
+                if self.obter_celula(x, y) == celula]
+
+    def localizar_frutas(self):
+        return self.localizar_casas(Celula.FRUTA)
+
+    # Todas as saídas do cenário; saida_posicao guarda só a última
+    def localizar_saidas(self):
+        return self.localizar_casas(Celula.SAIDA)
+
+    # A grade e os campos de h são visões sobre outros buffers e não podem ser serializados, e os marcos guardam
+    # as células. Ao copiar o cenário para outro processo, eles ficam de fora e são refeitos quando forem usados
+    def __getstate__(self):
+        estado = {nome: getattr(self, nome) for nome in Cenario.__slots__}
+        estado['_grade'] = None
+        estado['_campos_h'] = {}
+        estado['_marcos'] = None
+        if isinstance(self.matriz_cenario, MatrizPlana):
+            estado['_celulas'] = None  # A matriz é copiada (ou mapeada de novo) e as células voltam a vir dela
+        return estado
+
+    def __setstate__(self, estado):
+        for nome, valor in estado.items():
+            setattr(self, nome, valor)
+
     def __iter__(self):
         for y in range(self.altura):
             for x in range(self.largura):
@@ -71,25 +225,36 @@ class Cenario:
 
 # Lógica principal do algoritmo A*
 class EstadoDaProcura:
-    __slots__ = ['casas_abertas', 'casas_fechadas', 'menores_f', 'personagem', 'saida', "historico"]
+    __slots__ = ['casas_abertas', 'casas_fechadas', 'menores_f', 'personagem', 'saida', "historico",
+                 'registrar_evento', 'campo_h', 'largura', 'estatisticas']
 
-    def __init__(self, casa_inicial, saida):
+    def __init__(self, casa_inicial, saida, historico, registrar_evento, campo_h=None, largura=0,
+                 motor=Motor.PADRAO):
         self.casas_abertas = []  # Caminhos que precisam ser explorados
         heapq.heappush(self.casas_abertas, (casa_inicial.f, casa_inicial))
-        self.casas_fechadas = set()  # Caminhos já percorridos pelo personagem
-        self.menores_f = {(casa_inicial.posicao.x, casa_inicial.posicao.y): casa_inicial.f}
+        self.casas_fechadas = set()  # Caminhos já percorridos pelo personagem, por (x, y, tem_fruta)
+        self.menores_f = {casa_inicial.chave(): casa_inicial.f}
         self.personagem = casa_inicial
         self.saida = saida
-        self.historico = []  # Armazenar menor caminho encontrado
+        self.historico = historico  # Eventos guardados conforme o modo de histórico (None se nada for guardado)
+        self.registrar_evento = registrar_evento  # Chamada com (casa, operação) a cada evento, se houver
+        self.campo_h = campo_h  # Valores de h já calculados para todas as casas, se houver
+        self.largura = largura
+        self.estatisticas = EstatisticasDaProcura(motor)
 
     # Encontrar casa com menor caminho da lista de caminhos para explorar usando fila de prioridade
     def buscar_proximo(self):
+        estatisticas = self.estatisticas
+        if len(self.casas_abertas) > estatisticas.pico_abertas:  # A fila só cresce entre duas retiradas
+            estatisticas.pico_abertas = len(self.casas_abertas)
         while self.casas_abertas:
             _, casa = heapq.heappop(self.casas_abertas)
-            if (casa.posicao.x, casa.posicao.y) in self.casas_fechadas:
+            if casa.chave() in self.casas_fechadas:
+                estatisticas.retiradas_obsoletas += 1
                 continue
-            self.casas_fechadas.add((casa.posicao.x, casa.posicao.y))
-            self.historico.append((casa, OPERACAO.CASA_FECHADA))
+            self.casas_fechadas.add(casa.chave())
+            if self.registrar_evento:
+                self.registrar_evento(casa, OPERACAO.CASA_FECHADA)
             self.personagem = casa
             return casa
         return None
@@ -98,22 +263,44 @@ class EstadoDaProcura:
     def achou_saida(self):
         return self.personagem.posicao.x == self.saida.x and self.personagem.posicao.y == self.saida.y
 
+    # Distância até a saída, lida do campo pré-calculado quando ele existe
+    def calcular_h(self, posicao):
+        if self.campo_h is None:
+            return calcular_h(posicao, self.saida)
+        return self.campo_h[posicao.y * self.largura + posicao.x]
+
     # Personagem achou a saída
     def pegar_saida(self):
-        return self.personagem if self.personagem.posicao.celula == Celula.SAIDA else None
+        return self.personagem if self.achou_saida() else None
 
-    # Pegar uma casa no cenário já explorada
-    def casa_fechada(self, posicao_vizinha):
-        return (posicao_vizinha.x, posicao_vizinha.y) in self.casas_fechadas
+    # Pegar uma casa no cenário já explorada com o mesmo estado de fruta
+    def casa_fechada(self, posicao_vizinha, tem_fruta):
+        return (posicao_vizinha.x, posicao_vizinha.y, tem_fruta) in self.casas_fechadas
 
     # Casa encontrada pode ser um novo caminho para ser percorrido
     def registrar_casa_aberta(self, casa):
-        chave = (casa.posicao.x, casa.posicao.y)
+        chave = casa.chave()
         f_existente = self.menores_f.get(chave, None)
         if not f_existente or casa.f < f_existente:
             self.menores_f[chave] = casa.f
             heapq.heappush(self.casas_abertas, (casa.f, casa))
-            self.historico.append((casa, OPERACAO.CASA_ABERTA))
+            if self.registrar_evento:
+                self.registrar_evento(casa, OPERACAO.CASA_ABERTA)
+
+    # Completar as estatísticas pelo estado final: toda entrada inserida foi retirada (fechada ou obsoleta) ou
+    # continua na fila, e cada estado em menores_f foi inserido pela primeira vez uma única vez
+    def finalizar_estatisticas(self):
+        estatisticas = self.estatisticas
+        estatisticas.expandidas = len(self.casas_fechadas)
+        estatisticas.insercoes = estatisticas.expandidas + estatisticas.retiradas_obsoletas + len(self.casas_abertas)
+        estatisticas.reaberturas = estatisticas.insercoes - len(self.menores_f)
+        casa = self.personagem
+        por_casa = estimar_bytes((casa.f, casa), casa, casa.posicao, casa.f) + 8  # Mais a referência na fila
+        estatisticas.pico_memoria_bytes = (
+                estimar_bytes(self.casas_abertas, self.casas_fechadas, self.menores_f)
+                + (estatisticas.pico_abertas + estatisticas.expandidas) * por_casa
+                + (len(self.casas_fechadas) + len(self.menores_f)) * estimar_bytes(casa.chave()))
+        return estatisticas
 
 
 # Função heurística, caminho total percorrido pelo personagem até a saída
@@ -131,7 +318,13 @@ def calcular_g(casa_pai, posicao_vizinha):
     return casa_pai.g + dist
 
 
-# Distância em linha reta para o final usando pitágoras
+# Personagem continua com a fruta até atravessar uma barreira, ou pega uma nova na casa com fruta
+def calcular_tem_fruta(casa_pai, posicao_vizinha):
+    return ((casa_pai.tem_fruta and posicao_vizinha.celula != Celula.BARREIRA)
+            or posicao_vizinha.celula == Celula.FRUTA)
+
+
+# Distância em linha reta para o final usando pitágoras; com diagonais de 1.4 pode passar do custo real
 def calcular_h(casa_atual, casa_saida):
     base = casa_saida.x - casa_atual.x
     altura = casa_saida.y - casa_atual.y
@@ -139,62 +332,123 @@ def calcular_h(casa_atual, casa_saida):
 
 
 # Verificar se a casa vizinha é valida
-def validar_casa(posicao_vizinha, estado_da_procura):
+def validar_casa(posicao_vizinha, tem_fruta, estado_da_procura):
     if posicao_vizinha.celula not in Celula.VALIDAS:
         return False
 
     barreira_impassavel = posicao_vizinha.celula == Celula.BARREIRA and not posicao_vizinha.pai.tem_fruta
-    if estado_da_procura.casa_fechada(posicao_vizinha) or barreira_impassavel:
+    if estado_da_procura.casa_fechada(posicao_vizinha, tem_fruta) or barreira_impassavel:
         return False
 
     return True
 
 
-# Criar personagem e saída
-def inicializar_estado_da_procura(cenario):
-    if not cenario.personagem_posicao or not cenario.saida_posicao:
+# Preparar onde os eventos da procura são guardados: lista de (Casa, operação), vetores de (índice, operação),
+# nada, ou uma função chamada com cada evento assim que ele acontece. Devolve (historico, registrar_evento)
+def preparar_historico(cenario, modo):
+    if callable(modo):
+        return None, modo
+    if modo == ModoHistorico.DESLIGADO:
+        return None, None
+    if modo == ModoHistorico.COMPACTO:
+        historico = HistoricoCompacto()
+        largura, total = cenario.largura, cenario.largura * cenario.altura
+
+        def indice_do_estado(casa):
+            return casa.posicao.y * largura + casa.posicao.x + (total if casa.tem_fruta else 0)
+
+        def registrar_evento(casa, operacao):
+            pai = casa.posicao.pai
+            historico.registrar(indice_do_estado(casa), CODIGOS_OPERACAO[operacao], casa.g,
+                                SEM_PAI if pai is None else indice_do_estado(pai))
+
+        return historico, registrar_evento
+
+    historico = []
+    return historico, lambda casa, operacao: historico.append((casa, operacao))
+
+
+# Resultado sem caminho, com o histórico vazio do modo pedido: sem início, sem saída ou saída inalcançável
+def resultado_vazio(cenario, motor, modo_historico):
+    return ResultadoDaProcura([], preparar_historico(cenario, modo_historico)[0], EstatisticasDaProcura(motor))
+
+
+# Criar personagem e saída. Sem posições informadas, usa as do personagem e da saída do cenário. Os ganchos,
+# se houver, são chamados pelo mesmo caminho dos eventos do histórico
+def inicializar_estado_da_procura(cenario, inicio=None, saida=None, modo_historico=ModoHistorico.COMPLETO,
+                                  ganchos=None, motor=Motor.PADRAO):
+    inicio = inicio or cenario.personagem_posicao
+    saida = saida or cenario.saida_posicao
+    if not inicio or not saida:
         return None
 
-    personagem_pos = PosicaoComContexto(cenario.personagem_posicao['x'], cenario.personagem_posicao['y'],
-                                        Celula.PERSONAGEM, None)
-    saida = PosicaoComContexto(cenario.saida_posicao['x'], cenario.saida_posicao['y'], Celula.SAIDA, None)
+    campo_h = cenario.obter_campo_h(saida)
+    personagem_pos = PosicaoComContexto(inicio['x'], inicio['y'], Celula.PERSONAGEM, None)
+    saida = PosicaoComContexto(saida['x'], saida['y'], Celula.SAIDA, None)
     personagem_h = calcular_h(personagem_pos, saida)
     personagem = Casa(personagem_pos, personagem_h, personagem_h, personagem_h, False)
 
-    return EstadoDaProcura(personagem, saida)
-
+    historico, registrar_evento = preparar_historico(cenario, modo_historico)
+    if ganchos is not None:
+        registrar_evento = ganchos.envolver(registrar_evento)
+    return EstadoDaProcura(personagem, saida, historico, registrar_evento, campo_h, cenario.largura, motor)
+
+
+# Executar algoritmo A*. Devolve um ResultadoDaProcura, que se desempacota em (caminho, histórico)
+def achar_caminho(cenario, motor=Motor.PADRAO, inicio=None, saida=None, historico=ModoHistorico.COMPLETO,
+                  ganchos=None):
+    if cenario.saida_inalcancavel(inicio, saida):
+        return resultado_vazio(cenario, motor, historico)
+    if motor == Motor.COMPACTO:
+        from src.busca_compacta import achar_caminho_compacto
+        return achar_caminho_compacto(cenario, inicio=inicio, saida=saida, modo_historico=historico, ganchos=ganchos)
+    if motor == Motor.SALTOS:
+        from src.busca_saltos import achar_caminho_por_saltos
+        return achar_caminho_por_saltos(cenario, inicio, saida, historico, ganchos)
+    if motor == Motor.BIDIRECIONAL:
+        from src.busca_bidirecional import achar_caminho_bidirecional
+        return achar_caminho_bidirecional(cenario, inicio, saida, historico, ganchos)
+    if motor == Motor.BALDES:
+        from src.busca_baldes import achar_caminho_em_baldes
+        return achar_caminho_em_baldes(cenario, inicio, saida, historico, ganchos)
+    if motor == Motor.MARCOS:
+        from src.busca_baldes import achar_caminho_em_baldes
+        from src.heuristica_marcos import heuristica_de_marcos
+        return achar_caminho_em_baldes(cenario, inicio, saida, historico, ganchos, heuristica_de_marcos, motor)
 
-# Executar algoritmo A*
-def achar_caminho(cenario):
     # Personagem e saída sendo criados para iniciar a procura
-    estado_da_procura = inicializar_estado_da_procura(cenario)
+    comeco = time.perf_counter()
+    estado_da_procura = inicializar_estado_da_procura(cenario, inicio, saida, historico, ganchos)
     if estado_da_procura is None:
-        return []
+        return resultado_vazio(cenario, motor, historico)
+    inicio_procura = time.perf_counter()
 
     # Percorrer casas encontradas durantre o caminho
     while estado_da_procura.casas_abertas:
         personagem = estado_da_procura.buscar_proximo()  # Personagem andou uma casa (a que tem menor fe)
+        if personagem is None:
+            break
         if estado_da_procura.achou_saida():
             break
 
         # Encontrar e preencher valores das casas vizinhas que o personagem pode andar
         for x, y in cenario.obter_coordenadas_vizinhas(personagem.posicao.x, personagem.posicao.y):
             posicao_vizinha = PosicaoComContexto(x, y, cenario.obter_celula(x, y), personagem)
+            tem_fruta = calcular_tem_fruta(personagem, posicao_vizinha)
 
-            if not validar_casa(posicao_vizinha, estado_da_procura):
+            if not validar_casa(posicao_vizinha, tem_fruta, estado_da_procura):
                 continue
 
             g = calcular_g(personagem, posicao_vizinha)
-            h = calcular_h(posicao_vizinha, estado_da_procura.saida)
+            h = estado_da_procura.calcular_h(posicao_vizinha)
             f = calcular_fe(g, h)
-            tem_fruta = ((personagem.tem_fruta and posicao_vizinha.celula != Celula.BARREIRA)
-                         or posicao_vizinha.celula == Celula.FRUTA)
             casa_vizinha = Casa(posicao_vizinha, f, g, h, tem_fruta)
 
             # Nova casa adicionada para ser explorada
             estado_da_procura.registrar_casa_aberta(casa_vizinha)
 
             # Reconstruir menor caminho encontrado do início até a saída
+    fim_procura = time.perf_counter()
     caminho_resultante = []
     atual = estado_da_procura.pegar_saida()
 
@@ -202,7 +456,48 @@ def achar_caminho(cenario):
         caminho_resultante.append(atual)
         atual = atual.posicao.pai
 
-    return list(reversed(caminho_resultante)), estado_da_procura.historico
+    caminho_resultante.reverse()
+
+    estatisticas = estado_da_procura.finalizar_estatisticas()
+    estatisticas.segundos_preparacao = inicio_procura - comeco
+    estatisticas.segundos_procura = fim_procura - inicio_procura
+    estatisticas.segundos_caminho = time.perf_counter() - fim_procura
+    return ResultadoDaProcura(caminho_resultante, estado_da_procura.historico, estatisticas)
+
+
+# Caminho em tuplas simples (x, y, celula, f, g, h, tem_fruta), fáceis de guardar ou enviar a outro processo
+def caminho_em_tuplas(caminho):
+    return [(casa.posicao.x, casa.posicao.y, casa.posicao.celula, casa.f, casa.g, casa.h, casa.tem_fruta)
+            for casa in caminho]
+
+
+# Refazer as Casas encadeadas por pai a partir das tuplas de caminho_em_tuplas
+def caminho_de_tuplas(dados):
+    caminho = []
+    pai = None
+    for x, y, celula, f, g, h, tem_fruta in dados:
+        pai = Casa(PosicaoComContexto(x, y, celula, pai), f, g, h, tem_fruta)
+        caminho.append(pai)
+    return caminho
+
+
+# Casas do caminho que passa pelas coordenadas (x, y) informadas, casa a casa a partir do início, com g, h, f e
+# fruta calculados como na procura. Usado pelos motores que não guardam uma Casa para cada casa do caminho
+def montar_caminho(cenario, coordenadas, saida):
+    saida = PosicaoComContexto(saida['x'], saida['y'], Celula.SAIDA, None)
+    caminho = []
+    for x, y in coordenadas:
+        if not caminho:
+            posicao = PosicaoComContexto(x, y, Celula.PERSONAGEM, None)
+            h = calcular_h(posicao, saida)
+            caminho.append(Casa(posicao, h, h, h, False))  # O personagem começa com f = g = h
+            continue
+        pai = caminho[-1]
+        posicao = PosicaoComContexto(x, y, cenario.obter_celula(x, y), pai)
+        g = calcular_g(pai, posicao)
+        h = calcular_h(posicao, saida)
+        caminho.append(Casa(posicao, calcular_fe(g, h), g, h, calcular_tem_fruta(pai, posicao)))
+    return caminho
 
 
 # Exibir menor caminho encontrado
@@ -217,14 +512,16 @@ def mostrar_menor_caminho_console(caminho):
 
 
 def main():
+    from src.criar_cenario import obter_cenario_gui  # O editor usa o pygame, que a procura não precisa
     #cenario = Cenario(CENARIO_PADRAO)
     cenario = Cenario(obter_cenario_gui())
     if not cenario.personagem_posicao or not cenario.saida_posicao:
         print('Erro! Sem personagem ou sem saída!')
-    caminho, historico = achar_caminho(cenario)
+        return
+    caminho, _ = achar_caminho(cenario, historico=ModoHistorico.DESLIGADO)
     mostrar_menor_caminho_console(caminho)
     from src.a_estrela_gui import mostrar_menor_caminho_gui
-    mostrar_menor_caminho_gui(caminho, historico, cenario)
+    mostrar_menor_caminho_gui(caminho, None, cenario)  # A interface anima a procura enquanto ela acontece
 
 
 if __name__ == '__main__':
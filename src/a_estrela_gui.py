@@ -4,11 +4,15 @@ from typing import Optional
 import pygame
 from pygame.font import Font
 
+from src.a_estrela import achar_caminho
+from src.cache_superficies import CacheDeSuperficies
 from src.constantes import Celula, TAMANHO_CELULA, TEMPO_ENTRE_ETAPAS_MS, FPS, TITULO, FONTE_NOME, \
     FONTE_TAMANHO, INSTRUCOES, Cores, CORES_CELULA
-from src.recursos import carregar_imagens
+from src.recursos import ImagensPreguicosas
 
-IMAGENS = carregar_imagens(TAMANHO_CELULA)
+IMAGENS = ImagensPreguicosas(TAMANHO_CELULA)
+
+ALTURA_INSTRUCOES = 60  # Espaço acima do cenário para as instruções
 
 
 # Definir estados principais do algoritmo
@@ -21,6 +25,7 @@ class Etapas(Enum):
 # Informações para controle do jogo
 class Estado:
     fonte: Optional[Font] = None
+    superficies: Optional[CacheDeSuperficies] = None
     etapa_atual = Etapas.ESPERANDO
     tela = None
     cenario = None
@@ -32,7 +37,9 @@ class Estado:
     tempo_acumulado = 0
     buffer_tela = None
     tamanho_janela = None
-    tamanho_tela_atual = None
+    tamanho_tela_atual = None  # Tamanho da tela quando o quadro inteiro foi desenhado pela última vez
+    instrucoes = None  # Instruções já desenhadas no tamanho original
+    instrucoes_na_tela = None  # Instruções redimensionadas para tamanho_tela_atual
 
 
 # Controla o tempo de espera entre as etapas
@@ -44,30 +51,70 @@ def esperar_proxima_acao():
     Estado.tempo_acumulado = 0
 
 
-def exibir_buffer(buffer):
-    largura, altura = buffer.get_size()
+# Desenhar as instruções uma única vez, na largura do buffer
+def desenhar_instrucoes(largura):
+    instrucoes = pygame.Surface((largura, ALTURA_INSTRUCOES))
+    instrucoes.fill(Cores.BRANCO)
+    fonte = pygame.font.SysFont(None, 24)
+    for i, texto in enumerate(INSTRUCOES):
+        img_texto = fonte.render(texto, True, Cores.PRETO)
+        instrucoes.blit(img_texto, (10, i * 20))
+    return instrucoes
 
-    altura_extra = 60
 
-    # Cria um novo buffer com espaço extra no topo
-    buffer_completo = pygame.Surface((largura, altura + altura_extra))
+# Retângulo da tela que mostra um retângulo do buffer. As bordas são convertidas sempre da mesma forma, então
+# as áreas de casas vizinhas se encaixam sem sobras nem falhas, como no quadro inteiro
+def area_na_tela(area):
+    largura, altura = Estado.tamanho_tela_atual
+    escala_x = largura / Estado.tamanho_janela[0]
+    escala_y = altura / (Estado.tamanho_janela[1] + ALTURA_INSTRUCOES)
+    esquerda, direita = int(area.left * escala_x), int(area.right * escala_x)
+    topo = int((area.top + ALTURA_INSTRUCOES) * escala_y)
+    base = int((area.bottom + ALTURA_INSTRUCOES) * escala_y)
+    return pygame.Rect(esquerda, topo, direita - esquerda, base - topo)
 
-    buffer_completo.fill(Cores.BRANCO, pygame.Rect(0, 0, largura, altura_extra))
 
-    # Mostrar texto
-    fonte = pygame.font.SysFont(None, 24)
-    for i, texto in enumerate(INSTRUCOES):
-        img_texto = fonte.render(texto, True, Cores.PRETO)
-        buffer_completo.blit(img_texto, (10, i * 20))
+# Copiar uma área do buffer para a tela, redimensionando apenas quando a janela não está no tamanho original
+def copiar_para_tela(buffer, area):
+    destino = area_na_tela(area)
+    if destino.size == area.size:
+        Estado.tela.blit(buffer, destino, area)
+    elif destino.width > 0 and destino.height > 0:
+        Estado.tela.blit(pygame.transform.scale(buffer.subsurface(area), destino.size), destino)
+    return destino
 
-    # Copia o buffer principal abaixo das instruções
-    buffer_completo.blit(buffer, (0, altura_extra))
 
-    # Exibe na tela principal redimensionando para caber
-    Estado.tela.blit(pygame.transform.scale(buffer_completo, Estado.tela.get_size()), (0, 0))
+# Desenhar o quadro inteiro (instruções e cenário) na tela. Usado quando tudo muda ou a janela muda de tamanho
+def exibir_buffer(buffer):
+    largura, _ = buffer.get_size()
+    if Estado.instrucoes is None:
+        Estado.instrucoes = desenhar_instrucoes(largura)
+
+    tamanho_tela = Estado.tela.get_size()
+    if Estado.instrucoes_na_tela is None or Estado.tamanho_tela_atual != tamanho_tela:
+        Estado.tamanho_tela_atual = tamanho_tela
+        area_instrucoes = area_na_tela(pygame.Rect(0, -ALTURA_INSTRUCOES, largura, ALTURA_INSTRUCOES))
+        Estado.instrucoes_na_tela = pygame.transform.scale(Estado.instrucoes, area_instrucoes.size)
+
+    Estado.tela.blit(Estado.instrucoes_na_tela, (0, 0))
+    copiar_para_tela(buffer, buffer.get_rect())
     pygame.display.flip()
 
 
+# Mostrar na tela apenas as áreas do buffer que mudaram
+def exibir_areas(buffer, areas):
+    if Estado.tamanho_tela_atual != Estado.tela.get_size():
+        exibir_buffer(buffer)
+        return
+
+    limites = buffer.get_rect()
+    pygame.display.update([copiar_para_tela(buffer, area.clip(limites)) for area in areas])
+
+
+def area_da_celula(x, y):
+    return pygame.Rect(x * TAMANHO_CELULA, y * TAMANHO_CELULA, TAMANHO_CELULA, TAMANHO_CELULA)
+
+
 # Exibir os valores da distância percorrida (g), distância em linha reta (h) e distância total percorrida/heurística (f)
 def exibir_valores_celula(buffer, casa):
     cor_fonte = CORES_CELULA['FONTE']
@@ -76,9 +123,9 @@ def exibir_valores_celula(buffer, casa):
     pos_x = x * TAMANHO_CELULA
     pos_y = y * TAMANHO_CELULA
 
-    texto_g = Estado.fonte.render(f"g: {casa.g:.1f}", True, cor_fonte)
-    texto_h = Estado.fonte.render(f"h: {casa.h:.1f}", True, cor_fonte)
-    texto_f = Estado.fonte.render(f"f: {casa.f:.1f}", True, cor_fonte)
+    texto_g = Estado.superficies.obter_texto(f"g: {casa.g:.1f}", cor_fonte)
+    texto_h = Estado.superficies.obter_texto(f"h: {casa.h:.1f}", cor_fonte)
+    texto_f = Estado.superficies.obter_texto(f"f: {casa.f:.1f}", cor_fonte)
 
     buffer.blit(texto_g, (pos_x + 2, pos_y + 2))
     buffer.blit(texto_h, (pos_x + 2, pos_y + TAMANHO_CELULA // 2 - 8))
@@ -109,7 +156,6 @@ def ouvir_eventos(processando_etapa=True):
             exit()
 
         if evento.type == pygame.VIDEORESIZE:
-            Estado.tamanho_tela_atual = evento.size
             exibir_buffer(Estado.buffer_tela)
         # Espaço executa o algoritmo e "m" altera o modo: executar passo a passo ou não
         if evento.type == pygame.KEYDOWN:
@@ -130,7 +176,7 @@ def ouvir_eventos(processando_etapa=True):
 # Desenhar uma célula/quadradinho da interface usando imagens, se não tiver, usa a cor correspondente
 def desenhar_celula(buffer, posicao):
     x, y, celula = posicao.x, posicao.y, posicao.celula
-    area_celula = pygame.Rect(x * TAMANHO_CELULA, y * TAMANHO_CELULA, TAMANHO_CELULA, TAMANHO_CELULA)
+    area_celula = area_da_celula(x, y)
     pos_pixel = (x * TAMANHO_CELULA, y * TAMANHO_CELULA)
 
     pygame.draw.rect(buffer, CORES_CELULA[Celula.VAZIA], area_celula)
@@ -146,45 +192,58 @@ def desenhar_celula(buffer, posicao):
 # Desennar cor transparente para não sobrepor as imagens
 def desenhar_cor_transparente(buffer, casa, cor_rgba):
     x, y = casa.posicao.x, casa.posicao.y
-    sobreposicao = pygame.Surface((TAMANHO_CELULA, TAMANHO_CELULA), pygame.SRCALPHA)
-    sobreposicao.fill(cor_rgba)
-    buffer.blit(sobreposicao, (x * TAMANHO_CELULA, y * TAMANHO_CELULA))
+    buffer.blit(Estado.superficies.obter_sobreposicao(cor_rgba), (x * TAMANHO_CELULA, y * TAMANHO_CELULA))
 
 
-# Animação de buscar o caminho, colorindo as células/quadradinhos e verificando modo escolhido pelo usuário
-def animar_busca(buffer, cenario, historico):
-    desenhar_cenario(buffer, cenario)
+# Redesenhar a casa com a cor do evento por cima e os valores g, h e f
+def desenhar_casa_anotada(buffer, cenario, casa, cor_rgba):
+    posicao_atual = cenario.obter_posicao_com_contexto(casa.posicao.x, casa.posicao.y)
+    desenhar_celula(buffer, posicao_atual)
+    desenhar_cor_transparente(buffer, casa, cor_rgba)
+    exibir_valores_celula(buffer, casa)
 
-    for casa, tipo_operacao in historico:
-        if Estado.passo_a_passo:
-            Estado.esperando_proximo_passo = True
-        else:
-            ouvir_eventos()
 
-        while Estado.esperando_proximo_passo:
-            ouvir_eventos()
+# Colorir a célula de um evento da busca (casa aberta ou fechada), verificando modo escolhido pelo usuário
+def animar_etapa_busca(buffer, cenario, casa, tipo_operacao):
+    if Estado.passo_a_passo:
+        Estado.esperando_proximo_passo = True
+    else:
+        ouvir_eventos()
 
-        posicao_atual = cenario.obter_posicao_com_contexto(casa.posicao.x, casa.posicao.y)
-        desenhar_celula(buffer, posicao_atual)
-        desenhar_cor_transparente(buffer, casa, CORES_CELULA[tipo_operacao])
-        exibir_valores_celula(buffer, casa)
-        exibir_buffer(buffer)
+    while Estado.esperando_proximo_passo:
+        ouvir_eventos()
+
+    desenhar_casa_anotada(buffer, cenario, casa, CORES_CELULA[tipo_operacao])
+    exibir_areas(buffer, [area_da_celula(casa.posicao.x, casa.posicao.y)])
+
+    if not Estado.passo_a_passo:
+        esperar_proxima_acao()
 
-        if not Estado.passo_a_passo:
-            esperar_proxima_acao()
+
+# Animação de buscar o caminho, colorindo as células/quadradinhos. Sem histórico gravado, a procura é feita
+# agora e cada evento é desenhado assim que acontece, sem esperar a procura terminar
+def animar_busca(buffer, cenario, historico):
+    desenhar_cenario(buffer, cenario)
+
+    if historico is None:
+        resultado = achar_caminho(cenario, historico=lambda casa, tipo_operacao: animar_etapa_busca(
+            buffer, cenario, casa, tipo_operacao))
+        Estado.caminho = resultado[0]
+    else:
+        for casa, tipo_operacao in historico:
+            animar_etapa_busca(buffer, cenario, casa, tipo_operacao)
 
     for casa in Estado.caminho:
-        posicao_atual = cenario.obter_posicao_com_contexto(casa.posicao.x, casa.posicao.y)
-        desenhar_celula(buffer, posicao_atual)
-        desenhar_cor_transparente(buffer, casa, CORES_CELULA['CAMINHO_FINAL'])
-        exibir_valores_celula(buffer, casa)
-        exibir_buffer(buffer)
+        desenhar_casa_anotada(buffer, cenario, casa, CORES_CELULA['CAMINHO_FINAL'])
+        exibir_areas(buffer, [area_da_celula(casa.posicao.x, casa.posicao.y)])
 
 
-# Desenhar a animação do personagem percorrendo o menor caminho encontrado pelo algoritmo
-def desenhar_caminho_final(buffer, cenario, caminho):
-    cenario_fundo = pygame.Surface((buffer.get_width(), buffer.get_height()))
-    desenhar_cenario(cenario_fundo, cenario)
+# Fundo da caminhada do personagem: o cenário sem o personagem na posição inicial e o caminho destacado
+def desenhar_fundo_caminho_final(tamanho, cenario, caminho):
+    cenario_fundo = pygame.Surface(tamanho)
+    cenario_fundo.fill(Cores.BRANCO)
+    for posicao in cenario:
+        desenhar_celula(cenario_fundo, posicao)
 
     # Correção visual para o personagem não ficar na posição inicial depois de começar a andar
     posicao_personagem = caminho[0].posicao._replace(celula=Celula.VAZIA)
@@ -192,11 +251,40 @@ def desenhar_caminho_final(buffer, cenario, caminho):
 
     for casa in caminho:
         desenhar_cor_transparente(cenario_fundo, casa, CORES_CELULA['CAMINHO_FINAL'])
+    return cenario_fundo
+
+
+# Frames do personagem no passo que sai da casa atual. Se ele acabou de pegar a fruta, ela é tirada do fundo e
+# a área alterada é devolvida junto, como (frames, área ou None)
+def preparar_passo(cenario_fundo, casa_atual, frames_animacao):
+    # Mudar aparência do personagem para indicar que ele pegou a fruta + tirar fruta da tela
+    if not casa_atual.tem_fruta:
+        return IMAGENS['ANIMACAO_PERSONAGEM'], None
+    if casa_atual.posicao.celula == Celula.FRUTA:
+        posicao_fruta = casa_atual.posicao._replace(celula=Celula.VAZIA)
+        desenhar_celula(cenario_fundo, posicao_fruta)
+        desenhar_cor_transparente(cenario_fundo, casa_atual, CORES_CELULA['CAMINHO_FINAL'])
+        return IMAGENS['ANIMACAO_PERSONAGEM_FRUTA'], area_da_celula(casa_atual.posicao.x, casa_atual.posicao.y)
+    return frames_animacao, None
 
+
+# Posição em pixels do personagem entre duas casas, com o progresso do passo entre 0 e 1
+def interpolar_posicao(casa_atual, casa_posterior, progresso):
+    x1, y1 = casa_atual.posicao.x * TAMANHO_CELULA, casa_atual.posicao.y * TAMANHO_CELULA
+    x2, y2 = casa_posterior.posicao.x * TAMANHO_CELULA, casa_posterior.posicao.y * TAMANHO_CELULA
+    return x1 + (x2 - x1) * progresso, y1 + (y2 - y1) * progresso
+
+
+# Desenhar a animação do personagem percorrendo o menor caminho encontrado pelo algoritmo
+def desenhar_caminho_final(buffer, cenario, caminho):
+    cenario_fundo = desenhar_fundo_caminho_final(buffer.get_size(), cenario, caminho)
+    buffer.blit(cenario_fundo, (0, 0))
     exibir_buffer(buffer)
 
     frames_animacao = IMAGENS['ANIMACAO_PERSONAGEM']
     posicao = None
+    # Áreas do buffer a restaurar com o fundo no próximo quadro: onde o personagem estava e a fruta pega
+    areas_sujas = []
 
     for casa_atual, casa_posterior in zip(caminho, caminho[1:]):
         posicao = (
@@ -204,14 +292,9 @@ def desenhar_caminho_final(buffer, cenario, caminho):
             casa_posterior.posicao.y * TAMANHO_CELULA
         )
 
-        # Mudar aparência do personagem para indicar que ele pegou a fruta + tirar fruta da tela
-        if not casa_atual.tem_fruta:
-            frames_animacao = IMAGENS['ANIMACAO_PERSONAGEM']
-        elif casa_atual.posicao.celula == Celula.FRUTA:
-            posicao_fruta = casa_atual.posicao._replace(celula=Celula.VAZIA)
-            desenhar_celula(cenario_fundo, posicao_fruta)
-            desenhar_cor_transparente(cenario_fundo, casa_atual, CORES_CELULA['CAMINHO_FINAL'])
-            frames_animacao = IMAGENS['ANIMACAO_PERSONAGEM_FRUTA']
+        frames_animacao, area_fruta = preparar_passo(cenario_fundo, casa_atual, frames_animacao)
+        if area_fruta:
+            areas_sujas.append(area_fruta)
 
         tempo_passado = 0
         tempo_espera = TEMPO_ENTRE_ETAPAS_MS * len(frames_animacao)
@@ -227,20 +310,18 @@ def desenhar_caminho_final(buffer, cenario, caminho):
                 progresso = tempo_passado / tempo_espera
                 progresso = min(progresso, 1.0)
 
-                x1, y1 = casa_atual.posicao.x * TAMANHO_CELULA, casa_atual.posicao.y * TAMANHO_CELULA
-                x2, y2 = casa_posterior.posicao.x * TAMANHO_CELULA, casa_posterior.posicao.y * TAMANHO_CELULA
-                x_interpolado = x1 + (x2 - x1) * progresso
-                y_interpolado = y1 + (y2 - y1) * progresso
-
-                buffer.blit(cenario_fundo, (0, 0))
-                buffer.blit(frame, (x_interpolado, y_interpolado))
-                exibir_buffer(buffer)
+                for area in areas_sujas:
+                    buffer.blit(cenario_fundo, area, area)
+                area_personagem = buffer.blit(frame, interpolar_posicao(casa_atual, casa_posterior, progresso))
+                exibir_areas(buffer, areas_sujas + [area_personagem])
+                areas_sujas = [area_personagem]
                 ouvir_eventos(True)
 
     # Exibir o personagem parado na última posição
-    buffer.blit(cenario_fundo, (0, 0))
-    buffer.blit(frames_animacao[0], posicao)
-    exibir_buffer(buffer)
+    for area in areas_sujas:
+        buffer.blit(cenario_fundo, area, area)
+    area_personagem = buffer.blit(frames_animacao[0], posicao)
+    exibir_areas(buffer, areas_sujas + [area_personagem])
     esperar_proxima_acao()
 
 
@@ -259,9 +340,16 @@ def iniciar_tela(cenario):
     altura = cenario.altura * TAMANHO_CELULA
     Estado.tamanho_janela = (largura, altura)
     Estado.buffer_tela = pygame.Surface(Estado.tamanho_janela)
-    Estado.tela = pygame.display.set_mode(Estado.tamanho_janela, pygame.RESIZABLE)
+    # A janela já abre com espaço para as instruções, então o buffer é copiado para a tela sem redimensionar
+    Estado.tela = pygame.display.set_mode((largura, altura + ALTURA_INSTRUCOES), pygame.RESIZABLE)
+    Estado.instrucoes = None
+    Estado.instrucoes_na_tela = None
     pygame.display.set_caption(TITULO)
     Estado.fonte = pygame.font.SysFont(FONTE_NOME, FONTE_TAMANHO)
+    if Estado.superficies is None:
+        Estado.superficies = CacheDeSuperficies(TAMANHO_CELULA, Estado.fonte)
+    else:
+        Estado.superficies.configurar(TAMANHO_CELULA, Estado.fonte)
 
 
 # Mostrar visualmente algoritmo procurando o menor caminho
@@ -0,0 +1,222 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from src.a_estrela import Cenario, achar_caminho
+from src.constantes import Motor, ModoHistorico
+from src.gerador_cenarios import GERADORES, gerar_cenario
+from src.grade_numpy import NUMPY_DISPONIVEL
+
+MOTORES = (Motor.PADRAO, Motor.COMPACTO, Motor.SALTOS, Motor.BIDIRECIONAL, Motor.BALDES,
+           Motor.MARCOS)
+TAMANHOS_PADRAO = (10, 100, 500)
+
+# Medidas que indicam piora quando aumentam, comparadas entre dois relatórios
+MEDIDAS_COMPARADAS = ('segundos_mediana', 'casas_expandidas', 'insercoes_na_fila', 'pico_memoria_bytes')
+
+# Módulos da procura, usados por processos sem interface: importar qualquer um deles não pode iniciar o pygame
+# nem passar do orçamento de tempo
+MODULOS_NUCLEO = ('src.a_estrela', 'src.busca_compacta', 'src.busca_saltos', 'src.busca_bidirecional',
+                  'src.busca_baldes', 'src.busca_em_lote', 'src.cache_caminhos', 'src.mapa_binario',
+                  'src.planejador_incremental', 'src.planejador_hierarquico', 'src.campo_fluxo',
+                  'src.heuristica_marcos', 'src.indice_componentes', 'src.busca_objetivos')
+ORCAMENTO_IMPORTACAO_MS = 60
+MODULOS_PROIBIDOS = ('pygame', 'numpy')
+CODIGO_IMPORTACAO = ('import json, sys, time\n'
+                     'comeco = time.perf_counter()\n'
+                     'import {modulo}\n'
+                     'carregados = [m for m in {proibidos!r} if m in sys.modules]\n'
+                     'print(json.dumps([time.perf_counter() - comeco, carregados]))')
+
+
+# Commit atual do repositório, para saber de qual versão do código é cada relatório
+def obter_versao():
+    try:
+        resultado = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                   timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return 'desconhecida'
+    return resultado.stdout.strip() or 'desconhecida'
+
+
+def obter_metadados():
+    return {
+        'versao': obter_versao(),
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'numpy': NUMPY_DISPONIVEL,
+    }
+
+
+# Medir um motor em um cenário: contagens pelas estatísticas da procura, tempo com o histórico desligado e pico
+# de memória em uma execução separada (o tracemalloc deixa a procura mais lenta)
+def medir_motor(cenario, motor, repeticoes):
+    resultado = achar_caminho(cenario, motor, historico=ModoHistorico.DESLIGADO)
+    caminho, estatisticas = resultado[0], resultado.estatisticas
+
+    tempos = []
+    for _ in range(repeticoes):
+        comeco = time.perf_counter()
+        achar_caminho(cenario, motor, historico=ModoHistorico.DESLIGADO)
+        tempos.append(time.perf_counter() - comeco)
+
+    tracemalloc.start()
+    try:
+        achar_caminho(cenario, motor, historico=ModoHistorico.DESLIGADO)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mediana = statistics.median(tempos)
+    return {
+        'motor': motor,
+        'caminho_encontrado': bool(caminho),
+        'custo': round(caminho[-1].g, 6) if caminho else None,
+        'tamanho_caminho': len(caminho),
+        'casas_expandidas': estatisticas.expandidas,
+        'insercoes_na_fila': estatisticas.insercoes,
+        'retiradas_obsoletas': estatisticas.retiradas_obsoletas,
+        'pico_abertas': estatisticas.pico_abertas,
+        'pico_memoria_bytes': pico,
+        'segundos_min': min(tempos),
+        'segundos_mediana': mediana,
+        'caminhos_por_segundo': 1 / mediana if mediana > 0 else None,
+        'repeticoes': repeticoes,
+    }
+
+
+# Executar todas as combinações de tipo de cenário, tamanho e motor. Cada cenário é gerado uma única vez e
+# usado por todos os motores
+def executar(tipos, tamanhos, motores, repeticoes=3, semente=0, progresso=None):
+    resultados = []
+    for tipo in tipos:
+        for tamanho in tamanhos:
+            comeco = time.perf_counter()
+            matriz = gerar_cenario(tipo, tamanho, tamanho, semente)
+            segundos_geracao = time.perf_counter() - comeco
+            comeco = time.perf_counter()
+            cenario = Cenario(matriz)
+            segundos_preparo = time.perf_counter() - comeco
+
+            for motor in motores:
+                medida = medir_motor(cenario, motor, repeticoes)
+                resultado = {'cenario': tipo, 'largura': tamanho, 'altura': tamanho, 'semente': semente,
+                             'segundos_geracao': segundos_geracao, 'segundos_preparo': segundos_preparo, **medida}
+                resultados.append(resultado)
+                if progresso:
+                    progresso(resultado)
+    return {'metadados': obter_metadados(), 'resultados': resultados}
+
+
+# Tempo de importação de cada módulo em um interpretador novo (o menor de algumas repetições, para descontar o
+# ruído da máquina) e os módulos pesados que ele carregou
+def medir_importacao(modulos=MODULOS_NUCLEO, repeticoes=5):
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    resultados = []
+    for modulo in modulos:
+        codigo = CODIGO_IMPORTACAO.format(modulo=modulo, proibidos=MODULOS_PROIBIDOS)
+        tempos = []
+        for _ in range(repeticoes):
+            saida = subprocess.run([sys.executable, '-c', codigo], cwd=raiz, capture_output=True, text=True,
+                                   check=True).stdout
+            segundos, carregados = json.loads(saida)
+            tempos.append(segundos)
+        resultados.append({'modulo': modulo, 'milissegundos': min(tempos) * 1000, 'carregados': carregados})
+    return resultados
+
+
+# Módulos que passaram do orçamento ou carregaram algum módulo proibido
+def verificar_importacao(resultados, orcamento_ms=ORCAMENTO_IMPORTACAO_MS):
+    return [resultado for resultado in resultados
+            if resultado['milissegundos'] > orcamento_ms or resultado['carregados']]
+
+
+def _chave(resultado):
+    return resultado['cenario'], resultado['largura'], resultado['altura'], resultado['semente'], resultado['motor']
+
+
+# Medidas que pioraram mais que a tolerância (0.1 = 10%) entre o relatório base e o atual, como tuplas
+# (cenário, largura, altura, semente, motor, medida, valor base, valor atual)
+def comparar_relatorios(base, atual, tolerancia=0.1):
+    anteriores = {_chave(resultado): resultado for resultado in base['resultados']}
+    pioras = []
+    for resultado in atual['resultados']:
+        anterior = anteriores.get(_chave(resultado))
+        if anterior is None:
+            continue
+        for medida in MEDIDAS_COMPARADAS:
+            valor_base, valor_atual = anterior.get(medida), resultado.get(medida)
+            if valor_base is None or valor_atual is None:
+                continue
+            if valor_atual > valor_base * (1 + tolerancia):
+                pioras.append((*_chave(resultado), medida, valor_base, valor_atual))
+    return pioras
+
+
+def _mostrar_resultado(resultado):
+    print(f'{resultado["cenario"]:>11} {resultado["largura"]:>5}x{resultado["altura"]:<5} {resultado["motor"]:>12} '
+          f'{resultado["casas_expandidas"]:>9} {resultado["insercoes_na_fila"]:>9} '
+          f'{resultado["pico_memoria_bytes"] / 1024:>10.0f} {resultado["segundos_mediana"]:>9.4f} '
+          f'{resultado["caminhos_por_segundo"] or 0:>9.1f}', file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos motores do A* em cenários gerados.')
+    parser.add_argument('--cenarios', nargs='+', choices=list(GERADORES), default=list(GERADORES))
+    parser.add_argument('--tamanhos', nargs='+', type=int, default=list(TAMANHOS_PADRAO))
+    parser.add_argument('--motores', nargs='+', choices=MOTORES, default=list(MOTORES))
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', help='arquivo JSON do relatório (padrão: saída padrão)')
+    parser.add_argument('--comparar', metavar='BASE', help='relatório JSON anterior para detectar pioras')
+    parser.add_argument('--tolerancia', type=float, default=0.1)
+    parser.add_argument('--importacao', action='store_true',
+                        help='só medir o tempo de importação dos módulos da procura e conferir o orçamento')
+    parser.add_argument('--orcamento-ms', type=float, default=ORCAMENTO_IMPORTACAO_MS)
+    argumentos = parser.parse_args()
+
+    if argumentos.importacao:
+        resultados = medir_importacao()
+        for resultado in resultados:
+            print(f'{resultado["modulo"]:>28} {resultado["milissegundos"]:>8.1f} ms '
+                  f'{" ".join(resultado["carregados"])}', file=sys.stderr)
+        falhas = verificar_importacao(resultados, argumentos.orcamento_ms)
+        for falha in falhas:
+            print(f'Importação lenta ou pesada: {falha["modulo"]} ({falha["milissegundos"]:.1f} ms, orçamento '
+                  f'{argumentos.orcamento_ms:g} ms) {" ".join(falha["carregados"])}', file=sys.stderr)
+        if falhas:
+            sys.exit(1)
+        return
+
+    print(f'{"cenário":>11} {"tamanho":>11} {"motor":>12} {"expandidas":>9} {"inserções":>9} {"pico KiB":>10} '
+          f'{"mediana s":>9} {"cam/s":>9}', file=sys.stderr)
+    relatorio = executar(argumentos.cenarios, argumentos.tamanhos, argumentos.motores, argumentos.repeticoes,
+                         argumentos.semente, _mostrar_resultado)
+
+    if argumentos.saida:
+        with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2)
+    else:
+        json.dump(relatorio, sys.stdout, indent=2)
+        print()
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='utf-8') as arquivo:
+            base = json.load(arquivo)
+        pioras = comparar_relatorios(base, relatorio, argumentos.tolerancia)
+        for *chave, medida, valor_base, valor_atual in pioras:
+            print(f'Piora em {chave}: {medida} {valor_base} -> {valor_atual}', file=sys.stderr)
+        if pioras:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+import bisect
+import math
+import time
+from array import array
+
+from src.a_estrela import Casa, PosicaoComContexto, montar_caminho, resultado_vazio
+from src.busca_bidirecional import envolver_com_ganchos, preparar_historico
+from src.constantes import OPERACAO, Celula, Motor, ModoHistorico
+from src.estatisticas import EstatisticasDaProcura, ResultadoDaProcura, estimar_bytes
+from src.grafo_estados import INFINITO
+from src.historico import SEM_PAI
+
+BARREIRA = ord(Celula.BARREIRA)
+FRUTA = ord(Celula.FRUTA)
+
+# Todos os custos (1, 1.4, lentidão de 1) e os valores de h (uma casa decimal) são múltiplos de 0.1, a mesma
+# escala dos custos inteiros do grafo de estados e da procura bidirecional
+ESCALA = 10
+
+
+# Fila de prioridade em baldes (Dial), um balde de (g, estado) por f; no mesmo f, sai o maior g e o maior estado
+class FilaDeBaldes:
+    __slots__ = ['baldes', 'cursor', 'ordenado', 'tamanho', 'gs']
+
+    def __init__(self, gs):
+        self.baldes = []
+        self.cursor = 0
+        self.ordenado = -1  # Balde já ordenado por g, em que as inserções mantêm a ordem
+        self.tamanho = 0
+        self.gs = gs
+
+    def inserir(self, f, estado):
+        baldes = self.baldes
+        if f >= len(baldes):
+            baldes.extend([] for _ in range(f + 1 - len(baldes)))
+        if f == self.ordenado:
+            bisect.insort(baldes[f], (self.gs[estado], estado))  # Mantém a ordem do balde já ordenado
+        else:
+            baldes[f].append((self.gs[estado], estado))
+        self.tamanho += 1
+        if f < self.cursor:
+            self.cursor = f
+
+    # (f, estado) da entrada de menor f e maior g, ou None com a fila vazia
+    def retirar(self):
+        if not self.tamanho:
+            return None
+        baldes, cursor = self.baldes, self.cursor
+        while not baldes[cursor]:
+            cursor += 1
+        self.cursor = cursor
+        balde = baldes[cursor]
+        if self.ordenado != cursor:
+            balde.sort()
+            self.ordenado = cursor
+        self.tamanho -= 1
+        return cursor, balde.pop()[1]
+
+    def __len__(self):
+        return self.tamanho
+
+
+# Arestas do índice de adjacência com os custos multiplicados pela escala, por código de vizinhança
+def arestas_inteiras(indice_adjacencia):
+    return {codigo: tuple((deslocamento, round(custo * ESCALA)) for deslocamento, custo in arestas)
+            for codigo, arestas in indice_adjacencia.arestas.items()}
+
+
+# A* com custos inteiros e FilaDeBaldes; heurística (estado -> h) e objetivos opcionais
+class ProcuraEmBaldes:
+    __slots__ = ['cenario', 'celulas', 'largura', 'total', 'inicio', 'saida', 'objetivos', 'gs', 'menores_f',
+                 'pais', 'fechadas', 'hs', 'heuristica', 'fila', 'estatisticas']
+
+    def __init__(self, cenario, inicio, saida, heuristica=None, motor=Motor.BALDES, objetivos=None):
+        total = cenario.largura * cenario.altura
+        self.cenario = cenario
+        self.celulas = cenario.obter_celulas_compactas()
+        self.largura = cenario.largura
+        self.total = total
+        self.inicio = inicio['y'] * cenario.largura + inicio['x']
+        self.saida = saida['y'] * cenario.largura + saida['x']
+        self.objetivos = bytearray(total)
+        for casa in objetivos or (self.saida,):
+            self.objetivos[casa] = 1
+        self.gs = array('q', [0]) * (2 * total)
+        self.menores_f = array('q', [INFINITO]) * (2 * total)
+        self.pais = array('q', [SEM_PAI]) * (2 * total)
+        self.fechadas = bytearray(2 * total)
+        self.hs = array('q', [-1]) * (2 * total)  # Calculado quando o estado é visto pela primeira vez
+        self.heuristica = heuristica
+        self.fila = FilaDeBaldes(self.gs)
+        self.estatisticas = EstatisticasDaProcura(motor)
+
+    # Sem outra heurística, calcular_h multiplicado pela escala, arredondado como ele para uma casa decimal
+    def calcular_h(self, estado):
+        h = self.hs[estado]
+        if h < 0 and self.heuristica is not None:
+            h = self.hs[estado] = self.heuristica(estado)
+        elif h < 0:
+            largura, casa = self.largura, estado % self.total
+            distancia = math.hypot(self.saida % largura - casa % largura, self.saida // largura - casa // largura)
+            h = self.hs[estado] = round(round(distancia, 1) * ESCALA)
+        return h
+
+    # Executar a procura. Devolve o estado final na saída, ou None se ela não foi alcançada
+    def procurar(self, indice_adjacencia, registrar=None):
+        codigos, arestas = indice_adjacencia.codigos, arestas_inteiras(indice_adjacencia)
+        celulas, fechadas, gs, pais, menores_f = self.celulas, self.fechadas, self.gs, self.pais, self.menores_f
+        fila, total, estatisticas = self.fila, self.total, self.estatisticas
+        hs, calcular_h, inserir, objetivos = self.hs, self.calcular_h, fila.inserir, self.objetivos
+
+        # O motor original começa o personagem com g = h
+        inicio = self.inicio
+        if calcular_h(inicio) >= INFINITO:
+            return None
+        gs[inicio] = menores_f[inicio] = calcular_h(inicio)
+        inserir(gs[inicio], inicio)
+
+        while True:
+            if len(fila) > estatisticas.pico_abertas:  # A fila só cresce entre duas retiradas
+                estatisticas.pico_abertas = len(fila)
+            entrada = fila.retirar()
+            if entrada is None:
+                return None
+            f, atual = entrada
+            if fechadas[atual] or menores_f[atual] != f:
+                estatisticas.retiradas_obsoletas += 1
+                continue
+            fechadas[atual] = 1
+            g_atual = gs[atual]
+            if registrar:
+                registrar(atual, OPERACAO.CASA_FECHADA, g_atual, pais[atual])
+
+            fruta_atual, casa_atual = divmod(atual, total)
+            if objetivos[casa_atual]:
+                return atual
+
+            for deslocamento, custo in arestas[codigos[casa_atual]]:
+                vizinha = casa_atual + deslocamento
+                celula = celulas[vizinha]
+                if celula == BARREIRA and not fruta_atual:
+                    continue
+                tem_fruta = (fruta_atual and celula != BARREIRA) or celula == FRUTA
+                estado_vizinho = vizinha + total if tem_fruta else vizinha
+                if fechadas[estado_vizinho]:
+                    continue
+
+                h = hs[estado_vizinho]
+                if h < 0:
+                    h = calcular_h(estado_vizinho)
+                if h >= INFINITO:
+                    continue
+                g = g_atual + custo
+                f = g + h
+                if f < menores_f[estado_vizinho]:
+                    menores_f[estado_vizinho] = f
+                    gs[estado_vizinho] = g
+                    pais[estado_vizinho] = atual
+                    inserir(f, estado_vizinho)
+                    if registrar:
+                        registrar(estado_vizinho, OPERACAO.CASA_ABERTA, g, atual)
+
+    # Completar as estatísticas pelo estado final, como EstadoDaProcura.finalizar_estatisticas
+    def finalizar_estatisticas(self):
+        estatisticas, fechadas = self.estatisticas, self.fechadas
+        estatisticas.expandidas = fechadas.count(1)
+        estatisticas.insercoes = estatisticas.expandidas + estatisticas.retiradas_obsoletas + len(self.fila)
+        so_na_fila = {estado for balde in self.fila.baldes for _, estado in balde if not fechadas[estado]}
+        estatisticas.reaberturas = estatisticas.insercoes - estatisticas.expandidas - len(so_na_fila)
+        estatisticas.pico_memoria_bytes = (
+                estimar_bytes(self.gs, self.menores_f, self.pais, self.fechadas, self.hs, self.fila.baldes,
+                              *self.fila.baldes)
+                + estatisticas.pico_abertas * estimar_bytes(self.inicio))
+        return estatisticas
+
+    # Executar a procura com o histórico e os ganchos pedidos. Devolve o estado final e o ResultadoDaProcura, com
+    # o caminho até a casa do estado final (a saída, ou o objetivo alcançado)
+    def executar(self, indice_adjacencia, modo_historico, ganchos, comeco):
+        historico, registrar = preparar_historico(self, modo_historico)
+        if ganchos is not None:
+            registrar = envolver_com_ganchos(self, ganchos, registrar)
+        inicio_procura = time.perf_counter()
+        estado_final = self.procurar(indice_adjacencia, registrar)
+        fim_procura = time.perf_counter()
+
+        caminho = []
+        if estado_final is not None:
+            largura, total = self.largura, self.total
+            coordenadas = ((estado % total % largura, estado % total // largura)
+                           for estado in self.montar_estados(estado_final))
+            casa = estado_final % total
+            caminho = montar_caminho(self.cenario, coordenadas, {'x': casa % largura, 'y': casa // largura})
+
+        estatisticas = self.finalizar_estatisticas()
+        estatisticas.segundos_preparacao = inicio_procura - comeco
+        estatisticas.segundos_procura = fim_procura - inicio_procura
+        estatisticas.segundos_caminho = time.perf_counter() - fim_procura
+        return estado_final, ResultadoDaProcura(caminho, historico, estatisticas)
+
+    # Estados do início até o estado final, seguindo os pais
+    def montar_estados(self, estado_final):
+        estados = []
+        estado = estado_final
+        while estado != SEM_PAI:
+            estados.append(estado)
+            estado = self.pais[estado]
+        estados.reverse()
+        return estados
+
+    # Casa de um evento do histórico, com os valores de volta na escala original. O pai não é preenchido
+    def criar_casa(self, estado, g):
+        tem_fruta, casa = divmod(estado, self.total)
+        celula = Celula.PERSONAGEM if estado == self.inicio else chr(self.celulas[casa])
+        h = self.calcular_h(estado)
+        f = h if estado == self.inicio else g + h
+        return Casa(PosicaoComContexto(casa % self.largura, casa // self.largura, celula, None),
+                    f / ESCALA, g / ESCALA, h / ESCALA, bool(tem_fruta))
+
+
+# A* com custos inteiros e fila de baldes; heuristica é um provedor chamado com (cenario, saida)
+def achar_caminho_em_baldes(cenario, inicio=None, saida=None, modo_historico=ModoHistorico.COMPLETO, ganchos=None,
+                            heuristica=None, motor=Motor.BALDES):
+    comeco = time.perf_counter()
+    inicio = inicio or cenario.personagem_posicao
+    saida = saida or cenario.saida_posicao
+    if not inicio or not saida:
+        return resultado_vazio(cenario, motor, modo_historico)
+
+    indice_adjacencia = cenario.obter_indice_adjacencia()
+    procura = ProcuraEmBaldes(cenario, inicio, saida, heuristica and heuristica(cenario, saida), motor)
+    return procura.executar(indice_adjacencia, modo_historico, ganchos, comeco)[1]
@@ -0,0 +1,200 @@
+import heapq
+import time
+from array import array
+
+from src.a_estrela import Casa, PosicaoComContexto, montar_caminho, resultado_vazio
+from src.constantes import OPERACAO, Motor, ModoHistorico
+from src.estatisticas import EstatisticasDaProcura, ResultadoDaProcura, estimar_bytes
+from src.historico import HistoricoCompacto, CODIGOS_OPERACAO, SEM_PAI
+from src.grafo_estados import INFINITO, GrafoDeEstados, calcular_h_octil
+
+
+# Procura bidirecional sobre os estados (x, y, tem_fruta), com o potencial médio e custos inteiros
+class ProcuraBidirecional:
+    __slots__ = ['cenario', 'grafo', 'celulas', 'largura', 'altura', 'total', 'inicio', 'saida', 'gs', 'pais',
+                 'fechadas', 'filas', 'hs', 'destinos', 'estatisticas']
+
+    def __init__(self, cenario, inicio, saida):
+        largura, altura = cenario.largura, cenario.altura
+        total = largura * altura
+        self.cenario = cenario
+        self.grafo = GrafoDeEstados(cenario)
+        self.celulas = cenario.obter_celulas_compactas()
+        self.largura = largura
+        self.altura = altura
+        self.total = total
+        self.inicio = inicio['y'] * largura + inicio['x']
+        self.saida = saida['y'] * largura + saida['x']
+        # Um vetor de cada para a procura para frente (0) e para trás (1)
+        self.gs = (array('q', [INFINITO]) * (2 * total), array('q', [INFINITO]) * (2 * total))
+        self.pais = (array('q', [SEM_PAI]) * (2 * total), array('q', [SEM_PAI]) * (2 * total))
+        self.fechadas = (bytearray(2 * total), bytearray(2 * total))
+        self.filas = ([], [])
+        self.hs = (array('q', [-1]) * total, array('q', [-1]) * total)  # Calculados quando a casa aparece
+        self.destinos = (self.saida, self.inicio)
+        self.estatisticas = EstatisticasDaProcura(Motor.BIDIRECIONAL)
+
+    # Distância octil da casa do estado até o alvo da procura no sentido informado
+    def calcular_h(self, sentido, estado):
+        casa = estado % self.total
+        h = self.hs[sentido][casa]
+        if h < 0:
+            largura, destino = self.largura, self.destinos[sentido]
+            h = self.hs[sentido][casa] = calcular_h_octil(casa % largura, casa // largura,
+                                                          destino % largura, destino // largura)
+        return h
+
+    # Prioridade na fila: g mais o potencial médio, em dobro para continuar inteira
+    def inserir(self, sentido, estado, g):
+        self.gs[sentido][estado] = g
+        potencial = self.calcular_h(sentido, estado) - self.calcular_h(1 - sentido, estado)
+        heapq.heappush(self.filas[sentido], (2 * g + potencial, estado))
+
+    # Menor prioridade da fila, descartando entradas de estados já fechados
+    def menor_prioridade(self, sentido):
+        fila, fechadas = self.filas[sentido], self.fechadas[sentido]
+        while fila and fechadas[fila[0][1]]:
+            heapq.heappop(fila)
+            self.estatisticas.retiradas_obsoletas += 1
+        return fila[0][0] if fila else INFINITO
+
+    # Executar as duas procuras até o melhor encontro ser provado ótimo. Devolve o estado do encontro
+    def procurar(self, registrar=None):
+        total = self.total
+        self.inserir(0, self.inicio, 0)
+        self.inserir(1, self.saida, 0)
+        self.inserir(1, self.saida + total, 0)
+        melhor, encontro = INFINITO, None
+        if self.inicio == self.saida:
+            melhor, encontro = 0, self.inicio
+        if registrar:
+            registrar(self.inicio, OPERACAO.CASA_ABERTA, 0, SEM_PAI)
+        estatisticas = self.estatisticas
+
+        while True:
+            prioridades = (self.menor_prioridade(0), self.menor_prioridade(1))
+            if prioridades[0] >= INFINITO or prioridades[1] >= INFINITO or sum(prioridades) >= 2 * melhor:
+                break
+
+            abertas = len(self.filas[0]) + len(self.filas[1])
+            if abertas > estatisticas.pico_abertas:
+                estatisticas.pico_abertas = abertas
+            sentido = 0 if prioridades[0] <= prioridades[1] else 1
+            gs, gs_oposto, pais = self.gs[sentido], self.gs[1 - sentido], self.pais[sentido]
+            fechadas = self.fechadas[sentido]
+            _, estado = heapq.heappop(self.filas[sentido])
+            fechadas[estado] = 1
+            if registrar:
+                registrar(estado, OPERACAO.CASA_FECHADA, gs[estado], pais[estado])
+
+            if sentido == 0:
+                vizinhos = self.grafo.sucessores(estado)
+            else:
+                vizinhos = self.grafo.antecessores(estado, self.inicio)
+            for vizinho, custo in vizinhos:
+                g = gs[estado] + custo
+                if fechadas[vizinho] or g >= gs[vizinho]:
+                    continue
+                pais[vizinho] = estado
+                self.inserir(sentido, vizinho, g)
+                if registrar:
+                    registrar(vizinho, OPERACAO.CASA_ABERTA, g, estado)
+                if g + gs_oposto[vizinho] < melhor:
+                    melhor, encontro = g + gs_oposto[vizinho], vizinho
+        return encontro
+
+    # Completar as estatísticas pelo estado final das duas procuras, como EstadoDaProcura.finalizar_estatisticas.
+    # Os estados inseridos ao menos uma vez em cada sentido são os fechados mais os que continuam só na fila
+    def finalizar_estatisticas(self):
+        estatisticas = self.estatisticas
+        estatisticas.expandidas = self.fechadas[0].count(1) + self.fechadas[1].count(1)
+        estatisticas.insercoes = (estatisticas.expandidas + estatisticas.retiradas_obsoletas
+                                  + len(self.filas[0]) + len(self.filas[1]))
+        so_na_fila = sum(len({estado for _, estado in fila if not fechadas[estado]})
+                         for fila, fechadas in zip(self.filas, self.fechadas))
+        estatisticas.reaberturas = estatisticas.insercoes - estatisticas.expandidas - so_na_fila
+        entrada = (0, self.inicio)
+        estatisticas.pico_memoria_bytes = (
+                estimar_bytes(*self.gs, *self.pais, *self.fechadas, *self.filas, *self.hs)
+                + estatisticas.pico_abertas * (estimar_bytes(entrada, *entrada) + 8))
+        return estatisticas
+
+    # Estados do caminho: do início até o encontro pela procura para frente, e dali até a saída pela de trás
+    def montar_estados(self, encontro):
+        estados = []
+        estado = encontro
+        while estado != SEM_PAI:
+            estados.append(estado)
+            estado = self.pais[0][estado]
+        estados.reverse()
+        estado = self.pais[1][encontro]
+        while estado != SEM_PAI:
+            estados.append(estado)
+            estado = self.pais[1][estado]
+        return estados
+
+    # Casa de um evento do histórico. A procura para trás guarda g a partir da saída, então o pai não é preenchido
+    def criar_casa(self, estado, g):
+        tem_fruta, casa = divmod(estado, self.total)
+        x, y = casa % self.largura, casa // self.largura
+        h = self.calcular_h(0, estado) / 10
+        return Casa(PosicaoComContexto(x, y, chr(self.celulas[casa]), None), g / 10 + h, g / 10, h, bool(tem_fruta))
+
+
+# Preparar a função que registra cada evento (estado, operação, g inteiro, pai) conforme o modo de histórico
+def preparar_historico(procura, modo):
+    if modo == ModoHistorico.DESLIGADO:
+        return None, None
+    if modo == ModoHistorico.COMPACTO:
+        historico = HistoricoCompacto()
+        return historico, lambda estado, operacao, g, pai: historico.registrar(
+            estado, CODIGOS_OPERACAO[operacao], g / 10, pai)
+    if callable(modo):
+        return None, lambda estado, operacao, g, pai: modo(procura.criar_casa(estado, g), operacao)
+
+    historico = []
+    return historico, lambda estado, operacao, g, pai: historico.append((procura.criar_casa(estado, g), operacao))
+
+
+# Função de eventos que chama os ganchos com o estado decomposto em (x, y, tem_fruta) e g no custo original, e
+# depois a função do histórico, se houver. Na procura para trás, g é contado a partir da saída
+def envolver_com_ganchos(procura, ganchos, registrar):
+    def registrar_com_ganchos(estado, operacao, g, pai):
+        tem_fruta, casa = divmod(estado, procura.total)
+        ganchos.notificar(operacao, casa % procura.largura, casa // procura.largura, bool(tem_fruta), g / 10)
+        if registrar:
+            registrar(estado, operacao, g, pai)
+
+    return registrar_com_ganchos
+
+
+# A* bidirecional. O caminho devolvido é sempre de menor custo e tem as mesmas Casas (g, h e f calculados
+# como no motor original) que achar_caminho devolveria para ele. O histórico mistura os eventos dos dois sentidos
+def achar_caminho_bidirecional(cenario, inicio=None, saida=None, modo_historico=ModoHistorico.COMPLETO,
+                               ganchos=None):
+    comeco = time.perf_counter()
+    inicio = inicio or cenario.personagem_posicao
+    saida = saida or cenario.saida_posicao
+    if not inicio or not saida:
+        return resultado_vazio(cenario, Motor.BIDIRECIONAL, modo_historico)
+
+    procura = ProcuraBidirecional(cenario, inicio, saida)
+    historico, registrar = preparar_historico(procura, modo_historico)
+    if ganchos is not None:
+        registrar = envolver_com_ganchos(procura, ganchos, registrar)
+    inicio_procura = time.perf_counter()
+    encontro = procura.procurar(registrar)
+    fim_procura = time.perf_counter()
+
+    caminho = []
+    if encontro is not None:
+        largura, total = cenario.largura, procura.total
+        coordenadas = ((estado % total % largura, estado % total // largura)
+                       for estado in procura.montar_estados(encontro))
+        caminho = montar_caminho(cenario, coordenadas, saida)
+
+    estatisticas = procura.finalizar_estatisticas()
+    estatisticas.segundos_preparacao = inicio_procura - comeco
+    estatisticas.segundos_procura = fim_procura - inicio_procura
+    estatisticas.segundos_caminho = time.perf_counter() - fim_procura
+    return ResultadoDaProcura(caminho, historico, estatisticas)
@@ -0,0 +1,259 @@
+import heapq
+import math
+import time
+from array import array
+
+from src.a_estrela import Casa, PosicaoComContexto, resultado_vazio
+from src.constantes import OPERACAO, Celula, Motor, ModoHistorico
+from src.estatisticas import EstatisticasDaProcura, ResultadoDaProcura, estimar_bytes
+from src.historico import HistoricoCompacto, ABRIU, FECHOU, OPERACOES, SEM_PAI
+
+# Células representadas pelo código do seu caractere no vetor plano do cenário
+VAZIA = ord(Celula.VAZIA)
+PERSONAGEM = ord(Celula.PERSONAGEM)
+SAIDA = ord(Celula.SAIDA)
+BARREIRA = ord(Celula.BARREIRA)
+SEMI_BARREIRA = ord(Celula.SEMI_BARREIRA)
+FRUTA = ord(Celula.FRUTA)
+
+INFINITO = math.inf
+
+
+# Índice de um estado na fila de prioridade. Empates de f não têm desempate, assim como as tuplas (f, Casa)
+# do motor original, então a fila abre as casas exatamente na mesma ordem
+class IndiceNaFila(int):
+    __slots__ = ()
+
+    def __lt__(self, other):
+        return False
+
+
+# Histórico transmitido: cada evento vira uma Casa entregue à função assim que acontece. As Casas não são
+# guardadas, então o pai da posição não é preenchido
+class HistoricoTransmitido:
+    __slots__ = ['estado', 'funcao']
+
+    def __init__(self, estado, funcao):
+        self.estado = estado
+        self.funcao = funcao
+
+    def registrar(self, indice, operacao, g, pai):
+        self.funcao(self.estado.criar_casa(indice, g, None), OPERACOES[operacao])
+
+
+# Eventos do histórico passados também aos Ganchos, com o estado decomposto em (x, y, tem_fruta)
+class HistoricoComGanchos:
+    __slots__ = ['historico', 'ganchos', 'largura', 'total']
+
+    def __init__(self, historico, ganchos, largura, total):
+        self.historico = historico
+        self.ganchos = ganchos
+        self.largura = largura
+        self.total = total
+
+    def registrar(self, indice, operacao, g, pai):
+        tem_fruta, casa = divmod(indice, self.total)
+        self.ganchos.notificar(OPERACOES[operacao], casa % self.largura, casa // self.largura, bool(tem_fruta), g)
+        if self.historico is not None:
+            self.historico.registrar(indice, operacao, g, pai)
+
+
+# Estado da procura em vetores planos, estados indexados por y * largura + x + tem_fruta * total
+class EstadoCompacto:
+    __slots__ = ['cenario', 'celulas', 'total', 'gs', 'hs', 'menores_f', 'pais', 'fechadas', 'casas_abertas',
+                 'inicio', 'saida', 'historico', 'registro', 'estatisticas']
+
+    def __init__(self, cenario, inicio, saida, modo_historico, ganchos=None):
+        total = cenario.largura * cenario.altura
+        self.cenario = cenario
+        self.celulas = cenario.obter_celulas_compactas()
+        self.total = total
+        self.gs = array('d', [0.0]) * (2 * total)
+        self.hs = cenario.obter_campo_h(saida)  # Todas as casas de uma vez com o NumPy
+        if self.hs is None:
+            self.hs = array('d', [-1.0]) * total  # Calculado somente quando a casa é vista pela primeira vez
+        self.menores_f = array('d', [INFINITO]) * (2 * total)
+        self.pais = array('q', [SEM_PAI]) * (2 * total)
+        self.fechadas = bytearray(2 * total)
+        self.casas_abertas = []
+        self.inicio = inicio['y'] * cenario.largura + inicio['x']
+        self.saida = saida['y'] * cenario.largura + saida['x']
+        self.historico = self.preparar_historico(modo_historico)
+        self.registro = self.historico
+        if ganchos is not None:
+            self.registro = HistoricoComGanchos(self.historico, ganchos, cenario.largura, total)
+        self.estatisticas = EstatisticasDaProcura(Motor.COMPACTO)
+
+    # Histórico compacto nos modos completo e compacto (o completo vira Casas ao fim), nenhum quando desligado
+    def preparar_historico(self, modo):
+        if callable(modo):
+            return HistoricoTransmitido(self, modo)
+        if modo == ModoHistorico.DESLIGADO:
+            return None
+        return HistoricoCompacto()
+
+    # Distância em linha reta até a saída, igual a calcular_h
+    def calcular_h(self, indice):
+        h = self.hs[indice]
+        if h < 0:
+            largura = self.cenario.largura
+            base = self.saida % largura - indice % largura
+            altura = self.saida // largura - indice // largura
+            h = self.hs[indice] = round(math.hypot(base, altura), 1)
+        return h
+
+    # Retirar da fila o estado com menor f que ainda não foi fechado
+    def buscar_proximo(self):
+        casas_abertas, fechadas, estatisticas = self.casas_abertas, self.fechadas, self.estatisticas
+        if len(casas_abertas) > estatisticas.pico_abertas:  # A fila só cresce entre duas retiradas
+            estatisticas.pico_abertas = len(casas_abertas)
+        while casas_abertas:
+            _, indice = heapq.heappop(casas_abertas)
+            if fechadas[indice]:
+                estatisticas.retiradas_obsoletas += 1
+                continue
+            fechadas[indice] = 1
+            if self.registro is not None:
+                self.registro.registrar(indice, FECHOU, self.gs[indice], self.pais[indice])
+            return indice
+        return None
+
+    # Completar as estatísticas pelo estado final, como EstadoDaProcura.finalizar_estatisticas
+    def finalizar_estatisticas(self):
+        estatisticas, fechadas = self.estatisticas, self.fechadas
+        estatisticas.expandidas = fechadas.count(1)
+        estatisticas.insercoes = estatisticas.expandidas + estatisticas.retiradas_obsoletas + len(self.casas_abertas)
+        so_na_fila = {indice for _, indice in self.casas_abertas if not fechadas[indice]}
+        estatisticas.reaberturas = estatisticas.insercoes - estatisticas.expandidas - len(so_na_fila)
+        entrada = (0.0, IndiceNaFila(self.inicio))
+        estatisticas.pico_memoria_bytes = (
+                estimar_bytes(self.gs, self.menores_f, self.pais, self.fechadas, self.casas_abertas)
+                + (estimar_bytes(self.hs) if isinstance(self.hs, array) else 0)  # O campo do NumPy fica no cenário
+                + estatisticas.pico_abertas * (estimar_bytes(entrada, *entrada) + 8))
+        return estatisticas
+
+    # Casa equivalente à do motor original para um estado com o valor de g informado
+    def criar_casa(self, estado, g, pai):
+        tem_fruta, indice = divmod(estado, self.total)
+        h = self.hs[indice]
+        if estado == self.inicio:
+            celula, f = Celula.PERSONAGEM, h  # O personagem começa com f = g = h
+        else:
+            celula, f = chr(self.celulas[indice]), g + h
+        largura = self.cenario.largura
+        return Casa(PosicaoComContexto(indice % largura, indice // largura, celula, pai), f, g, h, bool(tem_fruta))
+
+    # Transformar o histórico compacto nas mesmas Casas e tuplas que o motor original devolve
+    def montar_historico(self):
+        historico = self.historico
+        ultima_casa = {}
+        resultado = []
+        for i, estado in enumerate(historico.indices):
+            operacao = historico.operacoes[i]
+            if operacao == FECHOU and estado in ultima_casa:
+                resultado.append((ultima_casa[estado], OPERACAO.CASA_FECHADA))
+                continue
+            casa = ultima_casa[estado] = self.criar_casa(estado, historico.gs[i], ultima_casa.get(historico.pais[i]))
+            resultado.append((casa, OPERACOES[operacao]))
+        return resultado, ultima_casa
+
+    # Caminho do início até o estado final seguindo os pais guardados nos vetores
+    def montar_caminho(self, estado_final):
+        estados = []
+        estado = estado_final
+        while estado != SEM_PAI:
+            estados.append(estado)
+            estado = self.pais[estado]
+
+        caminho = []
+        pai = None
+        for estado in reversed(estados):
+            pai = self.criar_casa(estado, self.gs[estado], pai)
+            caminho.append(pai)
+        return caminho
+
+
+# Executar algoritmo A* com o cenário e o estado em vetores planos. O índice de adjacência é montado uma vez
+# por cenário e pode ser passado explicitamente para reaproveitá-lo entre procuras
+def achar_caminho_compacto(cenario, indice_adjacencia=None, inicio=None, saida=None,
+                           modo_historico=ModoHistorico.COMPLETO, ganchos=None):
+    comeco = time.perf_counter()
+    inicio = inicio or cenario.personagem_posicao
+    saida = saida or cenario.saida_posicao
+    if not inicio or not saida:
+        return resultado_vazio(cenario, Motor.COMPACTO, modo_historico)
+
+    if indice_adjacencia is None:
+        indice_adjacencia = cenario.obter_indice_adjacencia()
+    codigos, arestas = indice_adjacencia.codigos, indice_adjacencia.arestas
+    largura = cenario.largura
+    estado = EstadoCompacto(cenario, inicio, saida, modo_historico, ganchos)
+    celulas, fechadas, gs, hs = estado.celulas, estado.fechadas, estado.gs, estado.hs
+    menores_f, pais, casas_abertas = estado.menores_f, estado.pais, estado.casas_abertas
+    registro, total = estado.registro, estado.total
+    saida_y, saida_x = divmod(estado.saida, largura)
+    hypot, heappush = math.hypot, heapq.heappush
+
+    # O motor original começa o personagem com g = h
+    inicio = estado.inicio
+    h_inicial = estado.calcular_h(inicio)
+    gs[inicio] = menores_f[inicio] = h_inicial
+    heappush(casas_abertas, (h_inicial, IndiceNaFila(inicio)))
+
+    inicio_procura = time.perf_counter()
+    estado_saida = None
+    while casas_abertas:
+        atual = estado.buscar_proximo()
+        if atual is None:
+            break
+        fruta_atual, casa_atual = divmod(atual, total)
+        if casa_atual == estado.saida:
+            estado_saida = atual
+            break
+
+        g_atual = gs[atual]
+        for deslocamento, custo in arestas[codigos[casa_atual]]:
+            vizinha = casa_atual + deslocamento
+            celula = celulas[vizinha]
+            if celula == BARREIRA and not fruta_atual:
+                continue
+            tem_fruta = (fruta_atual and celula != BARREIRA) or celula == FRUTA
+            estado_vizinho = vizinha + total if tem_fruta else vizinha
+            if fechadas[estado_vizinho]:
+                continue
+
+            h = hs[vizinha]
+            if h < 0:
+                vizinho_y, vizinho_x = divmod(vizinha, largura)
+                h = hs[vizinha] = round(hypot(saida_x - vizinho_x, saida_y - vizinho_y), 1)
+            g = g_atual + custo
+            f = g + h
+
+            # Mesma regra de EstadoDaProcura.registrar_casa_aberta, sem chamar métodos a cada vizinho
+            if f < menores_f[estado_vizinho]:
+                menores_f[estado_vizinho] = f
+                gs[estado_vizinho] = g
+                pais[estado_vizinho] = atual
+                heappush(casas_abertas, (f, IndiceNaFila(estado_vizinho)))
+                if registro is not None:
+                    registro.registrar(estado_vizinho, ABRIU, g, atual)
+
+    fim_procura = time.perf_counter()
+    caminho = []
+    if modo_historico != ModoHistorico.COMPLETO:
+        if estado_saida is not None:
+            caminho = estado.montar_caminho(estado_saida)
+        historico = estado.historico if modo_historico == ModoHistorico.COMPACTO else None
+    else:
+        historico, casas = estado.montar_historico()
+        atual = None if estado_saida is None else casas[estado_saida]
+        while atual is not None:
+            caminho.append(atual)
+            atual = atual.posicao.pai
+        caminho.reverse()
+
+    estatisticas = estado.finalizar_estatisticas()
+    estatisticas.segundos_preparacao = inicio_procura - comeco
+    estatisticas.segundos_procura = fim_procura - inicio_procura
+    estatisticas.segundos_caminho = time.perf_counter() - fim_procura
+    return ResultadoDaProcura(caminho, historico, estatisticas)
@@ -0,0 +1,47 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.a_estrela import achar_caminho, caminho_em_tuplas, caminho_de_tuplas
+from src.constantes import Motor, ModoHistorico
+
+# Cenário e motor usados pelas consultas de cada processo de trabalho, definidos uma vez ao iniciar o processo
+_cenario_do_processo = None
+_motor_do_processo = None
+
+
+def _preparar_processo(cenario, motor):
+    global _cenario_do_processo, _motor_do_processo
+    _cenario_do_processo = cenario
+    _motor_do_processo = motor
+
+
+def _resolver_consulta(consulta):
+    inicio, saida = consulta
+    resultado = achar_caminho(_cenario_do_processo, _motor_do_processo, inicio, saida, ModoHistorico.DESLIGADO)
+    # Casas encadeadas por pai seriam copiadas recursivamente pelo pickle, estourando o limite de recursão
+    return caminho_em_tuplas(resultado[0])
+
+
+# Achar os caminhos de vários pares (início, saída) no mesmo cenário, em um ou mais processos
+def achar_caminhos(cenario, consultas, motor=Motor.COMPACTO, processos=1):
+    if processos is None:
+        processos = os.cpu_count() or 1
+    if motor == Motor.COMPACTO:
+        cenario.obter_indice_adjacencia()  # Montado antes de dividir o trabalho para não repetir em cada processo
+    cenario.obter_indice_componentes()  # Consultas sem caminho voltam sem procurar, em qualquer motor
+
+    if processos <= 1 or len(consultas) <= 1:
+        caminhos = []
+        for inicio, saida in consultas:
+            resultado = achar_caminho(cenario, motor, inicio, saida, ModoHistorico.DESLIGADO)
+            caminhos.append(resultado[0])
+        return caminhos
+
+    metodos = multiprocessing.get_all_start_methods()
+    contexto = multiprocessing.get_context('fork' if 'fork' in metodos else None)
+    tamanho_lote = max(1, len(consultas) // (processos * 4))
+    with ProcessPoolExecutor(processos, mp_context=contexto, initializer=_preparar_processo,
+                             initargs=(cenario, motor)) as executor:
+        return [caminho_de_tuplas(dados) for dados in executor.map(_resolver_consulta, consultas,
+                                                                 chunksize=tamanho_lote)]
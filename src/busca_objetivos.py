@@ -0,0 +1,127 @@
+import random
+import time
+
+from src.a_estrela import Cenario, resultado_vazio
+from src.busca_baldes import ProcuraEmBaldes, achar_caminho_em_baldes
+from src.constantes import Celula, Motor, ModoHistorico
+from src.gerador_cenarios import gerar_cenario
+from src.grafo_estados import CUSTO_RETO, INFINITO, calcular_h_octil
+from src.heuristica_marcos import heuristica_octil
+
+TAMANHO_BLOCO = 8
+
+
+# Índice espacial dos objetivos em blocos, para achar o mais próximo de uma casa (distância octil)
+class IndiceDeObjetivos:
+    __slots__ = ['blocos', 'blocos_x', 'blocos_y', 'tamanho_bloco']
+
+    def __init__(self, objetivos, largura, altura, tamanho_bloco=TAMANHO_BLOCO):
+        self.tamanho_bloco = tamanho_bloco
+        self.blocos_x = (largura + tamanho_bloco - 1) // tamanho_bloco
+        self.blocos_y = (altura + tamanho_bloco - 1) // tamanho_bloco
+        self.blocos = {}
+        for objetivo in objetivos:
+            bloco = (objetivo['x'] // tamanho_bloco, objetivo['y'] // tamanho_bloco)
+            self.blocos.setdefault(bloco, []).append((objetivo['x'], objetivo['y']))
+
+    # Blocos à distância (de Chebyshev, em blocos) igual ao raio do bloco informado
+    def anel(self, bloco_x, bloco_y, raio):
+        if raio == 0:
+            yield bloco_x, bloco_y
+            return
+        for x in range(bloco_x - raio, bloco_x + raio + 1):
+            yield x, bloco_y - raio
+            yield x, bloco_y + raio
+        for y in range(bloco_y - raio + 1, bloco_y + raio):
+            yield bloco_x - raio, y
+            yield bloco_x + raio, y
+
+    # (distância octil, (x, y)) do objetivo mais próximo da casa, ou (INFINITO, None) sem objetivos
+    def mais_proximo(self, x, y):
+        tamanho, blocos = self.tamanho_bloco, self.blocos
+        bloco_x, bloco_y = x // tamanho, y // tamanho
+        maximo = max(bloco_x, self.blocos_x - 1 - bloco_x, bloco_y, self.blocos_y - 1 - bloco_y)
+        melhor, objetivo = INFINITO, None
+        for raio in range(maximo + 1):
+            # Uma casa em um bloco do anel está a pelo menos (raio - 1) * tamanho + 1 casas em x ou em y
+            if raio and melhor <= CUSTO_RETO * ((raio - 1) * tamanho + 1):
+                break
+            for bloco in self.anel(bloco_x, bloco_y, raio):
+                for objetivo_x, objetivo_y in blocos.get(bloco, ()):
+                    distancia = calcular_h_octil(x, y, objetivo_x, objetivo_y)
+                    if distancia < melhor:
+                        melhor, objetivo = distancia, (objetivo_x, objetivo_y)
+        return melhor, objetivo
+
+
+# h de vários objetivos: a menor distância octil até algum deles, calculada uma vez por casa pelo índice
+# espacial. Admissível para todos os objetivos, então a primeira casa objetivo fechada é a mais próxima
+def heuristica_de_objetivos(cenario, objetivos):
+    indice = IndiceDeObjetivos(objetivos, cenario.largura, cenario.altura)
+    largura, total = cenario.largura, cenario.largura * cenario.altura
+    por_casa = {}
+
+    def calcular_h(estado):
+        casa = estado % total
+        if casa not in por_casa:
+            por_casa[casa] = indice.mais_proximo(casa % largura, casa // largura)[0]
+        return por_casa[casa]
+
+    return calcular_h
+
+
+# Caminho até o objetivo mais próximo em uma procura. Devolve (objetivo alcançado, ResultadoDaProcura)
+def achar_objetivo_mais_proximo(cenario, objetivos=Celula.SAIDA, inicio=None,
+                                modo_historico=ModoHistorico.COMPLETO, ganchos=None):
+    comeco = time.perf_counter()
+    inicio = inicio or cenario.personagem_posicao
+    if isinstance(objetivos, str):
+        objetivos = cenario.localizar_casas(objetivos)
+    objetivos = [objetivo for objetivo in objetivos if not cenario.saida_inalcancavel(inicio, objetivo)]
+    if not inicio or not objetivos:
+        return None, resultado_vazio(cenario, Motor.BALDES, modo_historico)
+
+    indice_adjacencia = cenario.obter_indice_adjacencia()
+    casas = [objetivo['y'] * cenario.largura + objetivo['x'] for objetivo in objetivos]
+    procura = ProcuraEmBaldes(cenario, inicio, objetivos[0], heuristica_de_objetivos(cenario, objetivos),
+                              objetivos=casas)
+    estado_final, resultado = procura.executar(indice_adjacencia, modo_historico, ganchos, comeco)
+    if estado_final is None:
+        return None, resultado
+    casa = estado_final % procura.total
+    return {'x': casa % cenario.largura, 'y': casa // cenario.largura}, resultado
+
+
+# Comparar uma procura por vários objetivos (algumas frutas sorteadas) com uma procura por objetivo, ficando com
+# a mais curta
+def main():
+    tamanho, quantidade = 200, 50
+    print(f'{"cenário":>11} {"objetivos":>9} {"custo":>8} {"uma s":>8} {"abertas":>8} {"todas s":>8} {"abertas":>8}')
+    for tipo in ('aberto', 'obstaculos', 'labirinto', 'corredores'):
+        cenario = Cenario(gerar_cenario(tipo, tamanho, tamanho))
+        frutas = cenario.localizar_frutas()
+        objetivos = random.Random(0).sample(frutas, min(quantidade, len(frutas)))
+
+        comeco = time.perf_counter()
+        objetivo, resultado = achar_objetivo_mais_proximo(cenario, objetivos, modo_historico=ModoHistorico.DESLIGADO)
+        tempo_uma = time.perf_counter() - comeco
+        custo = resultado[0][-1].g - resultado[0][0].g if objetivo else None  # O caminho começa com g = h
+
+        comeco = time.perf_counter()
+        abertas_todas = 0
+        custos = []
+        for alvo in objetivos:
+            separada = achar_caminho_em_baldes(cenario, saida=alvo, modo_historico=ModoHistorico.DESLIGADO,
+                                               heuristica=heuristica_octil)
+            abertas_todas += separada.estatisticas.expandidas
+            if separada[0]:
+                custos.append(separada[0][-1].g - separada[0][0].g)
+        tempo_todas = time.perf_counter() - comeco
+        if custos and custo is not None and abs(min(custos) - custo) > 1e-6:
+            print(f'{tipo}: custo diferente das procuras separadas ({custo} x {min(custos)})')
+        print(f'{tipo:>11} {len(objetivos):>9} {custo or 0:>8.1f} {tempo_uma:>8.3f} '
+              f'{resultado.estatisticas.expandidas if objetivo else 0:>8} {tempo_todas:>8.3f} {abertas_todas:>8}')
+
+
+if __name__ == '__main__':
+    main()
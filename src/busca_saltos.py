@@ -0,0 +1,199 @@
+import time
+
+from src.a_estrela import PosicaoComContexto, Casa, Cenario, achar_caminho, calcular_fe, calcular_g, \
+    calcular_tem_fruta, inicializar_estado_da_procura, montar_caminho, resultado_vazio
+from src.constantes import Celula, Motor, ModoHistorico
+from src.estatisticas import ResultadoDaProcura
+from src.gerador_cenarios import gerar_campo_aberto
+
+# Tipos de casa para os saltos: casas especiais mudam custo ou fruta, então o salto para nelas
+BLOQUEADA = 0
+LIVRE = 1
+ESPECIAL = 2
+
+
+# Tabela de tradução de bytes para o tipo de cada célula, conforme o personagem tenha ou não a fruta
+def _tabela_de_tipos(tem_fruta):
+    tabela = bytearray(256)  # Células desconhecidas ficam bloqueadas
+    for celula in Celula.VALIDAS:
+        tabela[ord(celula)] = LIVRE
+    tabela[ord(Celula.SEMI_BARREIRA)] = ESPECIAL
+    tabela[ord(Celula.BARREIRA)] = ESPECIAL if tem_fruta else BLOQUEADA
+    tabela[ord(Celula.FRUTA)] = LIVRE if tem_fruta else ESPECIAL
+    return bytes(tabela)
+
+
+TIPOS = (_tabela_de_tipos(False), _tabela_de_tipos(True))
+CASAS_ESPECIAIS = (Celula.SEMI_BARREIRA, Celula.BARREIRA, Celula.FRUTA)
+
+
+def _sinal(valor):
+    return (valor > 0) - (valor < 0)
+
+
+# Jump Point Search (JPS) sobre o cenário de 8 direções
+class ProcuraPorSaltos:
+    __slots__ = ['cenario', 'celulas', 'largura', 'altura', 'saida_x', 'saida_y']
+
+    def __init__(self, cenario, saida):
+        self.cenario = cenario
+        self.celulas = cenario.obter_celulas_compactas()
+        self.largura = cenario.largura
+        self.altura = cenario.altura
+        self.saida_x = saida.x
+        self.saida_y = saida.y
+
+    def tipo(self, x, y, tipos):
+        if 0 <= x < self.largura and 0 <= y < self.altura:
+            return tipos[self.celulas[y * self.largura + x]]
+        return BLOQUEADA
+
+    # Direções que deixam de ser simétricas ao passar por (x, y) na direção (dx, dy): a casa ao lado não é
+    # livre, então o desvio por ela não tem o mesmo custo e o vizinho seguinte precisa ser visitado daqui
+    def vizinhos_forcados(self, x, y, dx, dy, tipos):
+        forcados = []
+        if dx and dy:
+            if self.tipo(x - dx, y, tipos) != LIVRE and self.tipo(x - dx, y + dy, tipos) != BLOQUEADA:
+                forcados.append((-dx, dy))
+            if self.tipo(x, y - dy, tipos) != LIVRE and self.tipo(x + dx, y - dy, tipos) != BLOQUEADA:
+                forcados.append((dx, -dy))
+        elif dx:
+            for lado in (-1, 1):
+                if self.tipo(x, y + lado, tipos) != LIVRE and self.tipo(x + dx, y + lado, tipos) != BLOQUEADA:
+                    forcados.append((dx, lado))
+        else:
+            for lado in (-1, 1):
+                if self.tipo(x + lado, y, tipos) != LIVRE and self.tipo(x + lado, y + dy, tipos) != BLOQUEADA:
+                    forcados.append((lado, dy))
+        return forcados
+
+    # Andar de (x, y) na direção (dx, dy) até o próximo ponto de salto, ou None se bater em um obstáculo
+    def saltar(self, x, y, dx, dy, tipos):
+        while True:
+            x += dx
+            y += dy
+            tipo = self.tipo(x, y, tipos)
+            if tipo == BLOQUEADA:
+                return None
+            if tipo == ESPECIAL or (x == self.saida_x and y == self.saida_y):
+                return x, y
+            if self.vizinhos_forcados(x, y, dx, dy, tipos):
+                return x, y
+            # Na diagonal, a casa é ponto de salto se algum salto reto a partir dela achar um
+            if dx and dy and (self.saltar(x, y, dx, 0, tipos) or self.saltar(x, y, 0, dy, tipos)):
+                return x, y
+
+    # Direções seguidas a partir de um ponto de salto: todas no início e em casas especiais (o custo ou a fruta
+    # mudou), senão a direção de chegada, suas componentes na diagonal e os vizinhos forçados
+    def direcoes(self, casa, tipos):
+        pai = casa.posicao.pai
+        if pai is None or casa.posicao.celula in CASAS_ESPECIAIS:
+            return Cenario.DIRECOES
+
+        x, y = casa.posicao.x, casa.posicao.y
+        dx, dy = _sinal(x - pai.posicao.x), _sinal(y - pai.posicao.y)
+        direcoes = [(dx, dy)]
+        if dx and dy:
+            direcoes += [(dx, 0), (0, dy)]
+        return direcoes + self.vizinhos_forcados(x, y, dx, dy, tipos)
+
+    # Pontos de salto alcançados a partir da casa, como Casas cujo pai é o ponto de salto anterior
+    def expandir(self, casa, estado_da_procura):
+        x, y = casa.posicao.x, casa.posicao.y
+        tipos = TIPOS[bool(casa.tem_fruta)]
+        for dx, dy in self.direcoes(casa, tipos):
+            ponto = self.saltar(x, y, dx, dy, tipos)
+            if ponto is None:
+                continue
+
+            posicao = PosicaoComContexto(*ponto, self.cenario.obter_celula(*ponto), casa)
+            tem_fruta = calcular_tem_fruta(casa, posicao)
+            if estado_da_procura.casa_fechada(posicao, tem_fruta):
+                continue
+
+            # Só a última casa do salto pode ter lentidão, as anteriores são livres
+            passos = max(abs(ponto[0] - x), abs(ponto[1] - y))
+            g = calcular_g(casa, posicao) + (passos - 1) * (1 if dx == 0 or dy == 0 else 1.4)
+            h = estado_da_procura.calcular_h(posicao)
+            yield Casa(posicao, calcular_fe(g, h), g, h, tem_fruta)
+
+    # Casas entre pontos de salto consecutivos, que sempre estão na mesma linha reta ou diagonal
+    @staticmethod
+    def ligar_pontos(pontos):
+        for indice, (x, y) in enumerate(pontos):
+            if indice == 0:
+                yield x, y
+                continue
+            anterior_x, anterior_y = pontos[indice - 1]
+            dx, dy = _sinal(x - anterior_x), _sinal(y - anterior_y)
+            while (anterior_x, anterior_y) != (x, y):
+                anterior_x += dx
+                anterior_y += dy
+                yield anterior_x, anterior_y
+
+
+# A* com Jump Point Search. O histórico registra apenas os pontos de salto abertos e fechados, mas o caminho
+# devolvido tem todas as casas, com os mesmos valores de g, h e f que achar_caminho calcula
+def achar_caminho_por_saltos(cenario, inicio=None, saida=None, modo_historico=ModoHistorico.COMPLETO,
+                             ganchos=None):
+    comeco = time.perf_counter()
+    estado_da_procura = inicializar_estado_da_procura(cenario, inicio, saida, modo_historico, ganchos, Motor.SALTOS)
+    if estado_da_procura is None:
+        return resultado_vazio(cenario, Motor.SALTOS, modo_historico)
+
+    procura = ProcuraPorSaltos(cenario, estado_da_procura.saida)
+    inicio_procura = time.perf_counter()
+    while estado_da_procura.casas_abertas:
+        personagem = estado_da_procura.buscar_proximo()
+        if personagem is None or estado_da_procura.achou_saida():
+            break
+        for casa_vizinha in procura.expandir(personagem, estado_da_procura):
+            estado_da_procura.registrar_casa_aberta(casa_vizinha)
+
+    fim_procura = time.perf_counter()
+    pontos = []
+    atual = estado_da_procura.pegar_saida()
+    while atual is not None:
+        pontos.append((atual.posicao.x, atual.posicao.y))
+        atual = atual.posicao.pai
+    pontos.reverse()
+
+    saida = {'x': estado_da_procura.saida.x, 'y': estado_da_procura.saida.y}
+    caminho = montar_caminho(cenario, procura.ligar_pontos(pontos), saida)
+
+    estatisticas = estado_da_procura.finalizar_estatisticas()
+    estatisticas.segundos_preparacao = inicio_procura - comeco
+    estatisticas.segundos_procura = fim_procura - inicio_procura
+    estatisticas.segundos_caminho = time.perf_counter() - fim_procura
+    return ResultadoDaProcura(caminho, estado_da_procura.historico, estatisticas)
+
+
+# Operações na fila de prioridade de uma procura: casas inseridas (abertas) e retiradas (fechadas)
+def contar_operacoes_na_fila(cenario, motor, inicio=None, saida=None):
+    resultado = achar_caminho(cenario, motor, inicio, saida, ModoHistorico.DESLIGADO)
+    caminho, estatisticas = resultado[0], resultado.estatisticas
+    return {
+        'motor': motor,
+        'insercoes': estatisticas.insercoes,
+        'retiradas': estatisticas.expandidas,
+        'custo': caminho[-1].g - caminho[0].g if caminho else None,  # O personagem começa com g = h
+        'segundos': estatisticas.segundos,
+    }
+
+
+# Comparar as operações na fila do A* simples e do Jump Point Search em cenários abertos com um muro
+def main():
+    print(f'{"cenário":>10} {"densidade":>9} {"motor":>8} {"inserções":>10} {"retiradas":>10} {"custo":>8} '
+          f'{"segundos":>9}')
+    for tamanho in (50, 100, 200):
+        for densidade in (0.0, 0.02, 0.1):
+            cenario = Cenario(gerar_campo_aberto(tamanho, tamanho, densidade=densidade, muro=True))
+            for motor in (Motor.PADRAO, Motor.SALTOS):
+                medida = contar_operacoes_na_fila(cenario, motor)
+                custo = '-' if medida['custo'] is None else f'{medida["custo"]:.1f}'
+                print(f'{f"{tamanho}x{tamanho}":>10} {densidade:>9} {motor:>8} {medida["insercoes"]:>10} '
+                      f'{medida["retiradas"]:>10} {custo:>8} {medida["segundos"]:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
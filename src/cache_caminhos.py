@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+from src.a_estrela import achar_caminho, caminho_em_tuplas, caminho_de_tuplas
+from src.constantes import Motor, ModoHistorico
+from src.estatisticas import EstatisticasDaProcura, ResultadoDaProcura
+
+
+# Contadores de uso do cache
+class EstatisticasCache:
+    __slots__ = ['acertos', 'acertos_disco', 'faltas', 'remocoes', 'remocoes_disco']
+
+    def __init__(self):
+        self.acertos = 0  # Caminhos encontrados na memória
+        self.acertos_disco = 0  # Caminhos encontrados somente no disco
+        self.faltas = 0  # Caminhos que precisaram ser procurados
+        self.remocoes = 0  # Caminhos tirados da memória para respeitar os limites
+        self.remocoes_disco = 0  # Arquivos apagados por estarem corrompidos ou para respeitar o limite do disco
+
+    def taxa_de_acerto(self):
+        consultas = self.acertos + self.acertos_disco + self.faltas
+        return (self.acertos + self.acertos_disco) / consultas if consultas else 0.0
+
+    def __repr__(self):
+        return (f'EstatisticasCache(acertos={self.acertos}, acertos_disco={self.acertos_disco}, '
+                f'faltas={self.faltas}, remocoes={self.remocoes}, remocoes_disco={self.remocoes_disco})')
+
+
+# Cache de caminhos na frente de achar_caminho, pela impressão digital do cenário, motor, início e saída
+class CacheDeCaminhos:
+    __slots__ = ['max_entradas', 'max_bytes', 'pasta', 'max_bytes_disco', 'bytes_disco', 'entradas', 'bytes_usados',
+                 'estatisticas']
+
+    def __init__(self, max_entradas=1024, max_bytes=64 * 1024 * 1024, pasta=None, max_bytes_disco=256 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.pasta = pasta
+        self.max_bytes_disco = max_bytes_disco
+        self.bytes_disco = None  # Medido na primeira gravação
+        self.entradas = OrderedDict()  # Chave -> caminho em tuplas, em JSON
+        self.bytes_usados = 0
+        self.estatisticas = EstatisticasCache()
+        if pasta is not None:
+            os.makedirs(pasta, exist_ok=True)
+
+    # Mesmo resultado de achar_caminho com o histórico desligado; nos acertos, as estatísticas só marcam do_cache
+    def achar_caminho(self, cenario, motor=Motor.PADRAO, inicio=None, saida=None):
+        comeco = time.perf_counter()
+        inicio = inicio or cenario.personagem_posicao
+        saida = saida or cenario.saida_posicao
+        if not inicio or not saida:
+            return achar_caminho(cenario, motor, inicio, saida, ModoHistorico.DESLIGADO)
+
+        chave = (cenario.obter_impressao_digital(), motor, inicio['x'], inicio['y'], saida['x'], saida['y'])
+        dados = self.entradas.get(chave)
+        if dados is not None:
+            self.entradas.move_to_end(chave)
+            self.estatisticas.acertos += 1
+            caminho = caminho_de_tuplas(json.loads(dados))
+        else:
+            caminho = self.ler_do_disco(chave)
+            if caminho is None:
+                self.estatisticas.faltas += 1
+                resultado = achar_caminho(cenario, motor, inicio, saida, ModoHistorico.DESLIGADO)
+                dados = json.dumps(caminho_em_tuplas(resultado[0]), separators=(',', ':')).encode('utf-8')
+                self.gravar_no_disco(chave, dados)
+                self.guardar(chave, dados)
+                return resultado
+            self.estatisticas.acertos_disco += 1
+            self.guardar(chave, json.dumps(caminho_em_tuplas(caminho), separators=(',', ':')).encode('utf-8'))
+
+        estatisticas = EstatisticasDaProcura(motor)
+        estatisticas.do_cache = True
+        estatisticas.segundos_caminho = time.perf_counter() - comeco
+        return ResultadoDaProcura(caminho, None, estatisticas)
+
+    # Guardar na memória, removendo os caminhos usados há mais tempo até caber nos limites
+    def guardar(self, chave, dados):
+        if len(dados) > self.max_bytes:
+            return
+        self.entradas[chave] = dados
+        self.bytes_usados += len(dados)
+        while len(self.entradas) > self.max_entradas or self.bytes_usados > self.max_bytes:
+            _, removidos = self.entradas.popitem(last=False)
+            self.bytes_usados -= len(removidos)
+            self.estatisticas.remocoes += 1
+
+    # Esvaziar a memória e, se houver, os arquivos do cache em disco
+    def limpar(self):
+        self.entradas.clear()
+        self.bytes_usados = 0
+        if self.pasta is not None:
+            for nome in os.listdir(self.pasta):
+                if nome.endswith('.caminho'):
+                    os.remove(os.path.join(self.pasta, nome))
+            self.bytes_disco = 0
+
+    def caminho_do_arquivo(self, chave):
+        nome = hashlib.blake2b(repr(chave).encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.pasta, f'{nome}.caminho')
+
+    # Caminho gravado em disco, ou None. Um arquivo que não pode ser lido ou decodificado é apagado e vira falta
+    def ler_do_disco(self, chave):
+        if self.pasta is None:
+            return None
+        arquivo = self.caminho_do_arquivo(chave)
+        try:
+            with open(arquivo, 'rb') as aberto:
+                caminho = caminho_de_tuplas(json.loads(aberto.read()))
+            os.utime(arquivo)  # A data de modificação ordena as remoções do disco
+            return caminho
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError):
+            self.remover_do_disco(arquivo)
+            return None
+
+    def remover_do_disco(self, arquivo):
+        try:
+            os.remove(arquivo)
+            self.estatisticas.remocoes_disco += 1
+        except OSError:
+            pass
+
+    # Gravar em um arquivo temporário e renomear, para outro processo nunca ler um arquivo pela metade
+    def gravar_no_disco(self, chave, dados):
+        if self.pasta is None or len(dados) > self.max_bytes_disco:
+            return
+        destino = self.caminho_do_arquivo(chave)
+        temporario = f'{destino}.{os.getpid()}.tmp'
+        try:
+            substituido = os.stat(destino).st_size  # Regravar a mesma chave troca o arquivo, não soma outro
+        except OSError:
+            substituido = 0
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(dados)
+        os.replace(temporario, destino)
+        if self.bytes_disco is None or self.bytes_disco - substituido + len(dados) > self.max_bytes_disco:
+            self.respeitar_limite_do_disco()
+        else:
+            self.bytes_disco += len(dados) - substituido
+
+    # Apagar os arquivos modificados há mais tempo até a pasta caber no limite
+    def respeitar_limite_do_disco(self):
+        arquivos = []
+        for nome in os.listdir(self.pasta):
+            if nome.endswith('.caminho'):
+                try:
+                    informacoes = os.stat(os.path.join(self.pasta, nome))
+                except OSError:
+                    continue  # Apagado por outro processo
+                arquivos.append((informacoes.st_mtime, informacoes.st_size, nome))
+        arquivos.sort()
+        self.bytes_disco = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, nome in arquivos:
+            if self.bytes_disco <= self.max_bytes_disco:
+                break
+            self.remover_do_disco(os.path.join(self.pasta, nome))
+            self.bytes_disco -= tamanho
+
+    def __len__(self):
+        return len(self.entradas)
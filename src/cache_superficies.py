@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+import pygame
+
+from src.constantes import OPERACAO, CORES_CELULA
+
+MAXIMO_TEXTOS = 4096
+
+
+# Sobreposições coloridas e textos de g, h e f criados uma vez e reaproveitados
+class CacheDeSuperficies:
+    __slots__ = ['tamanho_celula', 'fonte', 'max_textos', 'sobreposicoes', 'textos']
+
+    def __init__(self, tamanho_celula, fonte, max_textos=MAXIMO_TEXTOS):
+        self.tamanho_celula = tamanho_celula
+        self.fonte = fonte
+        self.max_textos = max_textos
+        self.sobreposicoes = {}  # Cor RGBA -> superfície do tamanho da casa
+        self.textos = OrderedDict()  # (texto, cor) -> superfície renderizada
+        self.preparar_sobreposicoes()
+
+    # Sobreposições das cores das operações e do caminho final, as usadas a cada evento da animação
+    def preparar_sobreposicoes(self):
+        for chave in (OPERACAO.CASA_ABERTA, OPERACAO.CASA_FECHADA, 'CAMINHO_FINAL'):
+            self.obter_sobreposicao(CORES_CELULA[chave])
+
+    # Descartar as superfícies se o tamanho da casa ou a fonte mudarem
+    def configurar(self, tamanho_celula, fonte):
+        if tamanho_celula == self.tamanho_celula and fonte is self.fonte:
+            return
+        self.tamanho_celula = tamanho_celula
+        self.fonte = fonte
+        self.sobreposicoes.clear()
+        self.textos.clear()
+        self.preparar_sobreposicoes()
+
+    def obter_sobreposicao(self, cor_rgba):
+        sobreposicao = self.sobreposicoes.get(cor_rgba)
+        if sobreposicao is None:
+            sobreposicao = pygame.Surface((self.tamanho_celula, self.tamanho_celula), pygame.SRCALPHA)
+            sobreposicao.fill(cor_rgba)
+            self.sobreposicoes[cor_rgba] = sobreposicao
+        return sobreposicao
+
+    # Texto renderizado com a fonte atual, removendo os usados há mais tempo quando passa do limite
+    def obter_texto(self, texto, cor):
+        chave = (texto, cor)
+        superficie = self.textos.get(chave)
+        if superficie is not None:
+            self.textos.move_to_end(chave)
+            return superficie
+
+        superficie = self.textos[chave] = self.fonte.render(texto, True, cor)
+        if len(self.textos) > self.max_textos:
+            self.textos.popitem(last=False)
+        return superficie
@@ -0,0 +1,199 @@
+import heapq
+import random
+import time
+from array import array
+
+from src.a_estrela import Cenario, achar_caminho, montar_caminho
+from src.constantes import Celula, Motor, ModoHistorico
+from src.gerador_cenarios import gerar_cenario
+from src.grafo_estados import INFINITO, GrafoDeEstados
+from src.historico import SEM_PAI
+
+
+# Campo de fluxo até a saída, para muitos personagens, reparado como no LPA* ao alterar casas
+class CampoDeFluxo:
+    __slots__ = ['cenario', 'grafo', 'total', 'saida', 'distancias', 'rhs', 'seguintes', 'carimbos', 'fila',
+                 'proximo_carimbo', 'versao', 'expansoes']
+
+    def __init__(self, cenario, saida=None):
+        self.cenario = cenario
+        self.grafo = GrafoDeEstados(cenario)
+        self.total = cenario.largura * cenario.altura
+        self.saida = None
+        self.fila = []
+        self.proximo_carimbo = 1
+        self.expansoes = 0
+        self.montar(saida or cenario.saida_posicao)
+
+    # Dijkstra completo a partir da saída ({'x': x, 'y': y}), ou um campo vazio se não houver saída
+    def montar(self, saida):
+        quantidade = 2 * self.total
+        self.distancias = array('q', [INFINITO]) * quantidade
+        self.seguintes = array('q', [SEM_PAI]) * quantidade
+        self.carimbos = array('q', [0]) * quantidade  # Entrada válida do estado na fila, 0 se estiver fora
+        self.fila.clear()
+        self.versao = self.cenario.versao
+        self.saida = None if saida is None else saida['y'] * self.cenario.largura + saida['x']
+        if self.saida is not None:
+            distancias, seguintes, antecessores = self.distancias, self.seguintes, self.grafo.antecessores
+            fila = []
+            for estado in (self.saida, self.saida + self.total):
+                distancias[estado] = 0
+                fila.append((0, estado))
+            while fila:
+                distancia, estado = heapq.heappop(fila)
+                if distancia > distancias[estado]:
+                    continue
+                self.expansoes += 1
+                for anterior, custo in antecessores(estado):
+                    if distancia + custo < distancias[anterior]:
+                        distancias[anterior] = distancia + custo
+                        seguintes[anterior] = estado
+                        heapq.heappush(fila, (distancia + custo, anterior))
+        self.rhs = array('q', self.distancias)
+
+    def estado(self, x, y, tem_fruta=False):
+        return y * self.cenario.largura + x + (self.total if tem_fruta else 0)
+
+    # Menor distância até a saída passando por um dos estados seguintes, e esse estado
+    def melhor_seguinte(self, estado):
+        distancias = self.distancias
+        melhor, seguinte = INFINITO, SEM_PAI
+        for vizinho, custo in self.grafo.sucessores(estado):
+            if distancias[vizinho] + custo < melhor:
+                melhor, seguinte = distancias[vizinho] + custo, vizinho
+        return melhor, seguinte
+
+    def inserir(self, estado):
+        carimbo = self.carimbos[estado] = self.proximo_carimbo
+        self.proximo_carimbo += 1
+        heapq.heappush(self.fila, (min(self.distancias[estado], self.rhs[estado]), carimbo, estado))
+
+    # Refazer rhs e o seguinte de um estado. Estados impossíveis (fruta sem fruta, barreira com fruta) ficam
+    # sem caminho; os da saída continuam com distância 0
+    def atualizar_estado(self, estado):
+        if estado % self.total == self.saida:
+            self.rhs[estado], self.seguintes[estado] = 0, SEM_PAI
+        elif self.grafo.estado_possivel(estado):
+            self.rhs[estado], self.seguintes[estado] = self.melhor_seguinte(estado)
+        else:
+            self.rhs[estado], self.seguintes[estado] = INFINITO, SEM_PAI
+        self.carimbos[estado] = 0
+        if self.distancias[estado] != self.rhs[estado]:
+            self.inserir(estado)
+
+    # Processar a fila até todos os estados ficarem consistentes
+    def propagar(self):
+        distancias, rhs, fila, carimbos = self.distancias, self.rhs, self.fila, self.carimbos
+        while fila:
+            _, carimbo, estado = heapq.heappop(fila)
+            if carimbos[estado] != carimbo:
+                continue
+            carimbos[estado] = 0
+            self.expansoes += 1
+            if distancias[estado] > rhs[estado]:
+                distancias[estado] = rhs[estado]
+            else:
+                distancias[estado] = INFINITO
+                self.atualizar_estado(estado)
+            for anterior, _ in self.grafo.antecessores(estado):
+                self.atualizar_estado(anterior)
+
+    # Trocar o tipo de uma casa e reparar o campo. Mudam as arestas que entram na casa, que saem das casas
+    # vizinhas, e os estados possíveis da própria casa. Se a saída do cenário mudar, o campo é refeito
+    def atualizar_celula(self, x, y, nova_celula):
+        self.sincronizar()
+        self.cenario.alterar_celula(x, y, nova_celula)
+        self.versao = self.cenario.versao
+        saida = self.cenario.saida_posicao
+        if saida is None or saida['y'] * self.cenario.largura + saida['x'] != self.saida:
+            self.montar(saida)
+            return
+
+        for vizinho_x, vizinho_y in [(x, y)] + self.cenario.obter_coordenadas_vizinhas(x, y):
+            casa = vizinho_y * self.cenario.largura + vizinho_x
+            self.atualizar_estado(casa)
+            self.atualizar_estado(casa + self.total)
+        self.propagar()
+
+    # Casas alteradas direto no cenário não dizem o que mudou, então o campo é refeito
+    def sincronizar(self):
+        if self.versao != self.cenario.versao:
+            self.montar(self.cenario.saida_posicao)
+
+    # Distância e estado seguinte de um personagem. Um personagem que começa em uma fruta sem fruta está em um
+    # estado que o campo não guarda, então o seguinte é escolhido pelos vizinhos
+    def consultar(self, estado):
+        if self.grafo.estado_possivel(estado) or estado % self.total == self.saida:
+            return self.distancias[estado], self.seguintes[estado]
+        return self.melhor_seguinte(estado)
+
+    # Distância até a saída no custo original, ou None se a saída não for alcançável
+    def distancia(self, x, y, tem_fruta=False):
+        self.sincronizar()
+        distancia, _ = self.consultar(self.estado(x, y, tem_fruta))
+        return None if distancia >= INFINITO else distancia / 10
+
+    # Próxima casa (x, y, tem_fruta) a partir da posição, ou None na saída ou sem caminho
+    def proximo_passo(self, x, y, tem_fruta=False):
+        self.sincronizar()
+        distancia, seguinte = self.consultar(self.estado(x, y, tem_fruta))
+        if distancia >= INFINITO or seguinte == SEM_PAI:
+            return None
+        tem_fruta, casa = divmod(seguinte, self.total)
+        return casa % self.cenario.largura, casa // self.cenario.largura, bool(tem_fruta)
+
+    # Caminho do início ({'x': x, 'y': y}) até a saída seguindo o campo, nas mesmas Casas que achar_caminho
+    # devolve, ou [] se a saída não for alcançável
+    def achar_caminho(self, inicio=None):
+        self.sincronizar()
+        inicio = inicio or self.cenario.personagem_posicao
+        if not inicio or self.saida is None:
+            return []
+        estado = self.estado(inicio['x'], inicio['y'])
+        distancia, seguinte = self.consultar(estado)
+        if distancia >= INFINITO:
+            return []
+
+        largura, total = self.cenario.largura, self.total
+        estados = [estado]
+        while seguinte != SEM_PAI:
+            estados.append(seguinte)
+            seguinte = self.seguintes[seguinte]
+        coordenadas = ((estado % total % largura, estado % total // largura) for estado in estados)
+        saida = {'x': self.saida % largura, 'y': self.saida // largura}
+        return montar_caminho(self.cenario, coordenadas, saida)
+
+
+# Comparar o campo de fluxo com uma procura do A* compacto por personagem, para muitos personagens indo para a
+# mesma saída, e o tempo para reparar o campo depois de alterar uma casa
+def main():
+    tamanho, personagens = 200, 500
+    print(f'{"cenário":>11} {"campo s":>8} {"caminhos s":>10} {"a* s":>8} {"reparo s":>9}')
+    for tipo in ('aberto', 'obstaculos', 'labirinto', 'corredores'):
+        cenario = Cenario(gerar_cenario(tipo, tamanho, tamanho))
+        sorteio = random.Random(0)
+        inicios = [{'x': sorteio.randrange(tamanho), 'y': sorteio.randrange(tamanho)} for _ in range(personagens)]
+
+        comeco = time.perf_counter()
+        campo = CampoDeFluxo(cenario)
+        tempo_campo = time.perf_counter() - comeco
+        comeco = time.perf_counter()
+        for inicio in inicios:
+            campo.achar_caminho(inicio)
+        tempo_caminhos = time.perf_counter() - comeco
+
+        comeco = time.perf_counter()
+        for inicio in inicios[:20]:
+            achar_caminho(cenario, Motor.COMPACTO, inicio, historico=ModoHistorico.DESLIGADO)
+        tempo_plano = (time.perf_counter() - comeco) / 20 * personagens
+
+        x, y = tamanho // 2, tamanho // 2
+        comeco = time.perf_counter()
+        campo.atualizar_celula(x, y, Celula.SEMI_BARREIRA)
+        tempo_reparo = time.perf_counter() - comeco
+        print(f'{tipo:>11} {tempo_campo:>8.3f} {tempo_caminhos:>10.3f} {tempo_plano:>8.3f} {tempo_reparo:>9.4f}')
+
+
+if __name__ == '__main__':
+    main()
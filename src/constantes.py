@@ -19,6 +19,24 @@ class Celula:
     VALIDAS = {VAZIA, PERSONAGEM, SAIDA, BARREIRA, SEMI_BARREIRA, FRUTA}
 
 
+# Implementações disponíveis do algoritmo A*
+class Motor:
+    PADRAO = 'padrao'  # Casas e tuplas nomeadas, mais fácil de acompanhar
+    COMPACTO = 'compacto'  # Vetores planos, indicado para cenários grandes
+    SALTOS = 'saltos'  # Jump Point Search, pula as regiões vazias sem abrir cada casa
+    BIDIRECIONAL = 'bidirecional'  # Do personagem e da saída ao mesmo tempo, ganha em mapas grandes com paredes
+    BALDES = 'baldes'  # Custos inteiros e fila de baldes no lugar do heapq, empates de f pelo maior g
+    MARCOS = 'marcos'  # Motor de baldes com a heurística ALT (marcos), mais forte em labirintos
+
+
+# Formas de guardar os eventos (casa aberta/fechada) da procura. Também é possível passar uma função,
+# chamada com (casa, operação) assim que cada evento acontece
+class ModoHistorico:
+    COMPLETO = 'completo'  # Lista de (Casa, OPERACAO)
+    COMPACTO = 'compacto'  # Vetores de (índice do estado, operação)
+    DESLIGADO = 'desligado'  # Nada é guardado
+
+
 CENARIO_PADRAO = [
     ['C', '_', '_', '_', 'B', '_'],
     ['_', 'B', '_', '_', 'F', '_'],
@@ -77,4 +95,7 @@ CORES_CELULA = {
 # Informações para localizar imagens do jogo
 CAMINHO_ABSOLUTO_DO_SCRIPT = os.path.dirname(os.path.abspath(__file__))
 CAMINHO_PASTA_IMG = os.path.join(CAMINHO_ABSOLUTO_DO_SCRIPT, '..', 'img')
+# Atlas de imagens já redimensionadas, guardados entre execuções
+CAMINHO_PASTA_CACHE = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                                   'a_estrela_python')
 NOME_PADRAO_FRAME_ANIMACAO = 'pixil-frame-'
\ No newline at end of file
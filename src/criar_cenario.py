@@ -31,7 +31,10 @@ N_INPUTS = 2
 CARACTERE_CURSOR = "_"
 
 # Texto principal da tela de grid
-TITULO_TELA_CENARIO = "Criador de Cenário. Aperte espaço para fechar."
+TITULO_TELA_CENARIO = "Criador de Cenário. Aperte espaço para fechar e G para salvar."
+
+# Arquivo onde o editor grava o cenário no formato binário (tecla G)
+ARQUIVO_CENARIO = 'cenario.mapa'
 
 # Valores válidos de célula
 VALIDAS = (
@@ -45,11 +48,9 @@ VALIDAS = (
 
 # ==========================
 
-pygame.init()
-
 
 class Estado:
-    fonte = pygame.font.SysFont(None, TAMANHO_FONTE)
+    fonte = None
     imagens_dict = {}
     tela = None
     cenario = None
@@ -139,7 +140,15 @@ def mover_selecao(tamanho, anterior, nova):
     pygame.display.flip()
 
 
+# Iniciar o pygame e a fonte no primeiro uso do editor, e não ao importar o módulo
+def iniciar_editor():
+    if Estado.fonte is None:
+        pygame.init()
+        Estado.fonte = pygame.font.SysFont(None, TAMANHO_FONTE)
+
+
 def obter_cenario_gui():
+    iniciar_editor()
     linhas, colunas = input_linhas_colunas_tela()
 
     tamanho = max(MIN_TAMANHO_CELULA, LARGURA_TELA // colunas)
@@ -170,6 +179,12 @@ def obter_cenario_gui():
                         print(repr(linha))
                     return Estado.cenario
 
+                if key == pygame.K_g:
+                    from src.mapa_binario import salvar_cenario
+                    salvar_cenario(ARQUIVO_CENARIO, Estado.cenario)
+                    print(f"Cenário salvo em {ARQUIVO_CENARIO}")
+                    continue
+
                 movimento = {
                     pygame.K_w: (-1, 0),
                     pygame.K_s: (1, 0),
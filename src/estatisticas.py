@@ -0,0 +1,74 @@
+import sys
+
+from src.constantes import OPERACAO
+
+
+# Números de uma procura, devolvidos junto com o caminho por todos os motores
+class EstatisticasDaProcura:
+    __slots__ = ['motor', 'expandidas', 'insercoes', 'retiradas_obsoletas', 'reaberturas', 'pico_abertas',
+                 'pico_memoria_bytes', 'segundos_preparacao', 'segundos_procura', 'segundos_caminho', 'do_cache']
+
+    def __init__(self, motor):
+        self.motor = motor
+        self.expandidas = 0  # Estados fechados, incluindo o da saída
+        self.insercoes = 0  # Entradas colocadas na fila de prioridade
+        self.retiradas_obsoletas = 0  # Entradas retiradas da fila de estados já fechados e descartadas
+        self.reaberturas = 0  # Inserções de um estado que já estava na fila, com f menor
+        self.pico_abertas = 0  # Maior tamanho da fila
+        self.pico_memoria_bytes = 0
+        self.segundos_preparacao = 0.0  # Vetores, índices e campos de h
+        self.segundos_procura = 0.0
+        self.segundos_caminho = 0.0  # Montagem do caminho e do histórico
+        self.do_cache = False  # Caminho lido do CacheDeCaminhos, sem procura
+
+    @property
+    def segundos(self):
+        return self.segundos_preparacao + self.segundos_procura + self.segundos_caminho
+
+    def como_dicionario(self):
+        dados = {nome: getattr(self, nome) for nome in EstatisticasDaProcura.__slots__}
+        dados['segundos'] = self.segundos
+        return dados
+
+    def __repr__(self):
+        return f'EstatisticasDaProcura({self.como_dicionario()})'
+
+
+# Soma rasa dos tamanhos dos objetos, usada para estimar a memória das estruturas da procura
+def estimar_bytes(*objetos):
+    return sum(sys.getsizeof(objeto) for objeto in objetos)
+
+
+# Resultado de achar_caminho: continua sendo o par (caminho, histórico), então quem desempacota o resultado não
+# muda, e leva as estatísticas da procura
+class ResultadoDaProcura(tuple):
+    def __new__(cls, caminho, historico, estatisticas):
+        resultado = super().__new__(cls, (caminho, historico))
+        resultado.estatisticas = estatisticas
+        return resultado
+
+    def __reduce__(self):
+        return ResultadoDaProcura, (self[0], self[1], self.estatisticas)
+
+
+# Funções chamadas a cada estado expandido e inserido na fila, com (x, y, tem_fruta, g)
+class Ganchos:
+    __slots__ = ['ao_expandir', 'ao_inserir']
+
+    def __init__(self, ao_expandir=None, ao_inserir=None):
+        self.ao_expandir = ao_expandir
+        self.ao_inserir = ao_inserir
+
+    def notificar(self, operacao, x, y, tem_fruta, g):
+        gancho = self.ao_expandir if operacao == OPERACAO.CASA_FECHADA else self.ao_inserir
+        if gancho is not None:
+            gancho(x, y, tem_fruta, g)
+
+    # Função de eventos (casa, operação) que chama os ganchos e depois a função original, se houver
+    def envolver(self, registrar_evento):
+        def registrar(casa, operacao):
+            self.notificar(operacao, casa.posicao.x, casa.posicao.y, casa.tem_fruta, casa.g)
+            if registrar_evento:
+                registrar_evento(casa, operacao)
+
+        return registrar
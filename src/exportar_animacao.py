@@ -0,0 +1,222 @@
+import os
+
+# Sem janela: o driver de vídeo dummy precisa ser escolhido antes de algum módulo importado iniciar o pygame,
+# para rodar em máquinas sem tela
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import math
+import multiprocessing
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+from src.a_estrela import Casa, Cenario, PosicaoComContexto, achar_caminho, calcular_h, caminho_em_tuplas, \
+    caminho_de_tuplas
+from src.a_estrela_gui import IMAGENS, Estado, desenhar_casa_anotada, desenhar_celula, \
+    desenhar_fundo_caminho_final, interpolar_posicao, preparar_passo
+from src.cache_superficies import CacheDeSuperficies
+from src.constantes import Motor, ModoHistorico, CENARIO_PADRAO, CORES_CELULA, TAMANHO_CELULA, FPS, \
+    TEMPO_ENTRE_ETAPAS_MS, FONTE_NOME, FONTE_TAMANHO, Cores
+from src.historico import HistoricoCompacto, OPERACOES
+
+# O Pillow é opcional: só é usado para gravar GIF. Sem ele, os quadros são gravados em PNG pelo próprio pygame
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+PILLOW_DISPONIVEL = Image is not None
+
+# Quadros desenhados para cada frame do personagem na caminhada, os mesmos que a interface mostra a FPS quadros
+# por segundo enquanto espera TEMPO_ENTRE_ETAPAS_MS
+QUADROS_POR_FRAME = max(1, TEMPO_ENTRE_ETAPAS_MS * FPS // 1000)
+NOME_QUADRO = 'quadro_{:06d}.png'
+
+
+# Preparar a fonte e as superfícies usadas para desenhar, sem abrir janela
+def preparar_desenho():
+    pygame.font.init()
+    if Estado.fonte is None:
+        Estado.fonte = pygame.font.SysFont(FONTE_NOME, FONTE_TAMANHO)
+    if Estado.superficies is None:
+        Estado.superficies = CacheDeSuperficies(TAMANHO_CELULA, Estado.fonte)
+
+
+# Eventos do histórico como tuplas (x, y, g, h, f, OPERACAO), que podem ser enviadas aos processos de trabalho.
+# O histórico compacto não guarda h, então ele é recalculado como na procura, até a saída usada nela
+def eventos_do_historico(cenario, historico, saida=None):
+    if not isinstance(historico, HistoricoCompacto):
+        return [(casa.posicao.x, casa.posicao.y, casa.g, casa.h, casa.f, operacao) for casa, operacao in historico]
+
+    saida = saida or cenario.saida_posicao
+    saida = PosicaoComContexto(saida['x'], saida['y'], None, None)
+    total = cenario.largura * cenario.altura
+    eventos = []
+    for indice, operacao, g in zip(historico.indices, historico.operacoes, historico.gs):
+        y, x = divmod(indice % total, cenario.largura)
+        h = calcular_h(PosicaoComContexto(x, y, None, None), saida)
+        eventos.append((x, y, g, h, g + h, OPERACOES[operacao]))
+    return eventos
+
+
+def contar_quadros(eventos, caminho, eventos_por_quadro=1):
+    quadros = 1 + math.ceil(len(eventos) / eventos_por_quadro) + len(caminho)
+    if len(caminho) > 1 and IMAGENS['ANIMACAO_PERSONAGEM']:
+        quadros += 2  # Fundo da caminhada e personagem parado no fim
+        for casa in caminho[:-1]:
+            frames = IMAGENS['ANIMACAO_PERSONAGEM_FRUTA' if casa.tem_fruta else 'ANIMACAO_PERSONAGEM']
+            quadros += len(frames) * QUADROS_POR_FRAME
+    return quadros
+
+
+# Quadros da animação, na ordem da interface, sempre no mesmo buffer
+def gerar_quadros(cenario, eventos, caminho, eventos_por_quadro=1):
+    buffer = pygame.Surface((cenario.largura * TAMANHO_CELULA, cenario.altura * TAMANHO_CELULA))
+    buffer.fill(Cores.BRANCO)
+    for posicao in cenario:
+        desenhar_celula(buffer, posicao)
+    yield buffer
+
+    for inicio in range(0, len(eventos), eventos_por_quadro):
+        for x, y, g, h, f, operacao in eventos[inicio:inicio + eventos_por_quadro]:
+            casa = Casa(PosicaoComContexto(x, y, None, None), f, g, h, False)
+            desenhar_casa_anotada(buffer, cenario, casa, CORES_CELULA[operacao])
+        yield buffer
+
+    for casa in caminho:
+        desenhar_casa_anotada(buffer, cenario, casa, CORES_CELULA['CAMINHO_FINAL'])
+        yield buffer
+
+    if len(caminho) > 1 and IMAGENS['ANIMACAO_PERSONAGEM']:
+        yield from gerar_quadros_caminhada(buffer, cenario, caminho)
+
+
+# A caminhada do personagem de desenhar_caminho_final, com o progresso de cada passo dividido em quadros iguais
+def gerar_quadros_caminhada(buffer, cenario, caminho):
+    cenario_fundo = desenhar_fundo_caminho_final(buffer.get_size(), cenario, caminho)
+    buffer.blit(cenario_fundo, (0, 0))
+    yield buffer
+
+    frames_animacao = IMAGENS['ANIMACAO_PERSONAGEM']
+    areas_sujas = []
+    for casa_atual, casa_posterior in zip(caminho, caminho[1:]):
+        frames_animacao, area_fruta = preparar_passo(cenario_fundo, casa_atual, frames_animacao)
+        if area_fruta:
+            areas_sujas.append(area_fruta)
+
+        quadros = len(frames_animacao) * QUADROS_POR_FRAME
+        for quadro in range(quadros):
+            for area in areas_sujas:
+                buffer.blit(cenario_fundo, area, area)
+            posicao = interpolar_posicao(casa_atual, casa_posterior, (quadro + 1) / quadros)
+            areas_sujas = [buffer.blit(frames_animacao[quadro // QUADROS_POR_FRAME], posicao)]
+            yield buffer
+
+    for area in areas_sujas:
+        buffer.blit(cenario_fundo, area, area)
+    buffer.blit(frames_animacao[0], interpolar_posicao(caminho[-2], caminho[-1], 1))
+    yield buffer
+
+
+def redimensionar(buffer, escala):
+    if escala == 1:
+        return buffer
+    largura, altura = buffer.get_size()
+    return pygame.transform.smoothscale(buffer, (max(1, round(largura * escala)), max(1, round(altura * escala))))
+
+
+# Gravar em PNG os quadros de número inicio até fim (exclusivo). Os quadros anteriores são desenhados sem gravar,
+# para o buffer chegar ao mesmo estado que teria na animação inteira
+def gravar_quadros(cenario, eventos, dados_caminho, pasta, inicio, fim, eventos_por_quadro=1, escala=1):
+    preparar_desenho()
+    caminho = caminho_de_tuplas(dados_caminho)
+    for numero, buffer in enumerate(gerar_quadros(cenario, eventos, caminho, eventos_por_quadro)):
+        if numero >= fim:
+            break
+        if numero >= inicio:
+            pygame.image.save(redimensionar(buffer, escala), os.path.join(pasta, NOME_QUADRO.format(numero)))
+    return fim - inicio
+
+
+# Gravar a animação em quadros PNG numerados, procurando agora se não vierem caminho e histórico. A saída
+# ({'x': x, 'y': y}) é a da procura, se ela não foi até a saída do cenário. Devolve o total de quadros
+def exportar_quadros(cenario, pasta, caminho=None, historico=None, motor=Motor.PADRAO, eventos_por_quadro=1,
+                     escala=1, processos=1, saida=None):
+    if (caminho is None) != (historico is None):
+        raise ValueError('Informe o caminho e o histórico juntos, ou nenhum dos dois para fazer a procura agora')
+    if historico is None:
+        caminho, historico = achar_caminho(cenario, motor, saida=saida, historico=ModoHistorico.COMPLETO)
+    eventos = eventos_do_historico(cenario, historico, saida)
+    dados_caminho = caminho_em_tuplas(caminho or [])
+    total = contar_quadros(eventos, caminho or [], eventos_por_quadro)
+    os.makedirs(pasta, exist_ok=True)
+
+    if processos is None:
+        processos = os.cpu_count() or 1
+    if processos <= 1:
+        gravar_quadros(cenario, eventos, dados_caminho, pasta, 0, total, eventos_por_quadro, escala)
+        return total
+
+    limites = [total * parte // processos for parte in range(processos + 1)]
+    metodos = multiprocessing.get_all_start_methods()
+    contexto = multiprocessing.get_context('fork' if 'fork' in metodos else None)
+    with ProcessPoolExecutor(processos, mp_context=contexto) as executor:
+        tarefas = [executor.submit(gravar_quadros, cenario, eventos, dados_caminho, pasta, inicio, fim,
+                                   eventos_por_quadro, escala)
+                   for inicio, fim in zip(limites, limites[1:]) if fim > inicio]
+        for tarefa in tarefas:
+            tarefa.result()
+    return total
+
+
+# Gravar a animação como GIF animado (precisa do Pillow), com duracao_ms por quadro. Os quadros passam por uma
+# pasta temporária de PNGs, então o GIF pode ser montado com os quadros desenhados em vários processos
+def exportar_gif(cenario, arquivo, caminho=None, historico=None, motor=Motor.PADRAO, eventos_por_quadro=1,
+                 escala=1, processos=1, duracao_ms=1000 // FPS, saida=None):
+    if not PILLOW_DISPONIVEL:
+        raise RuntimeError('Gravar GIF precisa do Pillow (pip install pillow); sem ele, use exportar_quadros')
+
+    pasta = tempfile.mkdtemp(prefix='quadros_')
+    try:
+        total = exportar_quadros(cenario, pasta, caminho, historico, motor, eventos_por_quadro, escala, processos,
+                                 saida)
+        quadros = (Image.open(os.path.join(pasta, NOME_QUADRO.format(numero))) for numero in range(total))
+        primeiro = next(quadros)
+        primeiro.save(arquivo, save_all=True, append_images=quadros, duration=duracao_ms, loop=0)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grava a animação da procura sem abrir janela.')
+    parser.add_argument('destino', help='pasta para os quadros PNG, ou arquivo .gif')
+    parser.add_argument('--mapa', help='cenário no formato binário (padrão: o cenário de exemplo)')
+    parser.add_argument('--motor', choices=(Motor.PADRAO, Motor.COMPACTO, Motor.SALTOS, Motor.BIDIRECIONAL,
+                                            Motor.BALDES, Motor.MARCOS),
+                        default=Motor.PADRAO)
+    parser.add_argument('--eventos-por-quadro', type=int, default=1)
+    parser.add_argument('--escala', type=float, default=1)
+    parser.add_argument('--processos', type=int, default=1)
+    argumentos = parser.parse_args()
+
+    if argumentos.mapa:
+        from src.mapa_binario import carregar_cenario
+        cenario = carregar_cenario(argumentos.mapa)
+    else:
+        cenario = Cenario(CENARIO_PADRAO)
+
+    opcoes = dict(motor=argumentos.motor, eventos_por_quadro=argumentos.eventos_por_quadro,
+                  escala=argumentos.escala, processos=argumentos.processos)
+    if argumentos.destino.lower().endswith('.gif'):
+        total = exportar_gif(cenario, argumentos.destino, **opcoes)
+    else:
+        total = exportar_quadros(cenario, argumentos.destino, **opcoes)
+    print(f'{total} quadros gravados em {argumentos.destino}')
+
+
+if __name__ == '__main__':
+    main()
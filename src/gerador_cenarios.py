@@ -0,0 +1,121 @@
+import random
+
+from src.constantes import Celula
+
+# Células que podem ser sorteadas no meio do cenário (personagem e saída são colocados depois)
+CELULAS_SORTEADAS = (Celula.VAZIA, Celula.BARREIRA, Celula.SEMI_BARREIRA, Celula.FRUTA)
+
+
+def _matriz_vazia(largura, altura, celula=Celula.VAZIA):
+    return [[celula] * largura for _ in range(altura)]
+
+
+# Casas sorteadas linha a linha, cada tipo com o peso informado (na ordem de CELULAS_SORTEADAS)
+def _sortear_casas(largura, altura, sorteio, pesos):
+    return [sorteio.choices(CELULAS_SORTEADAS, pesos, k=largura) for _ in range(altura)]
+
+
+# Espalhar casas especiais (barreira, semi-barreira e fruta) nas casas vazias com a probabilidade informada
+def _espalhar_especiais(matriz, sorteio, densidade):
+    especiais = (Celula.BARREIRA, Celula.SEMI_BARREIRA, Celula.FRUTA)
+    for linha in matriz:
+        for x, celula in enumerate(linha):
+            if celula == Celula.VAZIA and sorteio.random() < densidade:
+                linha[x] = sorteio.choice(especiais)
+
+
+# Barreiras, semi-barreiras e frutas sorteadas em todo o cenário. Personagem e saída em cantos opostos
+def gerar_obstaculos_aleatorios(largura, altura, semente=0, densidade=0.3):
+    sorteio = random.Random(semente)
+    pesos = (1 - densidade, densidade * 0.6, densidade * 0.3, densidade * 0.1)
+    matriz = _sortear_casas(largura, altura, sorteio, pesos)
+    matriz[0][0] = Celula.PERSONAGEM
+    matriz[altura - 1][largura - 1] = Celula.SAIDA
+    return matriz
+
+
+# Labirinto perfeito com paredes de barreira, escavado por busca em profundidade a partir do canto superior
+# esquerdo. Algumas frutas permitem atravessar paredes e algumas semi-barreiras deixam corredores mais lentos
+def gerar_labirinto(largura, altura, semente=0, densidade=0.02):
+    sorteio = random.Random(semente)
+    matriz = _matriz_vazia(largura, altura, Celula.BARREIRA)
+    matriz[0][0] = Celula.VAZIA
+    pilha = [(0, 0)]
+    while pilha:
+        x, y = pilha[-1]
+        vizinhos = [(x + dx, y + dy, dx, dy) for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                    if 0 <= x + dx < largura and 0 <= y + dy < altura and matriz[y + dy][x + dx] == Celula.BARREIRA]
+        if not vizinhos:
+            pilha.pop()
+            continue
+        vizinho_x, vizinho_y, dx, dy = sorteio.choice(vizinhos)
+        matriz[y + dy // 2][x + dx // 2] = Celula.VAZIA
+        matriz[vizinho_y][vizinho_x] = Celula.VAZIA
+        pilha.append((vizinho_x, vizinho_y))
+
+    for linha in matriz:
+        for x, celula in enumerate(linha):
+            if celula == Celula.VAZIA and sorteio.random() < densidade:
+                linha[x] = sorteio.choice((Celula.SEMI_BARREIRA, Celula.FRUTA))
+    matriz[0][0] = Celula.PERSONAGEM
+    matriz[altura - 1 - (altura - 1) % 2][largura - 1 - (largura - 1) % 2] = Celula.SAIDA
+    return matriz
+
+
+# Campo aberto com poucas casas especiais. Com muro, uma coluna de barreiras aberta só no topo fica entre o
+# personagem e a saída, o que engana a heurística e obriga a procura a abrir boa parte do cenário
+def gerar_campo_aberto(largura, altura, semente=0, densidade=0.02, muro=False):
+    sorteio = random.Random(semente)
+    matriz = _matriz_vazia(largura, altura)
+    _espalhar_especiais(matriz, sorteio, densidade)
+    if muro:
+        for y in range(1, altura):
+            matriz[y][largura // 2] = Celula.BARREIRA
+        matriz[altura // 2][0] = Celula.PERSONAGEM
+        matriz[altura // 2][largura - 1] = Celula.SAIDA
+    else:
+        matriz[0][0] = Celula.PERSONAGEM
+        matriz[altura - 1][largura - 1] = Celula.SAIDA
+    return matriz
+
+
+# Salas separadas por paredes inteiras de barreira. Cada sala tem uma fruta, então o personagem precisa pegar a
+# fruta de cada sala para atravessar a parede seguinte (a fruta é gasta na travessia)
+def gerar_corredores_com_fruta(largura, altura, semente=0, densidade=0.05, largura_sala=8):
+    sorteio = random.Random(semente)
+    matriz = _matriz_vazia(largura, altura)
+    _espalhar_especiais(matriz, sorteio, densidade)
+    paredes = list(range(largura_sala, largura - 1, largura_sala + 1))
+    for parede in paredes:
+        for linha in matriz:
+            linha[parede] = Celula.BARREIRA
+
+    cantos = ((0, 0), (largura - 1, altura - 1))
+    inicio_sala = 0
+    for fim_sala in paredes + [largura]:
+        fruta = cantos[0]
+        while fruta in cantos:
+            fruta = (sorteio.randrange(inicio_sala, fim_sala), sorteio.randrange(altura))
+        matriz[fruta[1]][fruta[0]] = Celula.FRUTA
+        inicio_sala = fim_sala + 1
+    matriz[0][0] = Celula.PERSONAGEM
+    matriz[altura - 1][largura - 1] = Celula.SAIDA
+    return matriz
+
+
+# Tipos de cenário disponíveis, usados pelo benchmark
+GERADORES = {
+    'obstaculos': gerar_obstaculos_aleatorios,
+    'labirinto': gerar_labirinto,
+    'aberto': gerar_campo_aberto,
+    'corredores': gerar_corredores_com_fruta,
+}
+
+
+# Gerar um cenário de um dos tipos de GERADORES. A mesma semente sempre gera o mesmo cenário
+def gerar_cenario(tipo, largura, altura, semente=0):
+    if tipo not in GERADORES:
+        raise ValueError(f'Tipo de cenário desconhecido: {tipo}. Opções: {", ".join(GERADORES)}')
+    if largura < 2 or altura < 2:
+        raise ValueError('O cenário precisa ter pelo menos 2x2 casas')
+    return GERADORES[tipo](largura, altura, semente)
@@ -0,0 +1,45 @@
+import importlib.util
+
+# Preparação vetorizada do cenário com NumPy (opcional, importado só no primeiro uso)
+NUMPY_DISPONIVEL = importlib.util.find_spec('numpy') is not None
+np = None
+
+
+def obter_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+# Matriz uint8 (altura, largura) sobre o vetor plano de células, sem cópia: alterações no vetor aparecem na grade
+def criar_grade(celulas, largura, altura):
+    np = obter_numpy()
+    return np.frombuffer(celulas, dtype=np.uint8).reshape(altura, largura)
+
+
+# Posições (x, y) das casas com a célula informada, em ordem de coluna e depois de linha, a mesma ordem em que
+# localizar_personagem_e_saida percorre o cenário
+def localizar_celulas(grade, celula):
+    np = obter_numpy()
+    return np.argwhere(grade.T == ord(celula))
+
+
+# Última posição com a célula, no formato {'x': x, 'y': y}, ou None se ela não estiver no cenário
+def localizar_ultima(grade, celula):
+    posicoes = localizar_celulas(grade, celula)
+    if not len(posicoes):
+        return None
+    x, y = posicoes[-1]
+    return {'x': int(x), 'y': int(y)}
+
+
+# Distância em linha reta de todas as casas até a saída, igual a calcular_h, indexada por y * largura + x.
+# Devolvida como memoryview para que cada leitura seja um float do Python, e não um escalar do NumPy
+def calcular_campo_h(largura, altura, saida):
+    np = obter_numpy()
+    base = np.arange(largura, dtype=np.float64) - saida['x']
+    altura_ate_saida = np.arange(altura, dtype=np.float64)[:, np.newaxis] - saida['y']
+    campo = np.round(np.hypot(base, altura_ate_saida), 1)
+    return memoryview(campo.ravel())
@@ -0,0 +1,95 @@
+from src.a_estrela import Cenario
+from src.constantes import Celula
+
+# Custos multiplicados por 10 para serem inteiros: comparar custos somados em float acumularia erros de
+# arredondamento
+CUSTO_RETO = 10
+CUSTO_DIAGONAL = 14
+CUSTO_BARREIRA = 10
+INFINITO = 2 ** 62
+
+BARREIRA = ord(Celula.BARREIRA)
+SEMI_BARREIRA = ord(Celula.SEMI_BARREIRA)
+FRUTA = ord(Celula.FRUTA)
+VALIDAS = frozenset(ord(celula) for celula in Celula.VALIDAS)
+
+# (dx, dy, custo do passo sem barreira) na mesma ordem de Cenario.DIRECOES
+PASSOS = tuple((dx, dy, CUSTO_RETO if dx == 0 or dy == 0 else CUSTO_DIAGONAL) for dx, dy in Cenario.DIRECOES)
+
+
+# Menor custo possível entre duas casas andando em 8 direções (octil), nunca maior que o custo real
+def calcular_h_octil(x1, y1, x2, y2):
+    dx, dy = abs(x1 - x2), abs(y1 - y2)
+    return CUSTO_DIAGONAL * min(dx, dy) + CUSTO_RETO * abs(dx - dy)
+
+
+# Arestas entre os estados (x, y, tem_fruta) com custos inteiros, opcionalmente restritas a um retângulo
+class GrafoDeEstados:
+    __slots__ = ['celulas', 'largura', 'altura', 'total']
+
+    def __init__(self, cenario):
+        self.celulas = cenario.obter_celulas_compactas()
+        self.largura = cenario.largura
+        self.altura = cenario.altura
+        self.total = cenario.largura * cenario.altura
+
+    # Estados seguintes e o custo para entrar em cada um
+    def sucessores(self, estado, limites=None):
+        largura, celulas, total = self.largura, self.celulas, self.total
+        x_inicial, y_inicial, x_final, y_final = limites or (0, 0, largura, self.altura)
+        tem_fruta, casa = divmod(estado, total)
+        y, x = divmod(casa, largura)
+        for dx, dy, custo in PASSOS:
+            vizinho_x, vizinho_y = x + dx, y + dy
+            if not (x_inicial <= vizinho_x < x_final and y_inicial <= vizinho_y < y_final):
+                continue
+            vizinha = vizinho_y * largura + vizinho_x
+            celula = celulas[vizinha]
+            if celula not in VALIDAS or (celula == BARREIRA and not tem_fruta):
+                continue
+            if celula == BARREIRA or celula == SEMI_BARREIRA:
+                custo += CUSTO_BARREIRA
+            fruta_vizinha = (tem_fruta and celula != BARREIRA) or celula == FRUTA
+            yield (vizinha + total if fruta_vizinha else vizinha), custo
+
+    # Estados anteriores e o custo da aresta até o estado informado
+    def antecessores(self, estado, inicio=None, limites=None):
+        largura, celulas, total = self.largura, self.celulas, self.total
+        x_inicial, y_inicial, x_final, y_final = limites or (0, 0, largura, self.altura)
+        tem_fruta, casa = divmod(estado, total)
+        celula = celulas[casa]
+        if celula not in VALIDAS:
+            return
+        if celula == FRUTA:
+            if not tem_fruta:
+                return
+            camadas = (0, total)
+        elif celula == BARREIRA:
+            if tem_fruta:
+                return
+            camadas = (total,)
+        else:
+            camadas = (total if tem_fruta else 0,)
+        barreira = CUSTO_BARREIRA if celula == BARREIRA or celula == SEMI_BARREIRA else 0
+
+        y, x = divmod(casa, largura)
+        for dx, dy, custo in PASSOS:
+            anterior_x, anterior_y = x - dx, y - dy
+            if not (x_inicial <= anterior_x < x_final and y_inicial <= anterior_y < y_final):
+                continue
+            anterior = anterior_y * largura + anterior_x
+            celula_anterior = celulas[anterior]
+            if celula_anterior not in VALIDAS:
+                continue
+            for camada in camadas:
+                impossivel = (celula_anterior == FRUTA and not camada) or (celula_anterior == BARREIRA and camada)
+                if impossivel and anterior != inicio:
+                    continue
+                yield anterior + camada, custo + barreira
+
+    # Estado possível de ser ocupado: fora do início, ninguém fica em uma fruta sem fruta nem em uma barreira
+    # com fruta
+    def estado_possivel(self, estado):
+        tem_fruta, casa = divmod(estado, self.total)
+        celula = self.celulas[casa]
+        return celula in VALIDAS and not ((celula == FRUTA and not tem_fruta) or (celula == BARREIRA and tem_fruta))
@@ -0,0 +1,191 @@
+import heapq
+import os
+import struct
+from array import array
+
+from src.constantes import Celula
+from src.grafo_estados import INFINITO, GrafoDeEstados, calcular_h_octil
+
+QUANTIDADE_MARCOS = 4
+SEM_DISTANCIA = 2 ** 31 - 1  # Estado que não alcança o marco (ou não é alcançado por ele) nas tabelas
+
+# Arquivo de marcos: cabeçalho, casas dos marcos e as distâncias de cada marco, em little-endian
+ASSINATURA = b'AMRC'
+VERSAO_FORMATO = 1
+CABECALHO = struct.Struct('<4sB3xIII16s')
+EXTENSAO = '.marcos'
+
+FRUTA = ord(Celula.FRUTA)
+
+
+# Distâncias (custos inteiros do grafo de estados) das origens até todos os estados, seguindo as arestas
+# normais, ou de todos os estados até as origens, seguindo as invertidas
+def calcular_distancias(grafo, origens, para_tras=False):
+    distancias = array('i', [SEM_DISTANCIA]) * (2 * grafo.total)
+    vizinhos = grafo.antecessores if para_tras else grafo.sucessores
+    fila = []
+    for origem in origens:
+        distancias[origem] = 0
+        fila.append((0, origem))
+    while fila:
+        distancia, estado = heapq.heappop(fila)
+        if distancia > distancias[estado]:
+            continue
+        for vizinho, custo in vizinhos(estado):
+            if distancia + custo < distancias[vizinho]:
+                distancias[vizinho] = distancia + custo
+                heapq.heappush(fila, (distancia + custo, vizinho))
+    return distancias
+
+
+# Marcos do ALT com as distâncias de cada estado até o marco e do marco até cada estado
+class TabelaDeMarcos:
+    __slots__ = ['largura', 'altura', 'total', 'grafo', 'marcos', 'ate_marco', 'do_marco', 'impressao_digital']
+
+    def __init__(self, cenario, marcos=None, ate_marco=None, do_marco=None):
+        self.largura = cenario.largura
+        self.altura = cenario.altura
+        self.total = cenario.largura * cenario.altura
+        self.grafo = GrafoDeEstados(cenario)
+        self.impressao_digital = cenario.obter_impressao_digital()
+        self.marcos = marcos or array('i')
+        self.ate_marco = ate_marco or []
+        self.do_marco = do_marco or []
+
+    # Escolher e medir os marcos. Só casas sem fruta servem, porque o marco é o estado sem fruta da casa
+    @classmethod
+    def montar(cls, cenario, quantidade=QUANTIDADE_MARCOS):
+        tabela = cls(cenario)
+        grafo, total = tabela.grafo, tabela.total
+        candidatas = [casa for casa in range(total) if grafo.estado_possivel(casa) and grafo.celulas[casa] != FRUTA]
+        if not candidatas:
+            return tabela
+
+        menores = calcular_distancias(grafo, [candidatas[0]])
+        while len(tabela.marcos) < quantidade:
+            alcancadas = [casa for casa in candidatas if menores[casa] != SEM_DISTANCIA]
+            marco = max(alcancadas or candidatas, key=menores.__getitem__)
+            if marco in tabela.marcos:
+                break
+            tabela.marcos.append(marco)
+            tabela.do_marco.append(calcular_distancias(grafo, [marco]))
+            tabela.ate_marco.append(calcular_distancias(grafo, [marco], para_tras=True))
+            menores = array('i', map(min, *tabela.do_marco)) if len(tabela.do_marco) > 1 else tabela.do_marco[0]
+        return tabela
+
+    # Limite inferior da distância do estado até o alvo pelas desigualdades triangulares de todos os marcos, ou
+    # INFINITO se algum marco mostrar que o estado não alcança o alvo
+    def limite(self, estado, alvo):
+        melhor = 0
+        for ate_marco, do_marco in zip(self.ate_marco, self.do_marco):
+            ate_estado, ate_alvo = ate_marco[estado], ate_marco[alvo]
+            if ate_estado != SEM_DISTANCIA and ate_alvo != SEM_DISTANCIA:
+                melhor = max(melhor, ate_estado - ate_alvo)  # d(estado, alvo) >= d(estado, marco) - d(alvo, marco)
+            elif ate_alvo != SEM_DISTANCIA:
+                return INFINITO  # O alvo chega ao marco e o estado não, então o estado não chega ao alvo
+
+            do_estado, do_alvo = do_marco[estado], do_marco[alvo]
+            if do_estado != SEM_DISTANCIA and do_alvo != SEM_DISTANCIA:
+                melhor = max(melhor, do_alvo - do_estado)  # d(estado, alvo) >= d(marco, alvo) - d(marco, estado)
+            elif do_estado != SEM_DISTANCIA:
+                return INFINITO  # O marco chega ao estado e não ao alvo
+        return melhor
+
+    # Função de h até a saída: o maior entre a distância octil e o limite dos marcos
+    def heuristica(self, saida):
+        largura, total, grafo = self.largura, self.total, self.grafo
+        saida_x, saida_y = saida % largura, saida // largura
+        alvos = (saida, saida + total)
+
+        def calcular_h(estado):
+            casa = estado % total
+            octil = calcular_h_octil(casa % largura, casa // largura, saida_x, saida_y)
+            if not self.marcos or not grafo.estado_possivel(estado):
+                return octil
+            return max(octil, min(self.limite(estado, alvo) for alvo in alvos))
+
+        return calcular_h
+
+    # Gravar a tabela em um temporário e renomear, como salvar_cenario
+    def salvar(self, caminho):
+        cabecalho = CABECALHO.pack(ASSINATURA, VERSAO_FORMATO, self.largura, self.altura, len(self.marcos),
+                                   bytes.fromhex(self.impressao_digital))
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(cabecalho)
+            for vetor in (self.marcos, *self.ate_marco, *self.do_marco):
+                arquivo.write(_em_little_endian(vetor).tobytes())
+        os.replace(temporario, caminho)
+
+    # Ler uma tabela gravada por salvar. Devolve None se o arquivo não existir, estiver incompleto ou for de outro
+    # cenário (outras casas ou outro tamanho)
+    @classmethod
+    def carregar(cls, caminho, cenario):
+        try:
+            with open(caminho, 'rb') as arquivo:
+                dados = arquivo.read()
+        except OSError:
+            return None
+        if len(dados) < CABECALHO.size or dados[:len(ASSINATURA)] != ASSINATURA:
+            return None
+        _, versao, largura, altura, quantidade, impressao_digital = CABECALHO.unpack_from(dados)
+        total = largura * altura
+        if (versao != VERSAO_FORMATO or (largura, altura) != (cenario.largura, cenario.altura)
+                or impressao_digital.hex() != cenario.obter_impressao_digital()
+                or len(dados) != CABECALHO.size + 4 * (quantidade + 4 * quantidade * total)):
+            return None
+
+        vetores = []
+        inicio = CABECALHO.size
+        for tamanho in [quantidade] + [2 * total] * (2 * quantidade):
+            vetor = array('i')
+            vetor.frombytes(dados[inicio:inicio + 4 * tamanho])
+            vetores.append(_em_little_endian(vetor))
+            inicio += 4 * tamanho
+        return cls(cenario, vetores[0], vetores[1:1 + quantidade], vetores[1 + quantidade:])
+
+
+def _em_little_endian(vetor):
+    if struct.pack('=i', 1) == struct.pack('<i', 1):
+        return vetor
+    copia = array('i', vetor)
+    copia.byteswap()
+    return copia
+
+
+# Arquivo de marcos de um cenário carregado de arquivo: mesmo nome, extensão .marcos. None para cenários que
+# só existem em memória
+def caminho_dos_marcos(cenario):
+    arquivo = getattr(cenario.matriz_cenario, 'arquivo', None)
+    return None if arquivo is None else os.path.splitext(arquivo)[0] + EXTENSAO
+
+
+# Marcos de um cenário: lidos do arquivo ao lado do mapa quando ele existe e é do mesmo cenário, senão montados
+# (e gravados ao lado do mapa, para a próxima execução pular esse passo)
+def obter_tabela_de_marcos(cenario, quantidade=QUANTIDADE_MARCOS):
+    caminho = caminho_dos_marcos(cenario)
+    tabela = None if caminho is None else TabelaDeMarcos.carregar(caminho, cenario)
+    if tabela is None:
+        tabela = TabelaDeMarcos.montar(cenario, quantidade)
+        if caminho is not None:
+            try:
+                tabela.salvar(caminho)
+            except OSError:
+                pass  # Pasta sem permissão de escrita: a tabela só vale para esta execução
+    return tabela
+
+
+# Provedores de heurística para achar_caminho_em_baldes: chamados com (cenario, saida) e devolvem a função de h
+def heuristica_octil(cenario, saida):
+    largura, total = cenario.largura, cenario.largura * cenario.altura
+    saida_x, saida_y = saida['x'], saida['y']
+
+    def calcular_h(estado):
+        casa = estado % total
+        return calcular_h_octil(casa % largura, casa // largura, saida_x, saida_y)
+
+    return calcular_h
+
+
+def heuristica_de_marcos(cenario, saida):
+    return cenario.obter_tabela_de_marcos().heuristica(saida['y'] * cenario.largura + saida['x'])
@@ -0,0 +1,37 @@
+from array import array
+
+from src.constantes import OPERACAO
+
+# Operações registradas no histórico compacto
+ABRIU = 0
+FECHOU = 1
+OPERACOES = (OPERACAO.CASA_ABERTA, OPERACAO.CASA_FECHADA)
+CODIGOS_OPERACAO = {OPERACAO.CASA_ABERTA: ABRIU, OPERACAO.CASA_FECHADA: FECHOU}
+
+SEM_PAI = -1
+
+
+# Eventos de abrir e fechar estados guardados em vetores, sem criar objetos durante a procura.
+# O índice de um estado (x, y, tem_fruta) é y * largura + x + tem_fruta * largura * altura
+class HistoricoCompacto:
+    __slots__ = ['indices', 'operacoes', 'gs', 'pais']
+
+    def __init__(self):
+        self.indices = array('q')
+        self.operacoes = bytearray()
+        self.gs = array('d')
+        self.pais = array('q')
+
+    def registrar(self, indice, operacao, g, pai):
+        self.indices.append(indice)
+        self.operacoes.append(operacao)
+        self.gs.append(g)
+        self.pais.append(pai)
+
+    def __len__(self):
+        return len(self.indices)
+
+    # Percorrer os eventos como (índice do estado, OPERACAO)
+    def __iter__(self):
+        for indice, operacao in zip(self.indices, self.operacoes):
+            yield indice, OPERACOES[operacao]
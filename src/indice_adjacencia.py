@@ -0,0 +1,112 @@
+import sys
+from array import array
+
+from src.a_estrela import Cenario
+from src.constantes import Celula
+
+CUSTO_RETO = 1
+CUSTO_DIAGONAL = 1.4
+CUSTO_BARREIRA = 1  # Lentidão ao entrar em barreira ou semi-barreira, igual a calcular_g
+
+
+# Tabela de tradução de bytes: 1 para as células do conjunto, 0 para as demais
+def _tabela_de_celulas(celulas):
+    tabela = bytearray(256)
+    for celula in celulas:
+        tabela[ord(celula)] = 1
+    return bytes(tabela)
+
+
+VALIDAS = _tabela_de_celulas(Celula.VALIDAS)
+PENALIZADAS = _tabela_de_celulas((Celula.BARREIRA, Celula.SEMI_BARREIRA))
+
+
+# Para cada casa i, o byte i do resultado indica se a casa vizinha na direção (dx, dy) está marcada em bits.
+# As operações são feitas em blocos (fatias de bytes e inteiros grandes) para não percorrer casa por casa
+def _vizinhos_marcados(bits, largura, altura, dx, dy):
+    total = largura * altura
+    deslocamento = max(-total, min(total, dy * largura + dx))
+    if deslocamento >= 0:
+        deslocados = bits[deslocamento:] + bytes(deslocamento)
+    else:
+        deslocados = bytes(-deslocamento) + bits[:total + deslocamento]
+
+    # Vizinhos que passariam da borda esquerda ou direita não existem
+    if dx != 0:
+        linha = bytearray(b'\x01') * largura
+        linha[largura - 1 if dx > 0 else 0] = 0
+        colunas = int.from_bytes(bytes(linha) * altura, 'little')
+        deslocados = (int.from_bytes(deslocados, 'little') & colunas).to_bytes(total, 'little')
+    return deslocados
+
+
+# Máscara de 8 bits por casa: bit d ligado se a casa vizinha na direção d de Cenario.DIRECOES estiver marcada
+def _mascara_de_direcoes(bits, largura, altura):
+    total = largura * altura
+    mascara = 0
+    for d, (dx, dy) in enumerate(Cenario.DIRECOES):
+        marcados = _vizinhos_marcados(bits, largura, altura, dx, dy)
+        mascara |= int.from_bytes(marcados, 'little') << d  # Cada byte vale 0 ou 1, sem invadir o byte seguinte
+    return mascara.to_bytes(total, 'little')
+
+
+# Vizinhos válidos de cada casa e o custo para entrar neles, calculados uma vez por cenário
+class IndiceAdjacencia:
+    __slots__ = ['largura', 'altura', 'codigos', 'arestas']
+
+    def __init__(self, celulas, largura, altura):
+        self.largura = largura
+        self.altura = altura
+        validas = bytes(celulas).translate(VALIDAS)
+        penalizadas = bytes(celulas).translate(PENALIZADAS)
+
+        codigos = bytearray(2 * largura * altura)
+        codigos[0::2] = _mascara_de_direcoes(validas, largura, altura)
+        codigos[1::2] = _mascara_de_direcoes(penalizadas, largura, altura)
+        self.codigos = array('H')
+        self.codigos.frombytes(codigos)
+        if sys.byteorder == 'big':
+            self.codigos.byteswap()
+
+        self.arestas = {}
+        for codigo in set(self.codigos):
+            self.arestas[codigo] = self.montar_arestas(codigo)
+
+    # Arestas de um código de vizinhança, na ordem de Cenario.DIRECOES
+    def montar_arestas(self, codigo):
+        arestas = []
+        for d, (dx, dy) in enumerate(Cenario.DIRECOES):
+            if not codigo >> d & 1:
+                continue
+            custo = CUSTO_RETO if dx == 0 or dy == 0 else CUSTO_DIAGONAL
+            if codigo >> (d + 8) & 1:
+                custo += CUSTO_BARREIRA
+            arestas.append((dy * self.largura + dx, custo))
+        return tuple(arestas)
+
+    # Código de vizinhança de uma única casa, calculado casa a casa (usado nas atualizações)
+    def calcular_codigo(self, celulas, indice):
+        y, x = divmod(indice, self.largura)
+        codigo = 0
+        for d, (dx, dy) in enumerate(Cenario.DIRECOES):
+            vizinho_x, vizinho_y = x + dx, y + dy
+            if not (0 <= vizinho_x < self.largura and 0 <= vizinho_y < self.altura):
+                continue
+            celula = celulas[vizinho_y * self.largura + vizinho_x]
+            codigo |= VALIDAS[celula] << d | PENALIZADAS[celula] << (d + 8)
+        return codigo
+
+    # Refazer os códigos das casas que têm a casa alterada como vizinha
+    def atualizar_casa(self, celulas, indice):
+        y, x = divmod(indice, self.largura)
+        for dx, dy in Cenario.DIRECOES:
+            vizinho_x, vizinho_y = x + dx, y + dy
+            if 0 <= vizinho_x < self.largura and 0 <= vizinho_y < self.altura:
+                vizinha = vizinho_y * self.largura + vizinho_x
+                codigo = self.codigos[vizinha] = self.calcular_codigo(celulas, vizinha)
+                if codigo not in self.arestas:
+                    self.arestas[codigo] = self.montar_arestas(codigo)
+
+    # Arestas que saem de uma casa (índice y * largura + x)
+    def arestas_da_casa(self, indice):
+        return self.arestas[self.codigos[indice]]
@@ -0,0 +1,179 @@
+from array import array
+
+from src.a_estrela import Cenario
+from src.constantes import Celula
+
+SEM_COMPONENTE = -1
+BARREIRA = ord(Celula.BARREIRA)
+FRUTA = ord(Celula.FRUTA)
+
+
+# Casas em que se anda sem fruta: todas as válidas menos a barreira
+def _tabela_de_passaveis():
+    tabela = bytearray(256)
+    for celula in Celula.VALIDAS - {Celula.BARREIRA}:
+        tabela[ord(celula)] = 1
+    return bytes(tabela)
+
+
+PASSAVEIS = _tabela_de_passaveis()
+
+
+# Índice de alcance: componentes conexos sem fruta, ligados pelas barreiras que a fruta atravessa
+class IndiceDeComponentes:
+    __slots__ = ['largura', 'altura', 'rotulos', 'pais', 'frutas', 'ligacoes', 'grupos', 'alcances']
+
+    def __init__(self, celulas, largura, altura):
+        self.largura = largura
+        self.altura = altura
+        self.rotulos = array('i', [SEM_COMPONENTE]) * (largura * altura)
+        self.pais = array('i')  # União-busca dos rótulos
+        self.frutas = array('i')  # Frutas de cada componente, válido na raiz
+        self.ligacoes = None  # Raiz -> raízes alcançadas atravessando uma barreira, refeito quando preciso
+        self.grupos = None  # Raiz -> grupo de componentes ligados por barreiras em qualquer sentido
+        self.alcances = {}  # Raiz de origem -> raízes alcançáveis, calculado por consulta
+        for indice in range(largura * altura):
+            if self.rotulos[indice] == SEM_COMPONENTE and PASSAVEIS[celulas[indice]]:
+                self.preencher(celulas, indice, self.novo_rotulo())
+
+    def novo_rotulo(self):
+        self.pais.append(len(self.pais))
+        self.frutas.append(0)
+        return len(self.pais) - 1
+
+    def raiz(self, rotulo):
+        pais = self.pais
+        while pais[rotulo] != rotulo:
+            pais[rotulo] = pais[pais[rotulo]]
+            rotulo = pais[rotulo]
+        return rotulo
+
+    def unir(self, a, b):
+        a, b = self.raiz(a), self.raiz(b)
+        if a != b:
+            self.pais[b] = a
+            self.frutas[a] += self.frutas[b]
+        return a
+
+    # Casas vizinhas (índice y * largura + x) de uma casa, dentro do cenário
+    def vizinhas(self, indice):
+        y, x = divmod(indice, self.largura)
+        for dx, dy in Cenario.DIRECOES:
+            vizinho_x, vizinho_y = x + dx, y + dy
+            if 0 <= vizinho_x < self.largura and 0 <= vizinho_y < self.altura:
+                yield vizinho_y * self.largura + vizinho_x
+
+    # Dar o rótulo a todas as casas passáveis ligadas à casa inicial, contando as frutas
+    def preencher(self, celulas, inicial, rotulo, sobrescrever=SEM_COMPONENTE):
+        rotulos = self.rotulos
+        rotulos[inicial] = rotulo
+        pendentes = [inicial]
+        frutas = 0
+        while pendentes:
+            indice = pendentes.pop()
+            frutas += celulas[indice] == FRUTA
+            for vizinha in self.vizinhas(indice):
+                if rotulos[vizinha] == sobrescrever and PASSAVEIS[celulas[vizinha]]:
+                    rotulos[vizinha] = rotulo
+                    pendentes.append(vizinha)
+        self.frutas[rotulo] = frutas
+
+    def componente(self, indice):
+        rotulo = self.rotulos[indice]
+        return SEM_COMPONENTE if rotulo == SEM_COMPONENTE else self.raiz(rotulo)
+
+    # Manter os componentes depois de a casa trocar de tipo no vetor de células (anterior é o código da célula
+    # que estava na casa)
+    def atualizar_casa(self, celulas, indice, anterior):
+        self.ligacoes = self.grupos = None
+        self.alcances.clear()
+        rotulo = self.rotulos[indice]
+        passavel = PASSAVEIS[celulas[indice]]
+        if rotulo != SEM_COMPONENTE and passavel:
+            # Continua passável: só a quantidade de frutas do componente pode mudar
+            self.frutas[self.raiz(rotulo)] += (celulas[indice] == FRUTA) - (anterior == FRUTA)
+        elif passavel:
+            # Casa aberta: um componente novo, unido aos componentes vizinhos
+            rotulo = self.rotulos[indice] = self.novo_rotulo()
+            self.frutas[rotulo] = celulas[indice] == FRUTA
+            for vizinha in self.vizinhas(indice):
+                if self.rotulos[vizinha] != SEM_COMPONENTE:
+                    rotulo = self.unir(rotulo, self.rotulos[vizinha])
+        elif rotulo != SEM_COMPONENTE:
+            # Casa fechada: o componente pode ter se dividido, então as casas dele são rotuladas de novo a partir
+            # de cada vizinha
+            raiz = self.raiz(rotulo)
+            self.rotulos[indice] = SEM_COMPONENTE
+            antigas = [vizinha for vizinha in self.vizinhas(indice)
+                       if self.rotulos[vizinha] != SEM_COMPONENTE and self.raiz(self.rotulos[vizinha]) == raiz]
+            self.achatar(antigas, raiz)
+            for vizinha in antigas:
+                if self.rotulos[vizinha] == raiz:
+                    self.preencher(celulas, vizinha, self.novo_rotulo(), sobrescrever=raiz)
+
+    # Apontar todas as casas do componente, a partir das casas iniciais, direto para a raiz, para que preencher
+    # possa reconhecê-las
+    def achatar(self, iniciais, raiz):
+        rotulos = self.rotulos
+        vistas = set(iniciais)
+        pendentes = list(iniciais)
+        while pendentes:
+            indice = pendentes.pop()
+            rotulos[indice] = raiz
+            for vizinha in self.vizinhas(indice):
+                rotulo = rotulos[vizinha]
+                if vizinha not in vistas and rotulo != SEM_COMPONENTE and self.raiz(rotulo) == raiz:
+                    vistas.add(vizinha)
+                    pendentes.append(vizinha)
+
+    # Ligações entre componentes pelas barreiras e os grupos de componentes ligados em qualquer sentido
+    def montar_ligacoes(self, celulas):
+        ligacoes = {}
+        grupos = {}
+
+        def grupo(raiz):
+            while grupos.get(raiz, raiz) != raiz:
+                raiz = grupos[raiz]
+            return raiz
+
+        celulas = bytes(celulas)
+        indice = celulas.find(BARREIRA)
+        while indice >= 0:
+            vizinhos = {self.componente(vizinha) for vizinha in self.vizinhas(indice)} - {SEM_COMPONENTE}
+            for origem in vizinhos:
+                if self.frutas[origem]:
+                    ligacoes.setdefault(origem, set()).update(vizinhos - {origem})
+                    for destino in vizinhos:
+                        a, b = grupo(origem), grupo(destino)
+                        if a != b:
+                            grupos[b] = a
+            indice = celulas.find(BARREIRA, indice + 1)
+        self.ligacoes = ligacoes
+        self.grupos = {raiz: grupo(raiz) for raiz in grupos}
+
+    # Raízes alcançáveis a partir de um componente, seguindo as ligações
+    def alcancaveis(self, origem):
+        if origem not in self.alcances:
+            vistos = {origem}
+            pendentes = [origem]
+            while pendentes:
+                for destino in self.ligacoes.get(pendentes.pop(), ()):
+                    if destino not in vistos:
+                        vistos.add(destino)
+                        pendentes.append(destino)
+            self.alcances[origem] = vistos
+        return self.alcances[origem]
+
+    # Se quem começa sem fruta na casa de início alcança a casa de saída (índices y * largura + x). None quando
+    # o índice não sabe dizer: início ou saída em uma barreira ou em uma casa inválida
+    def alcanca(self, celulas, inicio, saida):
+        origem, destino = self.componente(inicio), self.componente(saida)
+        if origem == SEM_COMPONENTE or destino == SEM_COMPONENTE:
+            return None
+        if origem == destino:
+            return True
+        if self.ligacoes is None:
+            self.montar_ligacoes(celulas)
+        if self.grupos.get(origem, origem) != self.grupos.get(destino, destino):
+            return False
+        return destino in self.alcancaveis(origem)
@@ -0,0 +1,74 @@
+import os
+import struct
+
+from src.a_estrela import Cenario
+from src.constantes import Celula
+from src.matriz_plana import mapear_arquivo
+
+# Formato binário de cenário: cabeçalho de 32 bytes seguido de um byte por casa, em little-endian
+ASSINATURA = b'AEST'
+VERSAO_FORMATO = 1
+CABECALHO = struct.Struct('<4sB3xIIiiii')
+SEM_POSICAO = -1
+EXTENSAO = '.mapa'
+CELULAS_VALIDAS = ''.join(sorted(Celula.VALIDAS)).encode('ascii')
+
+
+def _posicao_no_cabecalho(posicao):
+    return (posicao['x'], posicao['y']) if posicao else (SEM_POSICAO, SEM_POSICAO)
+
+
+def _posicao_do_cabecalho(caminho, x, y, largura, altura):
+    if (x, y) == (SEM_POSICAO, SEM_POSICAO):
+        return None
+    if not (0 <= x < largura and 0 <= y < altura):
+        raise ValueError(f'{caminho}: posição ({x}, {y}) fora do cenário')
+    return {'x': x, 'y': y}
+
+
+# Gravar um Cenario (ou uma matriz_cenario) no formato binário. O arquivo é escrito em um temporário e
+# renomeado, para nenhum leitor abrir um arquivo pela metade
+def salvar_cenario(caminho, cenario):
+    if not isinstance(cenario, Cenario):
+        cenario = Cenario(cenario)
+
+    cabecalho = CABECALHO.pack(ASSINATURA, VERSAO_FORMATO, cenario.largura, cenario.altura,
+                               *_posicao_no_cabecalho(cenario.personagem_posicao),
+                               *_posicao_no_cabecalho(cenario.saida_posicao))
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    with open(temporario, 'wb') as arquivo:
+        arquivo.write(cabecalho)
+        arquivo.write(cenario.obter_celulas_compactas())
+    os.replace(temporario, caminho)
+
+
+# Ler largura, altura e posições do cabeçalho, conferindo a assinatura, a versão e o tamanho do arquivo
+def ler_cabecalho(caminho):
+    with open(caminho, 'rb') as arquivo:
+        dados = arquivo.read(CABECALHO.size)
+    if len(dados) < CABECALHO.size or dados[:len(ASSINATURA)] != ASSINATURA:
+        raise ValueError(f'{caminho} não é um arquivo de cenário')
+
+    _, versao, largura, altura, personagem_x, personagem_y, saida_x, saida_y = CABECALHO.unpack(dados)
+    if versao != VERSAO_FORMATO:
+        raise ValueError(f'Versão {versao} do formato de cenário não suportada')
+    if largura == 0 or altura == 0 or os.path.getsize(caminho) < CABECALHO.size + largura * altura:
+        raise ValueError(f'{caminho} está incompleto')
+    personagem = _posicao_do_cabecalho(caminho, personagem_x, personagem_y, largura, altura)
+    saida = _posicao_do_cabecalho(caminho, saida_x, saida_y, largura, altura)
+    return largura, altura, personagem, saida
+
+
+# Abrir um cenário gravado por salvar_cenario mapeado em memória, sem ler as células. Só as casas do personagem
+# e da saída são conferidas; validar_celulas confere todas, lendo o arquivo inteiro
+def carregar_cenario(caminho, validar_celulas=False):
+    largura, altura, personagem, saida = ler_cabecalho(caminho)
+    matriz = mapear_arquivo(os.path.abspath(caminho), CABECALHO.size, largura, altura)
+    for posicao, celula in ((personagem, Celula.PERSONAGEM), (saida, Celula.SAIDA)):
+        if posicao and matriz[posicao['y']][posicao['x']] != celula:
+            raise ValueError(f'{caminho}: a casa ({posicao["x"]}, {posicao["y"]}) não tem {celula}')
+    if validar_celulas:
+        invalidas = bytes(matriz.celulas).translate(None, CELULAS_VALIDAS)
+        if invalidas:
+            raise ValueError(f'{caminho}: células inválidas: {"".join(sorted(set(map(chr, invalidas))))!r}')
+    return Cenario(matriz, (personagem, saida))
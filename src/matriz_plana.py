@@ -0,0 +1,72 @@
+import mmap
+
+
+# Abrir a região de células de um arquivo mapeado em memória (copy-on-write)
+def mapear_arquivo(arquivo, deslocamento, largura, altura):
+    with open(arquivo, 'rb') as aberto:
+        mapa = mmap.mmap(aberto.fileno(), 0, access=mmap.ACCESS_COPY)
+    celulas = memoryview(mapa)[deslocamento:deslocamento + largura * altura]
+    return MatrizPlana(celulas, largura, altura, arquivo, deslocamento)
+
+
+# Linha de uma MatrizPlana: lê e escreve os caracteres direto no vetor de células
+class LinhaPlana:
+    __slots__ = ['matriz', 'inicio']
+
+    def __init__(self, matriz, inicio):
+        self.matriz = matriz
+        self.inicio = inicio
+
+    def __getitem__(self, x):
+        if not 0 <= x < self.matriz.largura:
+            raise IndexError('coluna fora do cenário')
+        return chr(self.matriz.celulas[self.inicio + x])
+
+    def __setitem__(self, x, celula):
+        if not 0 <= x < self.matriz.largura:
+            raise IndexError('coluna fora do cenário')
+        self.matriz.celulas[self.inicio + x] = ord(celula)
+        self.matriz.alterada = True
+
+    def __len__(self):
+        return self.matriz.largura
+
+    def __iter__(self):
+        for celula in self.matriz.celulas[self.inicio:self.inicio + self.matriz.largura]:
+            yield chr(celula)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+# Vetor plano de células (um byte por casa, indexado por y * largura + x) acessado como a lista de listas de
+# matriz_cenario, sem copiar nada: matriz[y][x] lê e escreve no vetor. Usada pelos cenários carregados de arquivo
+class MatrizPlana:
+    __slots__ = ['celulas', 'largura', 'altura', 'arquivo', 'deslocamento', 'alterada']
+
+    def __init__(self, celulas, largura, altura, arquivo=None, deslocamento=0):
+        self.celulas = celulas
+        self.largura = largura
+        self.altura = altura
+        self.arquivo = arquivo  # Arquivo mapeado de onde vêm as células, se houver
+        self.deslocamento = deslocamento
+        self.alterada = False
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.altura:
+            raise IndexError('linha fora do cenário')
+        return LinhaPlana(self, y * self.largura)
+
+    def __len__(self):
+        return self.altura
+
+    def __iter__(self):
+        for y in range(self.altura):
+            yield LinhaPlana(self, y * self.largura)
+
+    # Copiada para outro processo, uma matriz sem alterações mapeia o mesmo arquivo de novo e compartilha o cache
+    # de páginas. As demais são copiadas
+    def __reduce__(self):
+        if self.arquivo is not None and not self.alterada:
+            return mapear_arquivo, (self.arquivo, self.deslocamento, self.largura, self.altura)
+        return MatrizPlana, (bytearray(self.celulas), self.largura, self.altura)
@@ -0,0 +1,467 @@
+import heapq
+import random
+import time
+from array import array
+
+from src.a_estrela import Cenario, achar_caminho, montar_caminho
+from src.busca_baldes import arestas_inteiras
+from src.constantes import Motor, ModoHistorico
+from src.gerador_cenarios import gerar_cenario
+from src.grafo_estados import BARREIRA, FRUTA, INFINITO, VALIDAS, GrafoDeEstados, calcular_h_octil
+
+TAMANHO_CLUSTER = 32
+SEGMENTO_LONGO = 6  # Segmentos a partir deste tamanho ganham uma porta em cada ponta, os menores uma no meio
+MAXIMO_TABELAS = 64  # Tabelas de clusters guardadas para as próximas procuras, descartando a usada há mais tempo
+
+# Direções das bordas guardadas, do cluster para o vizinho: direita, abaixo e os dois cantos de baixo
+DIRECOES_GUARDADAS = ((1, 0), (0, 1), (1, 1), (-1, 1))
+
+
+# Portas de um cluster: arestas de cada estado de porta (montadas na primeira vez que ele é expandido) e as casas
+# do outro lado de cada transição
+class Cluster:
+    __slots__ = ['arestas', 'travessias', 'camadas_iguais']
+
+    def __init__(self, arestas, travessias, camadas_iguais):
+        self.arestas = arestas  # Estado de uma porta -> [(estado, custo)], ou None antes de montar
+        self.travessias = travessias  # Casa de uma porta -> casas de portas em clusters vizinhos
+        self.camadas_iguais = camadas_iguais
+
+
+# Arestas entre os estados de um cluster, com as regras da fruta já aplicadas e custos inteiros. Os estados locais
+# são indexados por (y - y inicial) * largura do cluster + x - x inicial + tem_fruta * casas do cluster
+class TabelaDoCluster:
+    __slots__ = ['x_inicial', 'y_inicial', 'largura', 'casas', 'largura_cenario', 'total', 'vizinhos',
+                 'antecessores']
+
+    def __init__(self, celulas, codigos, arestas, largura_cenario, total, limites):
+        x_inicial, y_inicial, x_final, y_final = limites
+        self.x_inicial, self.y_inicial = x_inicial, y_inicial
+        self.largura = largura = x_final - x_inicial
+        self.casas = casas = largura * (y_final - y_inicial)
+        self.largura_cenario, self.total = largura_cenario, total
+        self.antecessores = None
+
+        self.vizinhos = vizinhos = [()] * (2 * casas)
+        for y in range(y_inicial, y_final):
+            for x in range(x_inicial, x_final):
+                casa = y * largura_cenario + x
+                sem_fruta, com_fruta = [], []
+                for deslocamento, custo in arestas[codigos[casa]]:
+                    vizinho_y, vizinho_x = divmod(casa + deslocamento, largura_cenario)
+                    if not (x_inicial <= vizinho_x < x_final and y_inicial <= vizinho_y < y_final):
+                        continue
+                    vizinha = (vizinho_y - y_inicial) * largura + vizinho_x - x_inicial
+                    celula = celulas[casa + deslocamento]
+                    if celula == FRUTA:
+                        sem_fruta.append((vizinha + casas, custo))
+                        com_fruta.append((vizinha + casas, custo))
+                    elif celula == BARREIRA:
+                        com_fruta.append((vizinha, custo))  # Pular a barreira gasta a fruta
+                    else:
+                        sem_fruta.append((vizinha, custo))
+                        com_fruta.append((vizinha + casas, custo))
+                local = (y - y_inicial) * largura + x - x_inicial
+                vizinhos[local], vizinhos[local + casas] = tuple(sem_fruta), tuple(com_fruta)
+
+    def local(self, estado):
+        tem_fruta, casa = divmod(estado, self.total)
+        y, x = divmod(casa, self.largura_cenario)
+        return (y - self.y_inicial) * self.largura + x - self.x_inicial + tem_fruta * self.casas
+
+    def estado(self, local):
+        tem_fruta, casa = divmod(local, self.casas)
+        y, x = divmod(casa, self.largura)
+        return (y + self.y_inicial) * self.largura_cenario + x + self.x_inicial + tem_fruta * self.total
+
+    # Arestas invertidas, para procurar da saída para trás. Estados impossíveis não têm antecessores, então não
+    # aparecem no meio de um caminho
+    def obter_antecessores(self):
+        if self.antecessores is None:
+            self.antecessores = [[] for _ in self.vizinhos]
+            for estado, arestas in enumerate(self.vizinhos):
+                for vizinho, custo in arestas:
+                    self.antecessores[vizinho].append((estado, custo))
+        return self.antecessores
+
+
+# Procura hierárquica (HPA*) para cenários grandes, com clusters montados sob demanda
+class PlanejadorHierarquico:
+    __slots__ = ['cenario', 'grafo', 'tamanho', 'colunas', 'linhas', 'bordas', 'clusters', 'versao',
+                 'clusters_montados', 'portas_montadas', 'cluster_de', 'tabelas', 'arestas', 'codigos_vistos']
+
+    def __init__(self, cenario, tamanho_cluster=TAMANHO_CLUSTER):
+        self.cenario = cenario
+        self.grafo = GrafoDeEstados(cenario)
+        self.tamanho = tamanho_cluster
+        self.colunas = -(-cenario.largura // tamanho_cluster)
+        self.linhas = -(-cenario.altura // tamanho_cluster)
+        self.bordas = {}  # (cluster, dx, dy) -> transições [(casa no cluster, casa no vizinho)]
+        self.clusters = {}  # Cluster -> Cluster
+        self.versao = cenario.versao
+        self.clusters_montados = 0
+        self.portas_montadas = 0
+
+        colunas = array('i', (x // tamanho_cluster for x in range(cenario.largura)))
+        self.cluster_de = array('i')
+        for y in range(cenario.altura):
+            linha = (y // tamanho_cluster) * self.colunas
+            self.cluster_de.extend(linha + coluna for coluna in colunas)
+        self.tabelas = {}  # Tabelas dos clusters usados por último, da mais antiga para a mais nova
+        self.arestas = None
+        self.codigos_vistos = 0
+
+    def cluster_da_casa(self, casa):
+        return self.cluster_de[casa]
+
+    # Retângulo do cluster (x inicial, y inicial, x final, y final), com os finais exclusivos
+    def limites(self, cluster):
+        linha, coluna = divmod(cluster, self.colunas)
+        x, y = coluna * self.tamanho, linha * self.tamanho
+        return x, y, min(x + self.tamanho, self.cenario.largura), min(y + self.tamanho, self.cenario.altura)
+
+    def vizinho(self, cluster, dx, dy):
+        linha, coluna = divmod(cluster, self.colunas)
+        if 0 <= coluna + dx < self.colunas and 0 <= linha + dy < self.linhas:
+            return cluster + dy * self.colunas + dx
+        return None
+
+    # Casa por onde se anda sem fruta: válida e sem barreira
+    def livre(self, casa):
+        celula = self.grafo.celulas[casa]
+        return celula in VALIDAS and celula != BARREIRA
+
+    # Transições entre o cluster e o vizinho à direita ou abaixo. A borda é dividida em segmentos de casas com
+    # alguma passagem livre (reta ou diagonal) para o outro lado; uma borda sem passagem livre ganha uma porta
+    # no meio, atravessável só com fruta
+    def montar_borda(self, cluster, dx, dy):
+        largura = self.cenario.largura
+        x_inicial, y_inicial, x_final, y_final = self.limites(cluster)
+        if dy:
+            pares = [((y_final - 1) * largura + x, y_final * largura + x) for x in range(x_inicial, x_final)]
+        else:
+            pares = [(y * largura + x_final - 1, y * largura + x_final) for y in range(y_inicial, y_final)]
+
+        segmentos, segmento = [], []
+        for posicao, (casa, _) in enumerate(pares):
+            # Do outro lado, a casa em frente primeiro e depois as duas diagonais
+            lados = [pares[outra][1] for outra in (posicao, posicao - 1, posicao + 1) if 0 <= outra < len(pares)]
+            passagem = next((outra for outra in lados if self.livre(outra)), None) if self.livre(casa) else None
+            if passagem is not None:
+                segmento.append((casa, passagem))
+            elif segmento:
+                segmentos.append(segmento)
+                segmento = []
+        if segmento:
+            segmentos.append(segmento)
+        if not segmentos:
+            return [pares[len(pares) // 2]]
+
+        transicoes = []
+        for segmento in segmentos:
+            if len(segmento) >= SEGMENTO_LONGO:
+                transicoes += [segmento[0], segmento[-1]]
+            else:
+                transicoes.append(segmento[len(segmento) // 2])
+        return transicoes
+
+    # Transição pelo canto entre o cluster e o vizinho na diagonal de baixo, se as duas casas forem livres
+    def montar_canto(self, cluster, dx):
+        largura = self.cenario.largura
+        x_inicial, _, x_final, y_final = self.limites(cluster)
+        x = x_final - 1 if dx > 0 else x_inicial
+        casa, outra = (y_final - 1) * largura + x, y_final * largura + x + dx
+        return [(casa, outra)] if self.livre(casa) and self.livre(outra) else []
+
+    def obter_borda(self, cluster, dx, dy):
+        chave = (cluster, dx, dy)
+        if chave not in self.bordas and dx and dy:
+            self.bordas[chave] = self.montar_canto(cluster, dx)
+        elif chave not in self.bordas:
+            self.bordas[chave] = self.montar_borda(cluster, dx, dy)
+        return self.bordas[chave]
+
+    # Transições do cluster com os oito vizinhos, como (casa no cluster, casa no vizinho)
+    def transicoes_do_cluster(self, cluster):
+        transicoes = []
+        for dx, dy in DIRECOES_GUARDADAS:
+            if self.vizinho(cluster, dx, dy) is not None:
+                transicoes += self.obter_borda(cluster, dx, dy)
+            vizinho = self.vizinho(cluster, -dx, -dy)
+            if vizinho is not None:
+                transicoes += [(casa, casa_vizinha) for casa_vizinha, casa in self.obter_borda(vizinho, dx, dy)]
+        return transicoes
+
+    # Arestas inteiras do índice de adjacência, refeitas quando ele ganha códigos novos
+    def obter_arestas(self):
+        indice = self.cenario.obter_indice_adjacencia()
+        if self.arestas is None or self.codigos_vistos != len(indice.arestas):
+            self.arestas = arestas_inteiras(indice)
+            self.codigos_vistos = len(indice.arestas)
+        return indice.codigos, self.arestas
+
+    # Tabela do cluster, montada de novo se tiver saído das guardadas
+    def obter_tabela(self, cluster):
+        tabela = self.tabelas.pop(cluster, None)
+        if tabela is None:
+            codigos, arestas = self.obter_arestas()
+            tabela = TabelaDoCluster(self.grafo.celulas, codigos, arestas, self.cenario.largura,
+                                     self.grafo.total, self.limites(cluster))
+            if len(self.tabelas) >= MAXIMO_TABELAS:
+                del self.tabelas[next(iter(self.tabelas))]  # A usada há mais tempo
+        self.tabelas[cluster] = tabela
+        return tabela
+
+    # Dijkstra pela tabela do cluster (para trás pelos antecessores, se pedido), parando quando todos os alvos
+    # fecharem. Devolve os custos dos alvos alcançados e os pais, para refazer o trecho
+    def procurar_no_cluster(self, origens, cluster, alvos, para_tras=False):
+        tabela = self.obter_tabela(cluster)
+        vizinhos = tabela.obter_antecessores() if para_tras else tabela.vizinhos
+        quantidade = len(vizinhos)  # Cada entrada da fila é g * quantidade + estado local, um único inteiro
+        gs = [INFINITO] * quantidade
+        pais = [-1] * quantidade
+        fila = []
+        for origem in origens:
+            gs[tabela.local(origem)] = 0
+            fila.append(tabela.local(origem))
+        faltam = {tabela.local(alvo) for alvo in alvos}
+        custos = {}
+        while fila and faltam:
+            g, atual = divmod(heapq.heappop(fila), quantidade)
+            if g > gs[atual]:
+                continue  # Entrada antiga, o estado já saiu da fila com um custo menor
+            if atual in faltam:
+                faltam.remove(atual)
+                custos[tabela.estado(atual)] = g
+            for vizinho, custo in vizinhos[atual]:
+                if g + custo < gs[vizinho]:
+                    gs[vizinho] = g + custo
+                    pais[vizinho] = atual
+                    heapq.heappush(fila, (g + custo) * quantidade + vizinho)
+        return custos, pais
+
+    # Sem fruta nem barreira, a camada com fruta tem os mesmos custos da camada sem fruta
+    def tem_fruta_ou_barreira(self, limites):
+        largura, celulas = self.cenario.largura, self.grafo.celulas
+        x_inicial, y_inicial, x_final, y_final = limites
+        for y in range(y_inicial, y_final):
+            linha = bytes(celulas[y * largura + x_inicial:y * largura + x_final])
+            if FRUTA in linha or BARREIRA in linha:
+                return True
+        return False
+
+    # Portas do cluster pelas transições com os vizinhos; as arestas de cada porta ficam para a primeira expansão
+    def montar_cluster(self, cluster):
+        total = self.grafo.total
+        travessias = {}
+        for casa, casa_vizinha in self.transicoes_do_cluster(cluster):
+            travessias.setdefault(casa, []).append(casa_vizinha)
+        arestas = {casa + camada: None for casa in sorted(travessias) for camada in (0, total)
+                   if self.grafo.estado_possivel(casa + camada)}
+        self.clusters_montados += 1
+        return Cluster(arestas, travessias, not self.tem_fruta_ou_barreira(self.limites(cluster)))
+
+    def obter_cluster(self, cluster):
+        if cluster not in self.clusters:
+            self.clusters[cluster] = self.montar_cluster(cluster)
+        return self.clusters[cluster]
+
+    # Arestas de um estado de porta: custos até as outras portas do cluster, por uma procura restrita a ele, e o
+    # passo até a porta do outro lado de cada transição. Um estado que não é porta não tem arestas
+    def arestas_da_porta(self, estado):
+        total = self.grafo.total
+        casa = estado % total
+        cluster = self.cluster_de[casa]
+        dados = self.obter_cluster(cluster)
+        if dados.arestas.get(estado, ()) is not None:
+            return dados.arestas.get(estado, ())
+
+        if dados.camadas_iguais and estado >= total:
+            arestas = [(outro + total, custo) for outro, custo in self.arestas_da_porta(estado - total)
+                       if self.cluster_de[outro % total] == cluster]
+        else:
+            custos, _ = self.procurar_no_cluster((estado,), cluster, dados.arestas)
+            arestas = [(outro, custo) for outro, custo in custos.items() if outro != estado]
+            self.portas_montadas += 1
+        casas_vizinhas = dados.travessias[casa]
+        arestas += [(outro, custo) for outro, custo in self.grafo.sucessores(estado)
+                    if outro % total in casas_vizinhas]
+        dados.arestas[estado] = arestas
+        return arestas
+
+    # Montar todos os clusters e todas as portas de uma vez, em vez de deixar para as consultas
+    def preparar(self):
+        for cluster in range(self.colunas * self.linhas):
+            for estado in list(self.obter_cluster(cluster).arestas):
+                self.arestas_da_porta(estado)
+
+    # Desmontar o que depende da casa: o cluster dela e, se ela estiver na borda, as bordas e os clusters vizinhos
+    def descartar_casa(self, x, y):
+        cluster = self.cluster_da_casa(y * self.cenario.largura + x)
+        x_inicial, y_inicial, x_final, y_final = self.limites(cluster)
+        lados_x = [0] + [-1] * (x == x_inicial) + [1] * (x == x_final - 1)
+        lados_y = [0] + [-1] * (y == y_inicial) + [1] * (y == y_final - 1)
+        self.clusters.pop(cluster, None)
+        for dx in lados_x:
+            for dy in lados_y:
+                vizinho = self.vizinho(cluster, dx, dy)
+                if (dx, dy) == (0, 0) or vizinho is None:
+                    continue
+                if (dx, dy) in DIRECOES_GUARDADAS:
+                    self.bordas.pop((cluster, dx, dy), None)
+                else:
+                    self.bordas.pop((vizinho, -dx, -dy), None)
+                self.clusters.pop(vizinho, None)
+
+    # Trocar o tipo de uma casa, desmontando apenas a parte da abstração que depende dela
+    def atualizar_celula(self, x, y, nova_celula):
+        self.sincronizar()
+        self.cenario.alterar_celula(x, y, nova_celula)
+        self.versao = self.cenario.versao
+        self.descartar_casa(x, y)
+
+    # Casas alteradas direto no cenário não dizem qual cluster mudou, então tudo é desmontado
+    def sincronizar(self):
+        if self.versao != self.cenario.versao:
+            self.bordas.clear()
+            self.clusters.clear()
+            self.versao = self.cenario.versao
+
+    # Caminho entre dois estados do mesmo cluster (ou até o mais barato dos alvos), casa a casa
+    def refinar_trecho(self, origem, alvos, cluster):
+        custos, pais = self.procurar_no_cluster((origem,), cluster, alvos)
+        tabela = self.obter_tabela(cluster)
+        estado, inicio = tabela.local(min(custos, key=custos.get)), tabela.local(origem)
+        trecho = []
+        while estado != inicio:
+            trecho.append(tabela.estado(estado))
+            estado = pais[estado]
+        return reversed(trecho)
+
+    # Menor caminho pelo grafo abstrato, refeito casa a casa nas mesmas Casas que achar_caminho devolve. Se as
+    # portas não levarem até a saída, procura direto no cenário
+    def achar_caminho(self, inicio=None, saida=None):
+        self.sincronizar()
+        inicio = inicio or self.cenario.personagem_posicao
+        saida = saida or self.cenario.saida_posicao
+        if not inicio or not saida:
+            return []
+
+        largura, total = self.cenario.largura, self.grafo.total
+        origem = inicio['y'] * largura + inicio['x']
+        casa_saida = saida['y'] * largura + saida['x']
+        destinos = (casa_saida, casa_saida + total)
+        fim = 2 * total  # Estado abstrato que representa ter chegado na saída
+        cluster_origem, cluster_saida = self.cluster_da_casa(origem), self.cluster_da_casa(casa_saida)
+
+        # Arestas temporárias: da origem até as portas do seu cluster, e das portas do cluster da saída até ela
+        portas_origem = list(self.obter_cluster(cluster_origem).arestas)
+        alvos = portas_origem + list(destinos) if cluster_origem == cluster_saida else portas_origem
+        custos, _ = self.procurar_no_cluster((origem,), cluster_origem, alvos)
+        arestas_origem = [(estado, custos[estado]) for estado in portas_origem if estado in custos]
+        if any(destino in custos for destino in destinos):
+            arestas_origem.append((fim, min(custos[destino] for destino in destinos if destino in custos)))
+
+        portas_saida = list(self.obter_cluster(cluster_saida).arestas)
+        custos, _ = self.procurar_no_cluster(destinos, cluster_saida, portas_saida, para_tras=True)
+        ate_a_saida = {estado: custos[estado] for estado in portas_saida if estado in custos}
+
+        caminho_abstrato = self.procurar_no_grafo_abstrato(origem, arestas_origem, ate_a_saida, casa_saida, fim)
+        if caminho_abstrato is None:
+            return achar_caminho(self.cenario, Motor.COMPACTO, inicio, saida, ModoHistorico.DESLIGADO)[0]
+
+        estados = [origem]
+        for atual, seguinte in zip(caminho_abstrato, caminho_abstrato[1:]):
+            if seguinte == fim:
+                estados += self.refinar_trecho(atual, destinos, cluster_saida)
+            elif self.cluster_da_casa(atual % total) != self.cluster_da_casa(seguinte % total):
+                estados.append(seguinte)  # Passo pela transição entre clusters vizinhos
+            else:
+                estados += self.refinar_trecho(atual, (seguinte,), self.cluster_da_casa(atual % total))
+        coordenadas = ((estado % total % largura, estado % total // largura) for estado in estados)
+        return montar_caminho(self.cenario, coordenadas, saida)
+
+    # A* no grafo das portas. Devolve os estados abstratos da origem até o fim, ou None se não houver caminho
+    def procurar_no_grafo_abstrato(self, origem, arestas_origem, ate_a_saida, casa_saida, fim):
+        largura, total = self.cenario.largura, self.grafo.total
+        saida_y, saida_x = divmod(casa_saida, largura)
+
+        def calcular_h(estado):
+            if estado == fim:
+                return 0
+            y, x = divmod(estado % total, largura)
+            return calcular_h_octil(x, y, saida_x, saida_y)
+
+        gs = {origem: 0}
+        pais = {origem: None}
+        fila = [(calcular_h(origem), origem)]
+        fechados = set()
+        while fila:
+            _, estado = heapq.heappop(fila)
+            if estado in fechados:
+                continue
+            if estado == fim:
+                caminho = []
+                while estado is not None:
+                    caminho.append(estado)
+                    estado = pais[estado]
+                return caminho[::-1]
+            fechados.add(estado)
+
+            arestas = list(arestas_origem) if estado == origem else []
+            arestas += self.arestas_da_porta(estado)
+            if estado in ate_a_saida:
+                arestas.append((fim, ate_a_saida[estado]))
+            for vizinho, custo in arestas:
+                g = gs[estado] + custo
+                if vizinho not in fechados and g < gs.get(vizinho, INFINITO):
+                    gs[vizinho] = g
+                    pais[vizinho] = estado
+                    heapq.heappush(fila, (g + calcular_h(vizinho), vizinho))
+        return None
+
+
+# Comparar o planejador hierárquico com o A* compacto em cenários grandes
+def main():
+    tamanho, consultas = 1000, 5
+    print(f'{"cenário":>11} {"montar s":>8} {"1ª hpa* s":>9} {"hpa* s":>8} {"repet. s":>8} {"a* s":>8} '
+          f'{"clusters":>8} {"portas":>7} {"custo hpa*/a*":>14}')
+    for tipo in ('aberto', 'obstaculos', 'labirinto', 'corredores'):
+        cenario = Cenario(gerar_cenario(tipo, tamanho, tamanho))
+        comeco = time.perf_counter()
+        PlanejadorHierarquico(cenario).preparar()
+        tempo_montagem = time.perf_counter() - comeco
+
+        planejador = PlanejadorHierarquico(cenario)
+        sorteio = random.Random(0)
+        pares = [({'x': sorteio.randrange(tamanho), 'y': sorteio.randrange(tamanho)},
+                  {'x': sorteio.randrange(tamanho), 'y': sorteio.randrange(tamanho)}) for _ in range(consultas)]
+
+        tempos, caminhos = [], []
+        for inicio, saida in pares:
+            comeco = time.perf_counter()
+            caminhos.append(planejador.achar_caminho(inicio, saida))
+            tempos.append(time.perf_counter() - comeco)
+        comeco = time.perf_counter()
+        for inicio, saida in pares:
+            planejador.achar_caminho(inicio, saida)
+        repetidas = (time.perf_counter() - comeco) / consultas
+
+        tempo_plano = 0
+        razoes = []
+        for (inicio, saida), hierarquico in zip(pares, caminhos):
+            comeco = time.perf_counter()
+            plano, _ = achar_caminho(cenario, Motor.COMPACTO, inicio, saida, ModoHistorico.DESLIGADO)
+            tempo_plano += time.perf_counter() - comeco
+            if hierarquico and plano:
+                custo_plano = plano[-1].g - plano[0].g  # O personagem começa com g = h
+                razoes.append((hierarquico[-1].g - hierarquico[0].g) / custo_plano if custo_plano else 1)
+
+        razao = f'{sum(razoes) / len(razoes):.3f}' if razoes else '-'
+        print(f'{tipo:>11} {tempo_montagem:>8.2f} {tempos[0]:>9.3f} {sum(tempos[1:]) / (consultas - 1):>8.3f} '
+              f'{repetidas:>8.3f} {tempo_plano / consultas:>8.3f} {planejador.clusters_montados:>8} '
+              f'{planejador.portas_montadas:>7} {razao:>14}')
+
+
+if __name__ == '__main__':
+    main()
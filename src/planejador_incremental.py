@@ -0,0 +1,137 @@
+import heapq
+from array import array
+
+from src.a_estrela import montar_caminho
+from src.grafo_estados import INFINITO, GrafoDeEstados, calcular_h_octil
+
+
+# Replanejamento incremental com Lifelong Planning A* (LPA*) sobre os estados (x, y, tem_fruta)
+class PlanejadorIncremental:
+    __slots__ = ['cenario', 'grafo', 'total', 'inicio', 'saida', 'destino', 'gs', 'rhs', 'hs', 'carimbos',
+                 'fila', 'proximo_carimbo', 'expansoes']
+
+    def __init__(self, cenario, inicio=None, saida=None):
+        inicio = inicio or cenario.personagem_posicao
+        saida = saida or cenario.saida_posicao
+        self.cenario = cenario
+        self.grafo = GrafoDeEstados(cenario)
+        self.total = cenario.largura * cenario.altura
+        self.inicio = inicio['y'] * cenario.largura + inicio['x']
+        self.saida = saida['y'] * cenario.largura + saida['x']
+        self.destino = 2 * self.total
+        quantidade = 2 * self.total + 1
+        self.gs = array('q', [INFINITO]) * quantidade
+        self.rhs = array('q', [INFINITO]) * quantidade
+        self.hs = array('q', [-1]) * self.total  # Calculado somente quando a casa aparece na procura
+        self.carimbos = array('q', [0]) * quantidade  # Entrada válida do estado na fila, 0 se estiver fora
+        self.fila = []
+        self.proximo_carimbo = 1
+        self.expansoes = 0
+
+        self.rhs[self.inicio] = 0
+        self.inserir(self.inicio)
+
+    def calcular_h(self, estado):
+        if estado == self.destino:
+            return 0
+        casa = estado % self.total
+        h = self.hs[casa]
+        if h < 0:
+            largura = self.cenario.largura
+            h = self.hs[casa] = calcular_h_octil(casa % largura, casa // largura,
+                                                 self.saida % largura, self.saida // largura)
+        return h
+
+    def calcular_chave(self, estado):
+        menor = min(self.gs[estado], self.rhs[estado])
+        return menor + self.calcular_h(estado), menor
+
+    def inserir(self, estado):
+        carimbo = self.carimbos[estado] = self.proximo_carimbo
+        self.proximo_carimbo += 1
+        heapq.heappush(self.fila, (*self.calcular_chave(estado), carimbo, estado))
+
+    # Descartar do topo da fila as entradas substituídas ou removidas
+    def limpar_topo(self):
+        fila, carimbos = self.fila, self.carimbos
+        while fila and carimbos[fila[0][3]] != fila[0][2]:
+            heapq.heappop(fila)
+
+    # Estados seguintes e o custo para chegar em cada um. A casa de saída também leva ao estado destino
+    def sucessores(self, estado):
+        if estado == self.destino:
+            return
+        if estado % self.total == self.saida:
+            yield self.destino, 0
+        yield from self.grafo.sucessores(estado)
+
+    # Estados anteriores e o custo da aresta até o estado informado
+    def antecessores(self, estado):
+        if estado == self.destino:
+            yield self.saida, 0
+            yield self.saida + self.total, 0
+            return
+        yield from self.grafo.antecessores(estado, self.inicio)
+
+    def atualizar_estado(self, estado):
+        gs = self.gs
+        if estado != self.inicio:
+            menor = INFINITO
+            for anterior, custo in self.antecessores(estado):
+                if gs[anterior] + custo < menor:
+                    menor = gs[anterior] + custo
+            self.rhs[estado] = menor
+        self.carimbos[estado] = 0
+        if gs[estado] != self.rhs[estado]:
+            self.inserir(estado)
+
+    def calcular_menores_caminhos(self):
+        gs, rhs, fila, destino = self.gs, self.rhs, self.fila, self.destino
+        while True:
+            self.limpar_topo()
+            if not fila:
+                break
+            # Estados empatados com a chave do destino também são processados, para que nenhum estado com g
+            # desatualizado possa ser escolhido ao reconstruir o caminho
+            if fila[0][:2] > self.calcular_chave(destino) and rhs[destino] == gs[destino]:
+                break
+
+            *_, estado = heapq.heappop(fila)
+            self.carimbos[estado] = 0
+            self.expansoes += 1
+            if gs[estado] > rhs[estado]:
+                gs[estado] = rhs[estado]
+                for seguinte, _ in self.sucessores(estado):
+                    self.atualizar_estado(seguinte)
+            else:
+                gs[estado] = INFINITO
+                self.atualizar_estado(estado)
+                for seguinte, _ in self.sucessores(estado):
+                    self.atualizar_estado(seguinte)
+
+    # Trocar o tipo de uma casa e reparar a procura. Só as arestas que entram na casa mudam, então basta
+    # reavaliar os dois estados dela (com e sem fruta) e deixar a fila propagar a diferença
+    def atualizar_celula(self, x, y, nova_celula):
+        self.cenario.alterar_celula(x, y, nova_celula)
+        casa = y * self.cenario.largura + x
+        self.atualizar_estado(casa)
+        self.atualizar_estado(casa + self.total)
+        return self.achar_caminho()
+
+    # Menor caminho com a procura atual, nas mesmas Casas (valores de g, h e f) que achar_caminho devolve. A h
+    # octil nunca passa do custo real, então o custo é o de Motor.BIDIRECIONAL e pode ser menor que o do padrão
+    def achar_caminho(self):
+        self.calcular_menores_caminhos()
+        gs = self.gs
+        if gs[self.destino] >= INFINITO:
+            return []
+
+        estado = self.saida if gs[self.saida] == gs[self.destino] else self.saida + self.total
+        estados = [estado]
+        while estado != self.inicio:
+            estado = min(self.antecessores(estado), key=lambda aresta: gs[aresta[0]] + aresta[1])[0]
+            estados.append(estado)
+        largura, total = self.cenario.largura, self.total
+        coordenadas = ((estado % total % largura, estado % total // largura) for estado in reversed(estados))
+        saida = {'x': self.saida % largura, 'y': self.saida // largura}
+        return montar_caminho(self.cenario, coordenadas, saida)
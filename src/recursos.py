@@ -1,39 +1,175 @@
+import hashlib
+import math
 import os
+from collections.abc import Mapping
 
 import pygame
 
-from src.constantes import CAMINHO_PASTA_IMG, NOME_PADRAO_FRAME_ANIMACAO, Celula
+from src.constantes import CAMINHO_PASTA_IMG, CAMINHO_PASTA_CACHE, NOME_PADRAO_FRAME_ANIMACAO, Celula
 
+# Imagens usadas para o jogo: chave usada pela interface -> arquivo na pasta de imagens
+SPRITES = {
+    Celula.PERSONAGEM: 'personagem.png',
+    Celula.SAIDA: 'saida.png',
+    Celula.BARREIRA: 'barreira.png',
+    Celula.SEMI_BARREIRA: 'semi_barreira.png',
+    Celula.FRUTA: 'fruta.png',
+}
+# Animações/gifs do personagem: chave -> subpasta com os frames numerados
+ANIMACOES = {
+    'ANIMACAO_PERSONAGEM': 'frames',
+    'ANIMACAO_PERSONAGEM_FRUTA': 'frames_com_fruta',
+}
 
-# Verificar se as imagens existem e já redimensionar para o tamanho correto
-def buscar_imagem_para_celula(nome_arquivo, tamanho, subpasta=''):
-    caminho_imagem = os.path.join(CAMINHO_PASTA_IMG, subpasta, nome_arquivo)
-    if not os.path.exists(caminho_imagem):
-        return None
-    imagem = pygame.image.load(caminho_imagem)
-    return pygame.transform.scale(imagem, (tamanho, tamanho))
+_arquivos = None  # Resultado de localizar_arquivos, igual para todos os tamanhos
+_originais = {}  # Caminho do arquivo -> imagem decodificada no tamanho original, reaproveitada por todos os tamanhos
+_atlas = {}  # Tamanho da casa -> AtlasDeImagens
 
 
-# Pegar todas as imagens usadas para a animação/gif do personagem
-def carregar_frames_animacao(subpasta, tamanho):
-    frames = []
-    numero = 0
-    while True:
-        imagem = buscar_imagem_para_celula(f'{NOME_PADRAO_FRAME_ANIMACAO}{numero}.png', tamanho, subpasta)
-        if not imagem:
-            return frames
-        frames.append(imagem)
-        numero += 1
+# Todas as imagens de um tamanho de casa em uma única superfície, recortadas em subsuperfícies
+class AtlasDeImagens:
+    __slots__ = ['tamanho', 'superficie', 'caminhos', 'sprites', 'animacoes', 'imagens', 'convertido']
 
+    def __init__(self, tamanho, superficie, sprites, animacoes):
+        self.tamanho = tamanho
+        self.superficie = superficie
+        self.sprites = sprites
+        self.animacoes = animacoes
+        self.caminhos = listar_caminhos(sprites, animacoes)
+        self.convertido = False
+        self.imagens = self.recortar()
 
+    def recortar(self):
+        colunas = colunas_do_atlas(len(self.caminhos))
+        posicoes = {caminho: divmod(indice, colunas) for indice, caminho in enumerate(self.caminhos)}
+
+        def recorte(caminho):
+            linha, coluna = posicoes[caminho]
+            area = (coluna * self.tamanho, linha * self.tamanho, self.tamanho, self.tamanho)
+            return self.superficie.subsurface(area)
+
+        imagens = {chave: recorte(caminho) if caminho else None for chave, caminho in self.sprites.items()}
+        imagens.update({chave: [recorte(caminho) for caminho in frames] for chave, frames in self.animacoes.items()})
+        return imagens
+
+    def converter(self):
+        self.superficie = self.superficie.convert_alpha()
+        self.imagens = self.recortar()
+        self.convertido = True
+
+
+# Arquivos das imagens que existem: (chave -> caminho ou None, chave -> caminhos dos frames em ordem)
+def localizar_arquivos():
+    sprites = {}
+    for chave, nome in SPRITES.items():
+        caminho = os.path.join(CAMINHO_PASTA_IMG, nome)
+        sprites[chave] = caminho if os.path.exists(caminho) else None
+
+    animacoes = {}
+    for chave, subpasta in ANIMACOES.items():
+        frames = []
+        while True:
+            caminho = os.path.join(CAMINHO_PASTA_IMG, subpasta, f'{NOME_PADRAO_FRAME_ANIMACAO}{len(frames)}.png')
+            if not os.path.exists(caminho):
+                break
+            frames.append(caminho)
+        animacoes[chave] = frames
+    return sprites, animacoes
+
+
+# Caminhos na ordem em que as imagens ficam no atlas: sprites e depois os frames de cada animação
+def listar_caminhos(sprites, animacoes):
+    return [caminho for caminho in sprites.values() if caminho] + \
+        [caminho for frames in animacoes.values() for caminho in frames]
+
+
+def colunas_do_atlas(quantidade):
+    return max(1, math.ceil(math.sqrt(quantidade)))
+
+
+def obter_original(caminho):
+    if caminho not in _originais:
+        _originais[caminho] = pygame.image.load(caminho)
+    return _originais[caminho]
+
+
+# Arquivo do atlas guardado em disco. O nome leva o tamanho e um resumo dos arquivos de origem (caminho, data de
+# modificação e tamanho), então trocar uma imagem na pasta gera um atlas novo
+def arquivo_do_atlas(tamanho, caminhos):
+    resumo = hashlib.sha1(str(tamanho).encode())
+    for caminho in caminhos:
+        informacoes = os.stat(caminho)
+        resumo.update(f'{os.path.relpath(caminho, CAMINHO_PASTA_IMG)}:{informacoes.st_mtime_ns}:'
+                      f'{informacoes.st_size}'.encode())
+    return os.path.join(CAMINHO_PASTA_CACHE, f'atlas_{tamanho}_{resumo.hexdigest()[:16]}.png')
+
+
+# Copiar as imagens redimensionadas para uma superfície só. O BLEND_RGBA_MAX sobre a superfície zerada copia
+# cor e transparência exatamente, sem misturar com o fundo
+def desenhar_atlas(tamanho, caminhos):
+    colunas = colunas_do_atlas(len(caminhos))
+    linhas = max(1, math.ceil(len(caminhos) / colunas))
+    superficie = pygame.Surface((colunas * tamanho, linhas * tamanho), pygame.SRCALPHA)
+    for indice, caminho in enumerate(caminhos):
+        linha, coluna = divmod(indice, colunas)
+        imagem = pygame.transform.scale(obter_original(caminho), (tamanho, tamanho))
+        superficie.blit(imagem, (coluna * tamanho, linha * tamanho), special_flags=pygame.BLEND_RGBA_MAX)
+    return superficie
+
+
+# Ler o atlas do disco ou desenhar e gravar um novo. O cache em disco é opcional: se a pasta não puder ser
+# usada, o atlas é apenas desenhado
+def montar_atlas(tamanho):
+    global _arquivos
+    if _arquivos is None:
+        _arquivos = localizar_arquivos()
+    sprites, animacoes = _arquivos
+    caminhos = listar_caminhos(sprites, animacoes)
+    arquivo = arquivo_do_atlas(tamanho, caminhos)
+    colunas = colunas_do_atlas(len(caminhos))
+    tamanho_esperado = (colunas * tamanho, max(1, math.ceil(len(caminhos) / colunas)) * tamanho)
+
+    superficie = None
+    if os.path.exists(arquivo):
+        try:
+            superficie = pygame.image.load(arquivo)
+        except pygame.error:
+            superficie = None
+    if superficie is None or superficie.get_size() != tamanho_esperado:
+        superficie = desenhar_atlas(tamanho, caminhos)
+        try:
+            os.makedirs(CAMINHO_PASTA_CACHE, exist_ok=True)
+            temporario = f'{arquivo}.{os.getpid()}.tmp.png'
+            pygame.image.save(superficie, temporario)
+            os.replace(temporario, arquivo)
+        except (OSError, pygame.error):
+            pass
+    return AtlasDeImagens(tamanho, superficie, sprites, animacoes)
+
+
+# Imagens da interface já no tamanho da casa, no mesmo formato de sempre: chave da célula -> imagem (ou None se
+# o arquivo não existe) e chave da animação -> lista de frames. Cada tamanho é montado uma vez por processo
 def carregar_imagens(tamanho):
-    # Imagens usadas para o jogo
-    return {
-        Celula.PERSONAGEM: buscar_imagem_para_celula('personagem.png', tamanho),
-        Celula.SAIDA: buscar_imagem_para_celula('saida.png', tamanho),
-        Celula.BARREIRA: buscar_imagem_para_celula('barreira.png', tamanho),
-        Celula.SEMI_BARREIRA: buscar_imagem_para_celula('semi_barreira.png', tamanho),
-        Celula.FRUTA: buscar_imagem_para_celula('fruta.png', tamanho),
-        'ANIMACAO_PERSONAGEM': carregar_frames_animacao('frames', tamanho),
-        'ANIMACAO_PERSONAGEM_FRUTA': carregar_frames_animacao('frames_com_fruta', tamanho)
-    }
+    atlas = _atlas.get(tamanho)
+    if atlas is None:
+        atlas = _atlas[tamanho] = montar_atlas(tamanho)
+    if not atlas.convertido and pygame.display.get_init() and pygame.display.get_surface() is not None:
+        atlas.converter()
+    return atlas.imagens
+
+
+# Imagens de um tamanho de casa carregadas só no primeiro acesso, para que importar a interface não leia arquivos
+class ImagensPreguicosas(Mapping):
+    __slots__ = ['tamanho']
+
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+
+    def __getitem__(self, chave):
+        return carregar_imagens(self.tamanho)[chave]
+
+    def __iter__(self):
+        return iter(carregar_imagens(self.tamanho))
+
+    def __len__(self):
+        return len(carregar_imagens(self.tamanho))
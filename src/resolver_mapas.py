@@ -0,0 +1,161 @@
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.a_estrela import Cenario, achar_caminho
+from src.constantes import Celula, Motor, ModoHistorico
+from src.mapa_binario import ASSINATURA, carregar_cenario
+from src.matriz_plana import MatrizPlana
+
+MOTORES = (Motor.PADRAO, Motor.COMPACTO, Motor.SALTOS, Motor.BIDIRECIONAL, Motor.BALDES,
+           Motor.MARCOS)
+ENTRADA_PADRAO = '-'
+TAMANHO_LOTE = 16  # Mapas enviados juntos a um processo de trabalho, para diluir o custo de cada envio
+LOTES_POR_PROCESSO = 2  # Lotes em andamento por processo: limita a memória sem deixar processos parados
+
+
+# Mapa de texto: linhas de mesmo tamanho com os caracteres de Celula, sem separadores (espaços são ignorados).
+# Vários mapas no mesmo arquivo ou na entrada padrão são separados por linhas em branco
+def ler_mapas_de_texto(linhas):
+    mapa = []
+    for linha in linhas:
+        linha = ''.join(linha.split())
+        if linha:
+            mapa.append(linha)
+        elif mapa:
+            yield mapa
+            mapa = []
+    if mapa:
+        yield mapa
+
+
+# Mapas de uma origem como (origem, número, tipo, dados), lidos aos poucos
+def ler_origem(origem):
+    if origem == ENTRADA_PADRAO:
+        for numero, linhas in enumerate(ler_mapas_de_texto(sys.stdin)):
+            yield origem, numero, 'texto', linhas
+        return
+
+    try:
+        with open(origem, 'rb') as arquivo:
+            binario = arquivo.read(len(ASSINATURA)) == ASSINATURA
+    except OSError as erro:
+        yield origem, 0, 'erro', str(erro)
+        return
+    if binario:
+        yield origem, 0, 'binario', origem
+        return
+    with open(origem, encoding='ascii', errors='replace') as arquivo:  # Caracteres estranhos viram células inválidas
+        for numero, linhas in enumerate(ler_mapas_de_texto(arquivo)):
+            yield origem, numero, 'texto', linhas
+
+
+def montar_cenario(tipo, dados):
+    if tipo == 'erro':
+        raise ValueError(dados)
+    if tipo == 'binario':
+        return carregar_cenario(dados, validar_celulas=True)  # Como os mapas de texto
+
+    largura = len(dados[0])
+    if any(len(linha) != largura for linha in dados):
+        raise ValueError('as linhas do mapa têm tamanhos diferentes')
+    invalidas = set(''.join(dados)) - Celula.VALIDAS
+    if invalidas:
+        raise ValueError(f'células inválidas: {"".join(sorted(invalidas))}')
+    return Cenario(MatrizPlana(bytearray(''.join(dados), 'ascii'), largura, len(dados)))
+
+
+# Resolver um mapa e descrever o resultado em uma linha JSON. O custo não conta o h da casa inicial, que o
+# personagem já começa com g = h; casas expandidas vêm das estatísticas da procura
+def resolver_mapa(mapa, motor=Motor.COMPACTO, incluir_caminho=True):
+    origem, numero, tipo, dados = mapa
+    resultado = {'origem': origem, 'numero': numero}
+    try:
+        cenario = montar_cenario(tipo, dados)
+    except (OSError, ValueError) as erro:
+        resultado['erro'] = str(erro)
+        return json.dumps(resultado, ensure_ascii=False)
+
+    resultado.update(largura=cenario.largura, altura=cenario.altura)
+    comeco = time.perf_counter()
+    procura = achar_caminho(cenario, motor, historico=ModoHistorico.DESLIGADO)
+    segundos = time.perf_counter() - comeco
+    caminho = procura[0]
+
+    resultado['encontrado'] = bool(caminho)
+    resultado['custo'] = round(caminho[-1].g - caminho[0].g, 6) if caminho else None
+    resultado['tamanho_caminho'] = len(caminho)
+    if incluir_caminho:
+        resultado['caminho'] = [[casa.posicao.x, casa.posicao.y] for casa in caminho]
+    resultado['casas_expandidas'] = procura.estatisticas.expandidas
+    resultado['segundos'] = round(segundos, 6)
+    return json.dumps(resultado, ensure_ascii=False)
+
+
+def resolver_lote(lote, motor, incluir_caminho):
+    return [resolver_mapa(mapa, motor, incluir_caminho) for mapa in lote]
+
+
+def agrupar(mapas, tamanho):
+    lote = []
+    for mapa in mapas:
+        lote.append(mapa)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+# Linhas JSON dos mapas, na ordem da entrada, com no máximo alguns lotes em andamento
+def resolver_mapas(mapas, motor=Motor.COMPACTO, processos=1, incluir_caminho=True, tamanho_lote=TAMANHO_LOTE):
+    if processos is None:
+        processos = os.cpu_count() or 1
+    if processos <= 1:
+        for mapa in mapas:
+            yield resolver_mapa(mapa, motor, incluir_caminho)
+        return
+
+    metodos = multiprocessing.get_all_start_methods()
+    contexto = multiprocessing.get_context('fork' if 'fork' in metodos else None)
+    em_andamento = collections.deque()
+    with ProcessPoolExecutor(processos, mp_context=contexto) as executor:
+        for lote in agrupar(mapas, tamanho_lote):
+            em_andamento.append(executor.submit(resolver_lote, lote, motor, incluir_caminho))
+            if len(em_andamento) >= processos * LOTES_POR_PROCESSO:
+                yield from em_andamento.popleft().result()
+        while em_andamento:
+            yield from em_andamento.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Resolve mapas em lote e escreve um resultado JSON por linha na saída padrão.')
+    parser.add_argument('entradas', nargs='*', default=[ENTRADA_PADRAO],
+                        help='arquivos de mapa (texto ou binário); "-" lê mapas de texto da entrada padrão')
+    parser.add_argument('--lista', action='store_true',
+                        help='a entrada padrão traz um arquivo de mapa por linha, em vez dos próprios mapas')
+    parser.add_argument('--motor', choices=MOTORES, default=Motor.COMPACTO)
+    parser.add_argument('--processos', type=int, default=1, help='0 usa um processo por núcleo')
+    parser.add_argument('--sem-caminho', action='store_true', help='não escrever as casas do caminho')
+    argumentos = parser.parse_args()
+
+    origens = (linha.strip() for linha in sys.stdin) if argumentos.lista else iter(argumentos.entradas)
+    mapas = (mapa for origem in origens if origem for mapa in ler_origem(origem))
+    processos = argumentos.processos or None
+    try:
+        for linha in resolver_mapas(mapas, argumentos.motor, processos, not argumentos.sem_caminho):
+            sys.stdout.write(linha + '\n')
+    except BrokenPipeError:
+        # Quem lia a saída parou (head, por exemplo): a saída vai para o nada para o Python não falhar ao sair
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
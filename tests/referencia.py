@@ -0,0 +1,106 @@
+import heapq
+import random
+
+import pytest
+
+from src.a_estrela import Cenario, achar_caminho
+from src.constantes import Celula, Motor, ModoHistorico
+from src.gerador_cenarios import GERADORES, gerar_cenario
+
+TAMANHO = 30
+SEMENTES = range(3)
+CELULAS_SORTEADAS = (Celula.VAZIA, Celula.BARREIRA, Celula.BARREIRA, Celula.SEMI_BARREIRA, Celula.FRUTA)
+
+
+# Custo do caminho sem o h da casa inicial (o personagem começa com g = h), ou None sem caminho
+def custo(caminho):
+    return caminho[-1].g - caminho[0].g if caminho else None
+
+
+# Dijkstra de referência, escrito à parte dos motores: menor custo (multiplicado por 10) do início até cada casa
+def menores_custos(cenario, inicio=None):
+    inicio = inicio or cenario.personagem_posicao
+    distancias = {(inicio['x'], inicio['y'], False): 0}
+    fila = [(0, inicio['x'], inicio['y'], False)]
+    por_casa = {}
+    while fila:
+        distancia, x, y, tem_fruta = heapq.heappop(fila)
+        if distancia > distancias[(x, y, tem_fruta)]:
+            continue
+        por_casa.setdefault((x, y), distancia)
+        for vizinho_x, vizinho_y in cenario.obter_coordenadas_vizinhas(x, y):
+            celula = cenario.obter_celula(vizinho_x, vizinho_y)
+            if celula not in Celula.VALIDAS or (celula == Celula.BARREIRA and not tem_fruta):
+                continue
+            passo = 10 if vizinho_x == x or vizinho_y == y else 14
+            if celula in (Celula.BARREIRA, Celula.SEMI_BARREIRA):
+                passo += 10
+            vizinho = (vizinho_x, vizinho_y, (tem_fruta and celula != Celula.BARREIRA) or celula == Celula.FRUTA)
+            if distancia + passo < distancias.get(vizinho, distancia + passo + 1):
+                distancias[vizinho] = distancia + passo
+                heapq.heappush(fila, (distancia + passo, *vizinho))
+    return por_casa
+
+
+def menor_custo(cenario, inicio=None, saida=None):
+    saida = saida or cenario.saida_posicao
+    distancia = menores_custos(cenario, inicio).get((saida['x'], saida['y']))
+    return None if distancia is None else distancia / 10
+
+
+# O caminho anda uma casa por vez, só por casas válidas, e atravessa barreiras só com fruta
+def conferir_caminho(cenario, caminho):
+    for anterior, casa in zip(caminho, caminho[1:]):
+        assert max(abs(casa.posicao.x - anterior.posicao.x), abs(casa.posicao.y - anterior.posicao.y)) == 1
+        assert casa.posicao.celula in Celula.VALIDAS
+        assert casa.posicao.celula != Celula.BARREIRA or anterior.tem_fruta
+
+
+def procurar(cenario, motor=Motor.PADRAO, inicio=None, saida=None):
+    return achar_caminho(cenario, motor, inicio, saida, ModoHistorico.DESLIGADO)
+
+
+def cenarios():
+    return [(tipo, semente) for tipo in GERADORES for semente in SEMENTES]
+
+
+# Trocar casas sorteadas, sem mexer no personagem e na saída. Devolve as casas alteradas
+def alterar_casas(sorteio, cenario, quantidade, alterar=None):
+    alterar = alterar or cenario.alterar_celula
+    alteradas = []
+    while len(alteradas) < quantidade:
+        x, y = sorteio.randrange(cenario.largura), sorteio.randrange(cenario.altura)
+        if cenario.obter_celula(x, y) in (Celula.PERSONAGEM, Celula.SAIDA):
+            continue
+        alterar(x, y, sorteio.choice(CELULAS_SORTEADAS))
+        alteradas.append((x, y))
+    return alteradas
+
+
+def posicoes_sorteadas(sorteio, cenario, quantidade):
+    return [{'x': sorteio.randrange(cenario.largura), 'y': sorteio.randrange(cenario.altura)}
+            for _ in range(quantidade)]
+
+
+# Cenários de cada tipo com casas trocadas, cada um com alguns inícios sorteados: (cenário, início)
+def cenarios_alterados(semente=1):
+    sorteio = random.Random(semente)
+    for tipo in GERADORES:
+        cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, 7))
+        alterar_casas(sorteio, cenario, 60)
+        for inicio in posicoes_sorteadas(sorteio, cenario, 5):
+            yield cenario, inicio
+
+
+# Motor com a heurística do padrão (que pode passar do custo real com diagonais de 1.4): mesmo custo do padrão
+def conferir_como_padrao(cenario, motor, inicio=None):
+    caminho = procurar(cenario, motor, inicio)[0]
+    conferir_caminho(cenario, caminho)
+    assert custo(caminho) == pytest.approx(custo(procurar(cenario, inicio=inicio)[0]))
+
+
+# Motor com heurística admissível: sempre o menor custo, igual ao do Dijkstra de referência
+def conferir_otimo(cenario, motor, inicio=None):
+    caminho = procurar(cenario, motor, inicio)[0]
+    conferir_caminho(cenario, caminho)
+    assert custo(caminho) == pytest.approx(menor_custo(cenario, inicio))
@@ -0,0 +1,58 @@
+import pytest
+
+from src.a_estrela import Cenario, achar_caminho
+from src.busca_baldes import FilaDeBaldes, achar_caminho_em_baldes
+from src.constantes import Celula, Motor, ModoHistorico
+from src.gerador_cenarios import gerar_cenario
+from src.heuristica_marcos import heuristica_octil
+from src.matriz_plana import MatrizPlana
+from tests.referencia import TAMANHO, cenarios, cenarios_alterados, conferir_como_padrao
+
+
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_baldes_tem_o_custo_esperado(tipo, semente):
+    conferir_como_padrao(Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, semente)), Motor.BALDES)
+
+
+def test_baldes_tem_o_custo_esperado_com_inicios_e_casas_alterados():
+    for cenario, inicio in cenarios_alterados():
+        conferir_como_padrao(cenario, Motor.BALDES, inicio)
+
+
+# Cenário sem obstáculos com o personagem em (0, 0) e a saída na casa informada
+def cenario_aberto(largura, altura, saida_x, saida_y):
+    celulas = bytearray(Celula.VAZIA * (largura * altura), 'ascii')
+    celulas[0] = ord(Celula.PERSONAGEM)
+    celulas[saida_y * largura + saida_x] = ord(Celula.SAIDA)
+    return Cenario(MatrizPlana(celulas, largura, altura))
+
+
+def test_fila_retira_o_maior_g_no_mesmo_f():
+    gs = [0, 30, 10, 30, 20, 50]
+    fila = FilaDeBaldes(gs)
+    for estado in (0, 1, 2, 3):
+        fila.inserir(7, estado)
+    fila.inserir(9, 5)
+    assert fila.retirar() == (7, 3)  # g empatado em 30: sai o maior estado
+    fila.inserir(7, 4)  # Entra no balde já ordenado, entre os g 10 e 30
+    assert [fila.retirar() for _ in range(len(fila))] == [(7, 1), (7, 4), (7, 2), (7, 0), (9, 5)]
+    assert fila.retirar() is None
+
+
+# Com a h octil quase todas as casas entre o personagem e a saída têm o mesmo f; saindo o maior g, a procura
+# segue direto para a saída e só expande as casas do caminho
+@pytest.mark.parametrize('largura, altura, saida_x, saida_y', ((20, 12, 15, 9), (25, 10, 3, 9), (30, 30, 29, 17)))
+def test_empate_no_f_expande_so_o_caminho(largura, altura, saida_x, saida_y):
+    cenario = cenario_aberto(largura, altura, saida_x, saida_y)
+    resultado = achar_caminho_em_baldes(cenario, modo_historico=ModoHistorico.DESLIGADO, heuristica=heuristica_octil)
+    assert len(resultado[0]) == max(saida_x, saida_y) + 1
+    assert resultado.estatisticas.expandidas == len(resultado[0])
+
+
+@pytest.mark.parametrize('largura, altura, saida_x, saida_y', ((20, 12, 19, 0), (12, 12, 11, 11)))
+def test_empate_no_f_igual_ao_compacto(largura, altura, saida_x, saida_y):
+    cenario = cenario_aberto(largura, altura, saida_x, saida_y)
+    compacto = achar_caminho(cenario, Motor.COMPACTO, historico=ModoHistorico.DESLIGADO)
+    baldes = achar_caminho(cenario, Motor.BALDES, historico=ModoHistorico.DESLIGADO)
+    assert [casa.chave() for casa in baldes[0]] == [casa.chave() for casa in compacto[0]]
+    assert baldes.estatisticas.expandidas == compacto.estatisticas.expandidas
@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+from src.a_estrela import Cenario, caminho_em_tuplas
+from src.busca_em_lote import achar_caminhos
+from src.constantes import Motor
+from src.gerador_cenarios import gerar_cenario
+from tests.referencia import TAMANHO, cenarios, posicoes_sorteadas
+
+
+# Consultas (início, saída) sorteadas, incluindo algumas sem caminho por caírem em barreiras
+def sortear_consultas(cenario, quantidade, semente=0):
+    sorteio = random.Random(semente)
+    return list(zip(posicoes_sorteadas(sorteio, cenario, quantidade), posicoes_sorteadas(sorteio, cenario, quantidade)))
+
+
+@pytest.mark.parametrize('motor', (Motor.PADRAO, Motor.COMPACTO))
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_processos_iguais_ao_sequencial(tipo, semente, motor):
+    cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, semente))
+    consultas = sortear_consultas(cenario, 12, semente)
+    sequencial = achar_caminhos(cenario, consultas, motor, processos=1)
+    paralelo = achar_caminhos(cenario, consultas, motor, processos=2)
+    assert len(paralelo) == len(consultas)
+    assert [caminho_em_tuplas(caminho) for caminho in paralelo] == \
+        [caminho_em_tuplas(caminho) for caminho in sequencial]
+    assert any(sequencial)
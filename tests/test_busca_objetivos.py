@@ -0,0 +1,25 @@
+import random
+
+import pytest
+
+from src.a_estrela import Cenario
+from src.busca_objetivos import achar_objetivo_mais_proximo
+from src.constantes import Celula, ModoHistorico
+from src.gerador_cenarios import GERADORES, gerar_cenario
+from tests.referencia import TAMANHO, alterar_casas, conferir_caminho, custo, menores_custos
+
+
+@pytest.mark.parametrize('tipo', GERADORES)
+def test_objetivo_mais_proximo_igual_a_uma_procura_por_objetivo(tipo):
+    cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, 6))
+    alterar_casas(random.Random(5), cenario, 40)
+    frutas = cenario.localizar_frutas()
+    por_casa = menores_custos(cenario)
+    custos = [por_casa[(fruta['x'], fruta['y'])] / 10 for fruta in frutas if (fruta['x'], fruta['y']) in por_casa]
+    objetivo, resultado = achar_objetivo_mais_proximo(cenario, Celula.FRUTA, modo_historico=ModoHistorico.DESLIGADO)
+    if not custos:
+        assert objetivo is None
+    else:
+        assert objetivo in frutas
+        conferir_caminho(cenario, resultado[0])
+        assert custo(resultado[0]) == pytest.approx(min(custos))
@@ -0,0 +1,16 @@
+import pytest
+
+from src.a_estrela import Cenario
+from src.constantes import Motor
+from src.gerador_cenarios import gerar_cenario
+from tests.referencia import TAMANHO, cenarios, cenarios_alterados, conferir_como_padrao
+
+
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_saltos_tem_o_custo_esperado(tipo, semente):
+    conferir_como_padrao(Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, semente)), Motor.SALTOS)
+
+
+def test_saltos_tem_o_custo_esperado_com_inicios_e_casas_alterados():
+    for cenario, inicio in cenarios_alterados():
+        conferir_como_padrao(cenario, Motor.SALTOS, inicio)
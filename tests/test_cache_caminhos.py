@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from src.a_estrela import Cenario
+from src.cache_caminhos import CacheDeCaminhos
+from src.constantes import Motor
+from src.gerador_cenarios import gerar_cenario
+from tests.referencia import TAMANHO, custo
+
+
+def test_cache_devolve_o_mesmo_caminho(tmp_path):
+    cenario = Cenario(gerar_cenario('labirinto', TAMANHO, TAMANHO))
+    cache = CacheDeCaminhos(pasta=str(tmp_path))
+    primeiro = cache.achar_caminho(cenario, Motor.COMPACTO)
+    for outro_cache in (cache, CacheDeCaminhos(pasta=str(tmp_path))):
+        repetido = outro_cache.achar_caminho(cenario, Motor.COMPACTO)
+        assert repetido.estatisticas.do_cache
+        assert custo(repetido[0]) == pytest.approx(custo(primeiro[0]))
+
+
+def test_regravar_uma_chave_nao_soma_o_arquivo_antigo(tmp_path):
+    cache = CacheDeCaminhos(pasta=str(tmp_path))
+    for dados in (b'[1,2,3]', b'[1,2,3,4,5]', b'[1]'):
+        cache.gravar_no_disco('chave', dados)
+    tamanhos = sum(os.path.getsize(os.path.join(tmp_path, nome)) for nome in os.listdir(tmp_path))
+    assert cache.bytes_disco == tamanhos == len(b'[1]')
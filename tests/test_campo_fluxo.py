@@ -0,0 +1,23 @@
+import random
+
+import pytest
+
+from src.a_estrela import Cenario
+from src.campo_fluxo import CampoDeFluxo
+from src.gerador_cenarios import GERADORES, gerar_cenario
+from tests.referencia import TAMANHO, alterar_casas, conferir_caminho, custo, menor_custo, posicoes_sorteadas
+
+
+@pytest.mark.parametrize('tipo', GERADORES)
+def test_campo_de_fluxo_igual_a_campo_novo(tipo):
+    sorteio = random.Random(3)
+    cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, 4))
+    campo = CampoDeFluxo(cenario)
+    for _ in range(30):
+        alterar_casas(sorteio, cenario, 1, campo.atualizar_celula)
+        novo = CampoDeFluxo(cenario)
+        assert campo.distancias == novo.distancias
+        for inicio in posicoes_sorteadas(sorteio, cenario, 3):
+            caminho = campo.achar_caminho(inicio)
+            conferir_caminho(cenario, caminho)
+            assert custo(caminho) == pytest.approx(menor_custo(cenario, inicio))
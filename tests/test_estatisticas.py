@@ -0,0 +1,16 @@
+import pytest
+
+from src.a_estrela import Cenario, achar_caminho
+from src.constantes import Celula, Motor
+from src.gerador_cenarios import gerar_cenario
+
+
+@pytest.mark.parametrize('motor', (Motor.PADRAO, Motor.COMPACTO, Motor.SALTOS, Motor.BIDIRECIONAL,
+                                   Motor.BALDES, Motor.MARCOS))
+def test_sem_saida_devolve_resultado_vazio(motor):
+    cenario = Cenario(gerar_cenario('aberto', 10, 10))
+    saida = cenario.saida_posicao
+    cenario.alterar_celula(saida['x'], saida['y'], Celula.VAZIA)
+    resultado = achar_caminho(cenario, motor)
+    assert resultado[0] == [] and resultado[1] == []
+    assert resultado.estatisticas.motor == motor
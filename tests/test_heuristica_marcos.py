@@ -0,0 +1,16 @@
+import pytest
+
+from src.a_estrela import Cenario
+from src.constantes import Motor
+from src.gerador_cenarios import gerar_cenario
+from tests.referencia import TAMANHO, cenarios, cenarios_alterados, conferir_otimo
+
+
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_marcos_tem_o_custo_esperado(tipo, semente):
+    conferir_otimo(Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, semente)), Motor.MARCOS)
+
+
+def test_marcos_tem_o_custo_esperado_com_inicios_e_casas_alterados():
+    for cenario, inicio in cenarios_alterados():
+        conferir_otimo(cenario, Motor.MARCOS, inicio)
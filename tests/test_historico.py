@@ -0,0 +1,52 @@
+import pytest
+
+from src.a_estrela import Cenario, achar_caminho
+from src.constantes import Motor, ModoHistorico
+from src.gerador_cenarios import gerar_cenario
+from tests.referencia import TAMANHO, cenarios
+
+MOTORES = (Motor.PADRAO, Motor.COMPACTO, Motor.SALTOS, Motor.BIDIRECIONAL, Motor.BALDES, Motor.MARCOS)
+
+
+# Evento do histórico completo como (índice do estado, operação, g), o formato do histórico compacto
+def em_indice(cenario, casa, operacao):
+    total = cenario.largura * cenario.altura
+    indice = casa.posicao.y * cenario.largura + casa.posicao.x + (total if casa.tem_fruta else 0)
+    return indice, operacao, casa.g
+
+
+def em_tupla(casa, operacao):
+    return casa.posicao.x, casa.posicao.y, casa.f, casa.g, casa.h, casa.tem_fruta, operacao
+
+
+def procurar(tipo, semente, motor, historico):
+    cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, semente))
+    return cenario, achar_caminho(cenario, motor, historico=historico)
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_desligado_nao_guarda_historico(tipo, semente, motor):
+    _, completo = procurar(tipo, semente, motor, ModoHistorico.COMPLETO)
+    _, desligado = procurar(tipo, semente, motor, ModoHistorico.DESLIGADO)
+    assert desligado[1] is None
+    assert [casa.chave() for casa in desligado[0]] == [casa.chave() for casa in completo[0]]
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_compacto_tem_os_eventos_do_completo(tipo, semente, motor):
+    cenario, completo = procurar(tipo, semente, motor, ModoHistorico.COMPLETO)
+    _, compacto = procurar(tipo, semente, motor, ModoHistorico.COMPACTO)
+    eventos = list(zip(compacto[1].indices, (operacao for _, operacao in compacto[1]), compacto[1].gs))
+    assert eventos == pytest.approx([em_indice(cenario, casa, operacao) for casa, operacao in completo[1]])
+
+
+@pytest.mark.parametrize('motor', MOTORES)
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_funcao_recebe_todos_os_eventos_em_ordem(tipo, semente, motor):
+    recebidos = []
+    _, completo = procurar(tipo, semente, motor, ModoHistorico.COMPLETO)
+    _, transmitido = procurar(tipo, semente, motor, lambda casa, operacao: recebidos.append((casa, operacao)))
+    assert transmitido[1] is None
+    assert [em_tupla(*evento) for evento in recebidos] == [em_tupla(*evento) for evento in completo[1]]
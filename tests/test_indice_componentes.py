@@ -0,0 +1,19 @@
+import random
+
+import pytest
+
+from src.a_estrela import Cenario
+from src.gerador_cenarios import GERADORES, gerar_cenario
+from tests.referencia import TAMANHO, alterar_casas, menor_custo, posicoes_sorteadas
+
+
+@pytest.mark.parametrize('tipo', GERADORES)
+def test_indice_de_componentes_concorda_com_a_procura(tipo):
+    sorteio = random.Random(4)
+    cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, 5))
+    cenario.obter_indice_componentes()
+    for _ in range(20):
+        alterar_casas(sorteio, cenario, 5)
+        for inicio in posicoes_sorteadas(sorteio, cenario, 5):
+            if cenario.saida_inalcancavel(inicio):
+                assert menor_custo(cenario, inicio) is None
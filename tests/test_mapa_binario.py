@@ -0,0 +1,71 @@
+import pytest
+
+from src.a_estrela import Cenario
+from src.constantes import Celula
+from src.gerador_cenarios import gerar_cenario
+from src.mapa_binario import CABECALHO, SEM_POSICAO, carregar_cenario, ler_cabecalho, salvar_cenario
+from tests.referencia import TAMANHO, cenarios, menor_custo
+
+
+def gravar(tmp_path, tipo='obstaculos', semente=0):
+    cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, semente))
+    caminho = tmp_path / 'cenario.mapa'
+    salvar_cenario(str(caminho), cenario)
+    return cenario, caminho
+
+
+# Trocar os bytes do arquivo a partir da posição informada
+def sobrescrever(caminho, posicao, dados):
+    with open(caminho, 'r+b') as arquivo:
+        arquivo.seek(posicao)
+        arquivo.write(dados)
+
+
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_ida_e_volta(tmp_path, tipo, semente):
+    cenario, caminho = gravar(tmp_path, tipo, semente)
+    carregado = carregar_cenario(str(caminho), validar_celulas=True)
+    assert (carregado.largura, carregado.altura) == (cenario.largura, cenario.altura)
+    assert carregado.personagem_posicao == cenario.personagem_posicao
+    assert carregado.saida_posicao == cenario.saida_posicao
+    assert bytes(carregado.obter_celulas_compactas()) == bytes(cenario.obter_celulas_compactas())
+    assert menor_custo(carregado) == menor_custo(cenario)
+
+
+def test_assinatura_errada(tmp_path):
+    _, caminho = gravar(tmp_path)
+    sobrescrever(caminho, 0, b'XXXX')
+    with pytest.raises(ValueError, match='não é um arquivo de cenário'):
+        carregar_cenario(str(caminho))
+
+
+def test_arquivo_incompleto(tmp_path):
+    _, caminho = gravar(tmp_path)
+    with open(caminho, 'r+b') as arquivo:
+        arquivo.truncate(CABECALHO.size + 10)
+    with pytest.raises(ValueError, match='incompleto'):
+        ler_cabecalho(str(caminho))
+
+
+def test_posicao_fora_do_cenario(tmp_path):
+    cenario, caminho = gravar(tmp_path)
+    # Personagem x, logo depois de assinatura, versão, preenchimento, largura e altura
+    sobrescrever(caminho, 16, (cenario.largura + 3).to_bytes(4, 'little', signed=True))
+    with pytest.raises(ValueError, match='fora do cenário'):
+        carregar_cenario(str(caminho))
+
+
+def test_cabecalho_sem_posicoes(tmp_path):
+    _, caminho = gravar(tmp_path)
+    sobrescrever(caminho, 16, SEM_POSICAO.to_bytes(4, 'little', signed=True) * 2)
+    assert ler_cabecalho(str(caminho))[2] is None
+
+
+def test_celula_invalida(tmp_path):
+    cenario, caminho = gravar(tmp_path)
+    livre = next(indice for indice, celula in enumerate(cenario.obter_celulas_compactas()) 
+                 if celula == ord(Celula.VAZIA))
+    sobrescrever(caminho, CABECALHO.size + livre, b'?')
+    carregar_cenario(str(caminho))  # Sem validar_celulas só as casas do personagem e da saída são conferidas
+    with pytest.raises(ValueError, match="células inválidas: '\\?'"):
+        carregar_cenario(str(caminho), validar_celulas=True)
@@ -0,0 +1,37 @@
+import pytest
+
+from src.a_estrela import Cenario, achar_caminho
+from src.constantes import Motor, ModoHistorico
+from src.gerador_cenarios import gerar_cenario
+from tests.referencia import (TAMANHO, cenarios, cenarios_alterados, conferir_caminho, conferir_como_padrao, custo,
+                              menor_custo, procurar)
+
+
+# Casa como tupla, para comparar casas de procuras diferentes
+def em_tupla(casa):
+    return casa.posicao.x, casa.posicao.y, casa.posicao.celula, casa.f, casa.g, casa.h, casa.tem_fruta
+
+
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_padrao_acha_caminho_valido(tipo, semente):
+    cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, semente))
+    caminho = procurar(cenario)[0]
+    conferir_caminho(cenario, caminho)
+    esperado = menor_custo(cenario)
+    assert (custo(caminho) is None) == (esperado is None)
+    assert caminho == [] or custo(caminho) >= esperado - 1e-6
+
+
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_compacto_igual_ao_padrao(tipo, semente):
+    cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, semente))
+    caminho, historico = achar_caminho(cenario, Motor.PADRAO, historico=ModoHistorico.COMPLETO)
+    caminho_compacto, historico_compacto = achar_caminho(cenario, Motor.COMPACTO, historico=ModoHistorico.COMPLETO)
+    assert [em_tupla(casa) for casa in caminho_compacto] == [em_tupla(casa) for casa in caminho]
+    eventos = [(em_tupla(casa), operacao) for casa, operacao in historico]
+    assert [(em_tupla(casa), operacao) for casa, operacao in historico_compacto] == eventos
+
+
+def test_compacto_tem_o_custo_do_padrao_com_inicios_e_casas_alterados():
+    for cenario, inicio in cenarios_alterados():
+        conferir_como_padrao(cenario, Motor.COMPACTO, inicio)
@@ -0,0 +1,26 @@
+import random
+
+import pytest
+
+from src.a_estrela import Cenario
+from src.gerador_cenarios import gerar_cenario
+from src.planejador_hierarquico import PlanejadorHierarquico
+from tests.referencia import TAMANHO, alterar_casas, cenarios, conferir_caminho, custo, menor_custo
+
+# Quanto o caminho pelas portas pode passar do menor custo nos cenários de teste
+LIMITE_SUBOTIMO = 1.3
+
+
+@pytest.mark.parametrize('tipo, semente', cenarios())
+def test_planejador_hierarquico_acha_caminho_valido(tipo, semente):
+    cenario = Cenario(gerar_cenario(tipo, 2 * TAMANHO, 2 * TAMANHO, semente))
+    planejador = PlanejadorHierarquico(cenario, tamanho_cluster=16)
+    alterar_casas(random.Random(semente), cenario, 20, planejador.atualizar_celula)
+    esperado = menor_custo(cenario)
+    caminho = planejador.achar_caminho()
+    conferir_caminho(cenario, caminho)
+    obtido = custo(caminho)
+    if esperado is None:
+        assert obtido is None
+    else:
+        assert esperado - 1e-6 <= obtido <= LIMITE_SUBOTIMO * esperado + 1e-6
@@ -0,0 +1,22 @@
+import random
+
+import pytest
+
+from src.a_estrela import Cenario
+from src.constantes import Motor
+from src.gerador_cenarios import GERADORES, gerar_cenario
+from src.planejador_incremental import PlanejadorIncremental
+from tests.referencia import TAMANHO, alterar_casas, custo, menor_custo, procurar
+
+
+@pytest.mark.parametrize('tipo', GERADORES)
+def test_planejador_incremental_igual_a_procura_nova(tipo):
+    sorteio = random.Random(2)
+    cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, 3))
+    planejador = PlanejadorIncremental(cenario)
+    for _ in range(30):
+        x, y = alterar_casas(sorteio, cenario, 1, planejador.atualizar_celula)[0]
+        esperado = menor_custo(cenario)
+        assert custo(planejador.achar_caminho()) == pytest.approx(esperado), (x, y)
+        assert custo(PlanejadorIncremental(cenario).achar_caminho()) == pytest.approx(esperado)
+        assert custo(procurar(cenario, Motor.BIDIRECIONAL)[0]) == pytest.approx(esperado)
@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+
+from src.a_estrela import Cenario
+from src.gerador_cenarios import gerar_cenario
+from src.mapa_binario import salvar_cenario
+from tests.referencia import TAMANHO, menor_custo
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAPAS = '''C__S
+
+C_
+AB
+_S
+
+C_X_S
+'''
+
+
+def executar(*argumentos, entrada=''):
+    processo = subprocess.run([sys.executable, '-m', 'src.resolver_mapas', *argumentos], input=entrada,
+                              capture_output=True, text=True, cwd=RAIZ, check=True, timeout=60)
+    return [json.loads(linha) for linha in processo.stdout.splitlines()]
+
+
+def test_uma_linha_por_mapa_da_entrada_padrao():
+    linhas = executar(entrada=MAPAS)
+    assert [(linha['origem'], linha['numero']) for linha in linhas] == [('-', 0), ('-', 1), ('-', 2)]
+
+    assert linhas[0]['encontrado'] and linhas[0]['custo'] == 3
+    assert linhas[0]['caminho'] == [[0, 0], [1, 0], [2, 0], [3, 0]]
+    assert (linhas[1]['largura'], linhas[1]['altura']) == (2, 3)
+    assert linhas[1]['caminho'][0] == [0, 0] and linhas[1]['caminho'][-1] == [1, 2]
+    assert linhas[2]['erro'] == 'células inválidas: X'
+
+
+def test_arquivos_em_processos(tmp_path):
+    arquivos = []
+    for semente, tipo in enumerate(('obstaculos', 'labirinto')):
+        cenario = Cenario(gerar_cenario(tipo, TAMANHO, TAMANHO, semente))
+        arquivos.append((str(tmp_path / f'{tipo}.mapa'), menor_custo(cenario)))
+        salvar_cenario(arquivos[-1][0], cenario)
+
+    linhas = executar('--motor', 'bidirecional', '--processos', '2', '--sem-caminho',
+                      *(arquivo for arquivo, _ in arquivos))
+    assert [linha['origem'] for linha in linhas] == [arquivo for arquivo, _ in arquivos]
+    for linha, (_, custo) in zip(linhas, arquivos):
+        assert 'caminho' not in linha
+        assert linha['custo'] == custo